@@ -2,10 +2,17 @@
 
 from constants import DIALECT
 from environment import Environment
+from parsers import is_syntactically_equivalent
 
 
 def main(sql1, sql2, schema, ROW_NUM=2, constraints=None, **kwargs):
+    if is_syntactically_equivalent([sql1, sql2], dialect=kwargs.get('dialect', DIALECT.ALL)):
+        # no need to build any formula
+        print("\033[1;32;40m>>> Equivalent! \033[0m")
+        return
     with Environment(**kwargs) as env:
+        schema, constraints = env.prune_schema(schema, constraints, sql1, sql2)
+        schema, constraints = env.prune_columns(schema, constraints, sql1, sql2)
         for k, v in schema.items():
             env.create_database(attributes=v, bound_size=ROW_NUM, name=k)
         env.add_constraints(constraints)
@@ -6,9 +6,13 @@ import os
 from z3 import (
     Context,
     ArithRef,
+    BoolRef,
+    ExprRef,
+    is_and as Z3_is_and,
+    is_or as Z3_is_or,
+    is_not as Z3_is_not,
     Int as Z3_Int,
     BoolVal as Z3_BoolVal,
-    IntVal as Z3_IntVal,
     RealVal as Z3_RealVal,
     And as Z3_And,
     Or as Z3_Or,
@@ -18,26 +22,149 @@ from z3 import (
     Implies as Z3_Implies,
 )
 
+import fast_ast
+
 ################################################################
 # z3 wrapper
 ################################################################
 
 Z3_CONTEXT = Context()
-IntVal = lambda arg: Z3_IntVal(arg, ctx=Z3_CONTEXT)
+IntVal = lambda arg: fast_ast.IntVal(arg, ctx=Z3_CONTEXT)
 RealVal = lambda arg: Z3_RealVal(arg, ctx=Z3_CONTEXT)
 BoolVal = lambda arg: Z3_BoolVal(arg, ctx=Z3_CONTEXT)
 Int = lambda arg: Z3_Int(arg, ctx=Z3_CONTEXT)
-Not = lambda *args: Z3_Not(*args, ctx=Z3_CONTEXT)
-If = lambda a, b, c: Z3_If(a, b, c, ctx=Z3_CONTEXT)
 Sum = lambda *args: Z3_Sum(*args)
-And = lambda *args: Z3_And(*args)
-Or = lambda *args: Z3_Or(*args)
-Implies = lambda a, b: Z3_Implies(a, b, ctx=Z3_CONTEXT)
+
+
+################################################################
+# smart constructors of Boolean connectives
+# fold TRUE/FALSE operands on the Python side instead of leaving them to z3's rewriter
+################################################################
+
+# z3 hash-conses terms, so TRUE/FALSE can be recognized by their AST pointers without calling z3
+def _is_z3_true(formula) -> bool:
+    return formula is True or (isinstance(formula, BoolRef) and formula.ast.value == _Z3_TRUE_PTR)
+
+
+def _is_z3_false(formula) -> bool:
+    return formula is False or (isinstance(formula, BoolRef) and formula.ast.value == _Z3_FALSE_PTR)
+
+
+def _is_z3_bool(formula) -> bool:
+    return isinstance(formula, BoolRef) and formula.ctx is Z3_CONTEXT
+
+
+def _flatten(args):
+    if len(args) == 1 and isinstance(args[0], list | tuple):
+        # And([a, b]) <=> And(a, b)
+        return args[0]
+    return args
+
+
+def And(*args):
+    """
+    And(TRUE, a) => a, And(FALSE, a) => FALSE, And(a) => a, And() => TRUE, And(And(a, b), c) => And(a, b, c)
+    """
+    operands = []
+    for arg in _flatten(args):
+        if _is_z3_true(arg):
+            continue
+        elif _is_z3_false(arg):
+            return Z3_FALSE
+        elif Z3_is_and(arg):
+            operands.extend(arg.children())
+        else:
+            operands.append(arg)
+    if len(operands) == 0:
+        return Z3_TRUE
+    elif len(operands) == 1 and isinstance(operands[0], ExprRef):
+        return operands[0]
+    elif all(_is_z3_bool(opd) for opd in operands):
+        return fast_ast.And(*operands)
+    else:
+        return Z3_And(*operands)
+
+
+def Or(*args):
+    """
+    Or(FALSE, a) => a, Or(TRUE, a) => TRUE, Or(a) => a, Or() => FALSE, Or(Or(a, b), c) => Or(a, b, c)
+    """
+    operands = []
+    for arg in _flatten(args):
+        if _is_z3_false(arg):
+            continue
+        elif _is_z3_true(arg):
+            return Z3_TRUE
+        elif Z3_is_or(arg):
+            operands.extend(arg.children())
+        else:
+            operands.append(arg)
+    if len(operands) == 0:
+        return Z3_FALSE
+    elif len(operands) == 1 and isinstance(operands[0], ExprRef):
+        return operands[0]
+    elif all(_is_z3_bool(opd) for opd in operands):
+        return fast_ast.Or(*operands)
+    else:
+        return Z3_Or(*operands)
+
+
+def Not(a):
+    """
+    Not(TRUE) => FALSE, Not(FALSE) => TRUE, Not(Not(a)) => a
+    """
+    if _is_z3_true(a):
+        return Z3_FALSE
+    elif _is_z3_false(a):
+        return Z3_TRUE
+    elif Z3_is_not(a):
+        return a.arg(0)
+    elif _is_z3_bool(a):
+        return fast_ast.Not(a)
+    else:
+        return Z3_Not(a, ctx=Z3_CONTEXT)
+
+
+def If(a, b, c):
+    """
+    If(TRUE, b, c) => b, If(FALSE, b, c) => c, If(a, b, b) => b
+    """
+    # only fold into z3 expressions, Python literals still need z3 to infer their sorts
+    if _is_z3_true(a) and isinstance(b, ExprRef):
+        return b
+    elif _is_z3_false(a) and isinstance(c, ExprRef):
+        return c
+    elif isinstance(b, ExprRef) and isinstance(c, ExprRef) and b.ast.value == c.ast.value:
+        return b
+    elif _is_z3_bool(a) and (_is_z3_bool(b) and _is_z3_bool(c) or
+                             isinstance(b, ArithRef) and isinstance(c, ArithRef) and b.ctx is c.ctx is Z3_CONTEXT):
+        return fast_ast.If(a, b, c)
+    else:
+        return Z3_If(a, b, c, ctx=Z3_CONTEXT)
+
+
+def Implies(a, b):
+    """
+    Implies(TRUE, b) => b, Implies(FALSE, b) => TRUE, Implies(a, TRUE) => TRUE, Implies(a, FALSE) => Not(a)
+    """
+    if _is_z3_false(a) or _is_z3_true(b):
+        return Z3_TRUE
+    elif _is_z3_true(a) and isinstance(b, ExprRef):
+        return b
+    elif _is_z3_false(b):
+        return Not(a)
+    elif _is_z3_bool(a) and _is_z3_bool(b):
+        return fast_ast.Implies(a, b)
+    else:
+        return Z3_Implies(a, b, ctx=Z3_CONTEXT)
+
 
 POS_INF__Int = Int('POS_INF__Int')
 NEG_INF__Int = Int('NEG_INF__Int')
 Z3_TRUE = BoolVal(True)
 Z3_FALSE = BoolVal(False)
+_Z3_TRUE_PTR = Z3_TRUE.ast.value
+_Z3_FALSE_PTR = Z3_FALSE.ast.value
 Z3_1 = IntVal('1')
 Z3_0 = IntVal('0')
 Z3_NULL_VALUE = IntVal('-10')
@@ -62,6 +189,11 @@ SPACE_STRING = "__SPACE_STRING__"
 # note that the hash code of string in python is out of the range int32
 IS_FALSE = "__IS_FALSE__"
 IS_TRUE = "__IS_TRUE__"
+# clauses and functions whose results depend on the order of tuples
+ORDERED_OPERATORS = {
+    'orderby', 'limit', 'offset', 'fetch', 'over',
+    'any_value', 'first_value', 'last_value', 'nth_value', 'single_value', 'group_concat',
+}
 
 TIMEOUT = 600  # 10 min
 
@@ -75,6 +207,11 @@ class DIALECT:
     ORACLE = "oracle"
 
 
+class PARSER_BACKEND:
+    MO_SQL_PARSING = "mo_sql_parsing"
+    LARK = "lark"
+
+
 class STATE:
     EQUIV = "EQU"
     NON_EQUIV = "NEQ"
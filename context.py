@@ -44,6 +44,8 @@ class Context(object):
         self.clear_clauses()
         self.right_outer_table = False
         self.is_correlated_subquery = False
+        # whether FROM clause refers to outer queries
+        self.is_correlated_from_clause = False
 
     def clear_clauses(self):
         self.with_clause = None
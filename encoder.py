@@ -5,12 +5,9 @@ import re
 from copy import deepcopy, copy
 from typing import *
 
-from ordered_set import OrderedSet
 from z3 import (
     ArithRef,
     ExprRef,
-    is_true,
-    is_false
 )
 
 import utils
@@ -26,7 +23,6 @@ from constants import (
     IntVal,
     RealVal,
     Z3_FALSE,
-    Z3_TRUE,
     DIALECT,
 )
 from context import Context, GroupbyContext
@@ -59,194 +55,22 @@ def eval_operation(operator: FOperator, operands: list):
         return FExpression(operator, operands)
 
 
-def _inner_product(conds):
-    # [con1, [cond2, cond3]] => [[con1, cond2], [con1, cond3]]
-    MAX_COND_NUM = max(len(cond) if isinstance(cond, list | tuple) else 1 for cond in conds)
-    if MAX_COND_NUM == 1:
-        return conds
-    else:
-        new_conds = [[] for _ in range(MAX_COND_NUM)]
-        for cond in conds:
-            if isinstance(cond, list | tuple):
-                for idx in range(MAX_COND_NUM):
-                    new_conds[idx].append(cond[idx])
-            else:
-                for idx in range(MAX_COND_NUM):
-                    new_conds[idx].append(cond)
-        out = []
-        for conds in new_conds:
-            tmp = OrderedSet()
-            for c in conds:
-                if is_false(c):
-                    tmp = [Z3_FALSE]
-                    break
-                elif is_true(c):
-                    continue
-                else:
-                    tmp.add(c)
-            if len(tmp) > 0:
-                out.append(list(tmp))
-        return out
-
-
-def _contain_case(expr):
-    if isinstance(expr, FCasePredicate):
-        return True
-    elif isinstance(expr, FExpression):
-        for opd in expr.operands:
-            if _contain_case(opd) == True:
-                return True
-    else:
+def is_subquery_compared_to_bool(cond):
+    """
+    `x IN ((SELECT ...) = TRUE)`, as `x IN (SELECT ...) = TRUE` is parsed
+    """
+    if not isinstance(cond, dict) or len(cond) != 1:
         return False
-
-
-def linearize_case(expr):
-    if isinstance(expr, FCasePredicate):
-        conds, exprs = expr.when_clauses, expr.then_clauses
-        # TODO: case condition is a nested case is too complicate, we do not support right now
-        if any(_contain_case(cond) for cond in conds):
-            raise NotSupportedError("case condition is a nested case is too complicate")
-
-        if len(conds) == 1:
-            else_cond = FExpression(FOperator('not'), copy(conds))
-            else_cond = FIsNullOrHoldPredicate(else_cond)
-        else:
-            else_cond = FExpression(FOperator('not'), [FExpression(FOperator('or'), copy(conds))])
-            else_cond = FIsNullOrHoldPredicate(else_cond)
-        conds.append(else_cond)
-        exprs.append(expr.else_clause)
-        cases = []
-        for idx, expr in enumerate(exprs):
-            contain_case = _contain_case(expr)
-            linearized_expr = linearize_case(expr)
-            case = _inner_product([conds[idx], linearized_expr])
-            if contain_case:
-                cases.extend(case)
-            else:
-                cases.append(case)
-        return cases
-    elif isinstance(expr, FInPredicate | FNotInPredicate):
-        return expr
-    elif isinstance(expr, FIsNullPredicate) and isinstance(expr.value, FCasePredicate):
-        operands = linearize_case(expr.value)
-        for idx, opds in enumerate(operands):
-            if isinstance(opds[-1], FNull):
-                # [cond => NULL] is NULL <=> cond
-                operands[idx] = opds[0]
-            elif isinstance(opds[-1], ExcutableType):
-                # [cond => 1] is NULL <=> False
-                operands[idx] = Z3_FALSE
-            else:
-                # [cond => f] is NULL <=> cond /\ f is NULL
-                operands[idx] = FExpression(FOperator('and'), [opds[0], FIsNullPredicate(opds[-1])])
-        return operands
-    elif isinstance(expr, FIsNotNullPredicate) and isinstance(expr.value, FCasePredicate):
-        operands = linearize_case(expr.value)
-        for idx, opds in enumerate(operands):
-            if isinstance(opds[-1], FNull):
-                # [cond => NULL] is NOT NULL <=> False
-                operands[idx] = FDigits(0)  # False
-            elif isinstance(opds[-1], ExcutableType):
-                # [cond => 1] is NOT NULL <=> True
-                operands[idx] = Z3_TRUE
-            else:
-                # [cond => f] is NOT NULL <=> cond /\ f is NOT NULL
-                operands[idx] = FExpression(FOperator('and'), [opds[0], FIsNotNullPredicate(opds[-1])])
-
-        return operands
-    elif isinstance(expr, FIsTruePredicate | FIsNotFalsePredicate) and isinstance(expr.value, FCasePredicate):
-        operands = linearize_case(expr.value)
-        for idx, opds in enumerate(operands):
-            if len(opds) == 1:
-                operands[idx] = opds[0]
-            else:
-                operands[idx] = FExpression(FOperator('and'), opds)
-        return operands
-    elif isinstance(expr, FIsFalsePredicate | FIsNotTruePredicate) and isinstance(expr.value, FCasePredicate):
-        operands = linearize_case(expr.value)
-        for idx, opds in enumerate(operands):
-            if len(opds) == 1:
-                operands[idx] = FExpression(FOperator('not'), opds)
-            else:
-                operands[idx] = FExpression(FOperator('not'), [FExpression(FOperator('and'), opds)])
-        return operands
-    elif isinstance(expr, FExpression):
-        case_indces = set()
-        for idx, operand in enumerate(expr.operands):
-            expr.operands[idx] = linearize_case(operand)
-            if isinstance(expr.operands[idx], list):
-                # expr.operands[idx] = expr.operands[idx]
-                case_indces.add(idx)
-        if expr.operator == 'not' and case_indces == {0}:
-            scatter_expr = []
-            for e in expr[0]:
-                if isinstance(e, FExpression):
-                    scatter_expr.append(FExpression(e.operator, [e[0], FExpression(expr.operator, [e[1]])]))
-                else:
-                    scatter_expr.append(FExpression(FOperator('and'), [e[0], FExpression(expr.operator, [e[1]])]))
-            # expr = [FExpression(e.operator, [e[0], FExpression(expr.operator, [e[1]])]) for e in expr[0]]
-            return scatter_expr
-        if len(case_indces) > 0:
-            # extend case
-            for idx, operand in enumerate(expr.operands):
-                if idx not in case_indces:
-                    expr.operands[idx] = [operand]
-            operator = expr.operator
-            operands = expr.operands
-            expr = []
-            if operator == 'and':  # logical operations
-                for opds in itertools.product(*operands):
-                    new_opds = []
-                    for opd in opds:
-                        if isinstance(opd, list | tuple):
-                            new_opds.extend(opd)
-                        else:
-                            new_opds.append(opd)
-                    expr.append(FExpression(operator, new_opds))
-            elif operator == 'or':
-                new_opds = []
-                for opd in list(itertools.chain(*operands)):
-                    if isinstance(opd, list | tuple):
-                        new_opds.extend(opd)
-                    else:
-                        new_opds.append(opd)
-                expr.append(FExpression(operator, new_opds))
-            elif len(operands) == 2:
-                # CASE ... END = 1 | 1 = CASE ... END | CASE1 = CASE2
-                if len(case_indces) == 1:
-                    if case_indces == {0}:
-                        # CASE ... END = 1
-                        for opd1, opd2 in itertools.product(*operands):
-                            tmp = opd1[:-1] + [FExpression(operator, [opd1[-1], opd2])]
-                            if len(tmp) > 1:
-                                tmp = FExpression(FOperator('and'), tmp)
-                            else:
-                                tmp = tmp[0]
-                            expr.append(tmp)
-                    else:
-                        # 1 = CASE ... END
-                        for opd1, opd2 in itertools.product(*operands):
-                            # tmp = [FExpression(operator, [opd1, opd2[0]])] + opd2[1:]
-                            tmp = opd2[:-1] + [FExpression(operator, [opd1, opd2[-1]])]
-                            if len(tmp) > 1:
-                                tmp = FExpression(FOperator('and'), tmp)
-                            else:
-                                tmp = tmp[0]
-                            expr.append(tmp)
-                else:
-                    #  CASE1 = CASE2
-                    for opd1, opd2 in itertools.product(*operands):
-                        tmp = opd1[:-1] + opd2[:-1] + [FExpression(operator, [opd1[-1], opd2[-1]])]
-                        if len(tmp) > 1:
-                            tmp = FExpression(FOperator('and'), tmp)
-                        else:
-                            tmp = tmp[0]
-                        expr.append(tmp)
-            else:
-                raise NotImplementedError(expr)
-        return expr
-    else:
-        return expr
+    operator, operands = next(iter(cond.items()))
+    if operator not in ('in', 'nin') or not isinstance(operands, list) or len(operands) != 2:
+        return False
+    comparison = operands[1]
+    if not isinstance(comparison, dict) or len(comparison) != 1:
+        return False
+    operator, operands = next(iter(comparison.items()))
+    return operator in ('eq', 'neq') and isinstance(operands, list) and len(operands) == 2 and \
+        any(isinstance(opd, bool) for opd in operands) and \
+        any(isinstance(opd, dict) and 'select' in opd for opd in operands)
 
 
 def _refine_expression(expr):
@@ -388,6 +212,67 @@ class Encoder:
         )
         return table
 
+    def _base_column(self, table, index: int):
+        """
+        `TABLE__COLUMN` of the base column read by the index-th attribute of a (aliased) base table, otherwise None
+        """
+        while isinstance(table, FAliasTable):
+            table = table.fathers[0]
+        if type(table) is FBaseTable and self.scope.base_databases.get(table.name, None) is table:
+            return str(table.attributes[index])
+        return None
+
+    def _key_join(self, tables: Sequence[FBaseTable], condition, outer: bool = False):
+        """
+        a compact JOIN if its ON condition equates a primary key of the right table (or the left table for INNER JOIN)
+        with attributes of the other table, i.e., each tuple of the other table matches at most one tuple;
+        otherwise None. A compact INNER JOIN on the right table does not keep the order of the product.
+        """
+        if any(len(table) == 0 for table in tables) or not isinstance(condition, dict):
+            return None
+        conjuncts = condition['and'] if list(condition) == ['and'] else [condition]
+
+        def _resolve(operand):
+            # (table index, attribute index) of an unambiguous attribute
+            if not isinstance(operand, str):
+                return None
+            candidates = [
+                (side, idx)
+                for side, table in enumerate(tables) for idx, attr in enumerate(table.attributes) if attr == operand
+            ]
+            return candidates[0] if len(candidates) == 1 else None
+
+        equalities = []
+        for conjunct in conjuncts:
+            if isinstance(conjunct, dict) and list(conjunct) == ['eq'] and len(conjunct['eq']) == 2:
+                operands = [_resolve(operand) for operand in conjunct['eq']]
+                if None not in operands and operands[0][0] != operands[1][0]:
+                    equalities.append(sorted(operands))
+
+        if outer:
+            # LEFT JOIN lists the tuples of the left table in order
+            keyed_tables = [1]
+        elif self.scope.is_ordered:
+            # INNER JOIN lists the product of a right tuple and left tuples in order
+            keyed_tables = [0]
+        else:
+            keyed_tables = [0, 1]
+        for keyed in keyed_tables:
+            # key column -> the attribute of the other table
+            keyed_columns = {
+                self._base_column(tables[keyed], pair[keyed][1]): pair[1 - keyed][1]
+                for pair in equalities
+            }
+            keyed_columns.pop(None, None)
+            for key in itertools.chain(*self.scope.primary_keys.values()):
+                if all(column in keyed_columns for column in key):
+                    # e.g., `EMP LEFT JOIN DEPT ON EMP.DEPTNO = DEPT.DEPTNO` with the foreign key EMP.DEPTNO
+                    total = len(conjuncts) == 1 and len(key) == 1 and \
+                            (self._base_column(tables[1 - keyed], keyed_columns[key[0]]), key[0]) in \
+                            self.scope.foreign_keys
+                    return FKeyJoinTable(self.scope, tables, condition, keyed=keyed, outer=outer, total=total)
+        return None
+
     def parse_join_clause(self, join_query, ctx: Context):
         def _find_tables(join_query):
             if is_cross_join(join_query):
@@ -493,10 +378,12 @@ class Encoder:
                         by = 'using'
                     else:
                         raise NotImplementedError(f"INNER JOIN only supports ON/USING, not {join_query[1]['using']}")
-                    table = FInnerJoinTable(self.scope, table_list, condition, by)
-                    if table.condition is not None:
-                        # note that ON condition could be VERY complicate, we use a filter table to deal with it
-                        table = FFilterTable(self.scope, table, table.condition)
+                    table = self._key_join(table_list, condition) if by == 'on' else None
+                    if table is None:
+                        table = FInnerJoinTable(self.scope, table_list, condition, by)
+                        if table.condition is not None:
+                            # note that ON condition could be VERY complicate, we use a filter table to deal with it
+                            table = FFilterTable(self.scope, table, table.condition)
                 else:
                     table = FEmptyTable(
                         self.scope,
@@ -530,10 +417,12 @@ class Encoder:
                 else:
                     raise SyntaxError(f"OUTER JOIN only supports ON/USING, not `{join_query[1]['using']}`")
                 if join_type == 'left outer join' or join_type == 'left join':
-                    table = FLeftOuterJoinTable(self.scope, table_list, condition, by)
-                    if table.condition is not None:
-                        # note that ON condition could be VERY complicate, we use a filter table to deal with it
-                        table = FFilterTable(self.scope, table, table.condition)
+                    table = self._key_join(table_list, condition, outer=True) if by == 'on' else None
+                    if table is None:
+                        table = FLeftOuterJoinTable(self.scope, table_list, condition, by)
+                        if table.condition is not None:
+                            # note that ON condition could be VERY complicate, we use a filter table to deal with it
+                            table = FFilterTable(self.scope, table, table.condition)
                 elif join_type == 'right outer join' or join_type == 'right join':
                     table = FRightOuterJoinTable(self.scope, table_list, condition, by)
                     ctx.right_outer_table = True
@@ -775,7 +664,7 @@ class Encoder:
                         attr = attr.detach()
                     candidates.append(attr)
         if len(candidates) == 0:
-            LOGGER.debug(f'Unknown column [{name}] in field list. We will create a string constant.')
+            LOGGER.debug('Unknown column [%s] in field list. We will create a string constant.', name)
         elif len(candidates) > 1:
             # if this GROUP-BY/ORDER-BY attribute is ambiguous, refer attribute in SELECT CLAUSE
             if ctx is not None and ctx.select_clause is not None:
@@ -860,6 +749,7 @@ class Encoder:
                     # correlated_subquery_ctx = self.analyze(copy(expr))
                     correlated_subquery_ctx = self.analyze(expr, outer_ctx=ctx)
                     referred_table = correlated_subquery_ctx.prev_database
+                    referred_table.refers_outer_query |= correlated_subquery_ctx.is_correlated_subquery
                 except UnknownColumnError as uc_err:
                     raise CorrelatedQueryError(expr)
                 return referred_table
@@ -930,7 +820,7 @@ class Encoder:
                                 ctx.is_correlated_subquery = correlated_subquery_ctx.is_correlated_subquery
                             except UnknownColumnError as uc_err:
                                 raise CorrelatedQueryError(operands[1])
-                            return FExistsPredicate(correlated_subquery_ctx.prev_database)
+                            return FExistsPredicate(self._decorrelate(correlated_subquery_ctx))
                             # raise NotSupportedError('EXISTS')
                         return FIsNotNullPredicate(self.parse_expression(operands, ctx, **kwargs))
                 case 'missing' | 'isnull':
@@ -960,6 +850,10 @@ class Encoder:
                             if clause['when'] == True:
                                 clauses.append(clause['then'])
                                 break
+                            if is_subquery_compared_to_bool(clause['when']):
+                                # the parser binds `= TRUE` to the subquery rather than to the IN predicate,
+                                # and a subquery compared with a boolean has no sound encoding
+                                raise NotSupportedError("CASE condition compares a subquery with a boolean")
 
                             clauses.append(self.parse_expression(clause['when'], ctx, **kwargs))
                             clauses.append(self.parse_expression(clause['then'], ctx, **kwargs))
@@ -1083,7 +977,8 @@ class Encoder:
                             correlated_subquery_ctx = self.analyze(operands[1], outer_ctx=ctx, groupby_fuzzy=True)
                             # why fuzzy = true ?
                             # SESSION_ID NOT IN (SELECT SESSION_ID FROM PLAYBACK P JOIN ADS A USING (CUSTOMER_ID) WHERE A.TIMESTAMP BETWEEN START_TIME AND END_TIME GROUP BY CUSTOMER_ID)
-                            values = correlated_subquery_ctx.prev_database
+                            values = self._decorrelate(correlated_subquery_ctx, in_predicate=True)
+                            values.refers_outer_query |= correlated_subquery_ctx.is_correlated_subquery
                             ctx.is_correlated_subquery = correlated_subquery_ctx.is_correlated_subquery
                         except UnknownColumnError as uc_err:
                             raise CorrelatedQueryError(operands[1])
@@ -1117,7 +1012,8 @@ class Encoder:
                             correlated_subquery_ctx = self.analyze(operands[1], outer_ctx=ctx, groupby_fuzzy=True)
                             # why fuzzy = true ?
                             # SESSION_ID NOT IN (SELECT SESSION_ID FROM PLAYBACK P JOIN ADS A USING (CUSTOMER_ID) WHERE A.TIMESTAMP BETWEEN START_TIME AND END_TIME GROUP BY CUSTOMER_ID)
-                            values = correlated_subquery_ctx.prev_database
+                            values = self._decorrelate(correlated_subquery_ctx, in_predicate=True)
+                            values.refers_outer_query |= correlated_subquery_ctx.is_correlated_subquery
                             ctx.is_correlated_subquery = correlated_subquery_ctx.is_correlated_subquery
                         except UnknownColumnError as uc_err:
                             raise CorrelatedQueryError(operands[1])
@@ -1442,7 +1338,7 @@ class Encoder:
                 #     attr.prefix = alias_table
                 #     attr.value = alias_attr
                 condition = [src_table.attributes, dst_attributes]
-            dst_table = FAliasTable(self.scope, src_table, condition=condition, name=alias_table)
+            dst_table = FAliasTable(self.scope, src_table, condition=condition, name=alias_table, materialized=True)
             ctx.update_with_clause([dst_table])
             if dst_table.name in self.scope.base_databases:
                 self.scope.base_databases[f'{dst_table.name}{BACKUP_SUFFIX}'] = self.scope.base_databases[
@@ -1459,35 +1355,6 @@ class Encoder:
 
     ############################ filter(where) ############################
 
-    def parse_case_condition_in_where_clause(self, cond, ctx, **kwargs):
-        # swap_func = kwargs.get('swap_func', None)  # swap function from `JOIN ON`
-        cond = self.parse_expression(cond, ctx)
-        if cond is not None and not isinstance(cond, FExpression | ExcutableType):
-            cond = FIsTruePredicate(cond)
-
-        rewritten_conds = linearize_case(cond)
-        if cond == rewritten_conds:
-            return cond
-        else:
-            if isinstance(cond, FCasePredicate):
-                for idx, cond in enumerate(rewritten_conds):
-                    rewritten_conds[idx] = FExpression(FOperator('and'), list(cond))
-            if isinstance(rewritten_conds, FExpression | NumericType | bool | FDigits):
-                rewritten_conds = [rewritten_conds]
-            filtered_conds = []
-            for cond in rewritten_conds:
-                if isinstance(cond, FNull) or is_false(cond):
-                    continue
-                elif is_true(cond):
-                    filtered_conds.append(cond)
-                else:
-                    cond = _refine_expression(cond)
-                    if isinstance(cond, FNull) or is_false(cond):
-                        continue
-                    else:
-                        filtered_conds.append(cond)
-            return filtered_conds
-
     def parse_where_clause(self, cond: Optional[PredicateType], ctx: Context) -> TableType:
         if cond == False:  # WHERE FALSE
             # table = FEmptyTable(self.scope, attributes=ctx.attributes)
@@ -1495,23 +1362,11 @@ class Encoder:
         elif cond is None:
             table = ctx.prev_database
         else:
-            conds = self.parse_case_condition_in_where_clause(cond, ctx)
-            if isinstance(conds, list):
-                tables = []
-                for cond in conds:
-                    if cond == True:
-                        table = ctx.prev_database
-                    else:
-                        table = FFilterTable(self.scope, ctx.prev_database, cond)
-                    tables.append(table)
-            else:
-                tables = [FFilterTable(self.scope, ctx.prev_database, conds, ctx.is_correlated_subquery)]
-            if len(tables) == 0:
-                table = FEmptyTable(self.scope, attributes=ctx.attributes)
-            elif len(tables) == 1:
-                table = tables[0]
-            else:
-                table = FUnionAllTable(self.scope, tables)
+            # CASE is encoded as a single If chain by the visitor rather than a union of filters per branch
+            cond = self.parse_expression(cond, ctx)
+            if cond is not None and not isinstance(cond, FExpression | ExcutableType):
+                cond = FIsTruePredicate(cond)
+            table = FFilterTable(self.scope, ctx.prev_database, cond, ctx.is_correlated_subquery)
         ctx.update_where_clause(table)
         return table
 
@@ -1710,40 +1565,28 @@ class Encoder:
 
     ############################ group by ############################
 
-    def _linear_case_groupby(self, groupby_clause, select_clause):
-        # if GROUB-BY includes CASE, we need distribute cases
-        # condition, key
+    def _case_groupby_keys(self, groupby_clause, select_clause):
+        # a CASE key is grouped by its value, where a digit branch is a Group-by sugar index of SELECT
         groupby_keys = []
         for clause in groupby_clause:
             if isinstance(clause, FCasePredicate):
-                conds, exprs = clause.when_clauses, clause.then_clauses
-                if len(conds) == 1:
-                    # Not(cond) or cond is NULL
-                    else_cond = FExpression(FOperator('not'), copy(conds))
-                    else_cond = FIsNullOrHoldPredicate(else_cond)
-                else:
-                    else_cond = FExpression(FOperator('not'), [FExpression(FOperator('or'), copy(conds))])
-                    else_cond = FIsNullOrHoldPredicate(else_cond)
-                conds.append(else_cond)
-                exprs.append(clause.else_clause)
-                for idx, expr in enumerate(exprs):
+                # THEN clauses are at odd indices and ELSE is the last operand
+                for idx in list(range(1, len(clause) - 1, 2)) + [len(clause) - 1]:
+                    expr = clause.operands[idx]
                     if isinstance(expr, FDigits):
                         if expr.value > len(select_clause):
                             raise SyntaxError(f'Group-by sugar index `{expr.value}` is out-of-index.')
                         else:
-                            exprs[idx] = select_clause[expr.value - 1]
-                groupby_keys.append(list(zip(conds, exprs)))
-            else:
-                groupby_keys.append([(None, clause)])
-        groupby_keys = list(itertools.product(*groupby_keys))
-        return groupby_keys
+                            clause.operands[idx] = select_clause[expr.value - 1]
+            groupby_keys.append((None, clause))
+        return [groupby_keys]
 
     def parse_groupby_clause(self, groupby_clause, select_clause, ctx: Context, groupby_fuzzy=False) -> TableType:
         # we apply groupby, having, orderby, projection together.
         if isinstance(ctx.prev_database, FEmptyTable):
             table = ctx.prev_database
         else:
-            groupby_clause = self._linear_case_groupby(groupby_clause, select_clause)
+            groupby_clause = self._case_groupby_keys(groupby_clause, select_clause)
             table = FGroupByTable.build(self.scope, ctx.prev_database, groupby_clause, select_clause,
                                         groupby_fuzzy=groupby_fuzzy)
             if len(table) == 0:
@@ -1949,10 +1792,44 @@ class Encoder:
                 )
         )
 
+    def _decorrelate(self, ctx: Context, in_predicate: bool = False) -> TableType:
+        """
+        decorrelate `SELECT [DISTINCT] attributes FROM table WHERE condition` of EXISTS/IN/NOT IN into a semi-join,
+        if only its WHERE clause refers to outer queries
+        """
+        table = ctx.prev_database
+        if not ctx.is_correlated_subquery or ctx.is_correlated_from_clause:
+            return table
+        # duplicates make no difference to EXISTS/IN/NOT IN
+        if isinstance(table, FDistinctTable):
+            table = table.fathers[0]
+        projection = None
+        if isinstance(table, FFakeProjectionTable) or \
+                (isinstance(table, FProjectionTable) and not table.pity_flag and not in_predicate):
+            projection, table = table, table.fathers[0]
+        if type(table) is not FFilterTable or not table.is_correlated_subquery or \
+                isinstance(table.fathers[0], FOuterJoinBaseTable) or table.fathers[0].has_correlated_subquery():
+            return ctx.prev_database
+        if in_predicate and projection is not None:
+            # IN/NOT IN compare the selected attributes of tuples
+            attributes = projection.attributes
+            if not all(isinstance(attr, FAttribute) and attr in table.attributes for attr in attributes):
+                return ctx.prev_database
+        else:
+            attributes = table.attributes
+        return FSemiJoinTable(self.scope, table.fathers[0], [tuple.condition for tuple in table], attributes)
+
     def analyze(self, query, ctx: Context = None, with_databases=None, outer_ctx: Context = None,
                 **kwargs) -> TableType:
         if ctx is None:
             ctx = self.create_ctx(with_databases, outer_ctx)
+        if outer_ctx is not None:
+            # subqueries might read attributes of outer queries
+            self.scope.subquery_depth += 1
+            try:
+                return self.analyze(query, ctx, **kwargs)
+            finally:
+                self.scope.subquery_depth -= 1
         if isinstance(query, dict):
             # --------- WITH ---------#
             with_flag = False
@@ -1972,6 +1849,7 @@ class Encoder:
                     from_clause = query['from']
                     LOGGER.debug(from_clause)
                     self.parse_from_clause(from_clause, ctx)
+                    ctx.is_correlated_from_clause = ctx.is_correlated_subquery
                 else:
                     raise NotSupportedError("Query must have a FROM clause")
                 # --------- WHERE ---------#
@@ -17,14 +17,17 @@ from z3 import (
     IntSort,
     Const,
 
-    Solver,
-
     Function,
 
     sat,
     unknown,
+    is_true,
+    is_false,
+    is_int_value,
+    is_rational_value,
 )
 
+import fast_ast
 import utils
 from constants import *
 from errors import (
@@ -52,9 +55,14 @@ from formulas.tuples import (
     FBaseTuple,
     FField,
 )
-from logger import LOGGER
+from logger import (
+    LOGGER,
+    Lazy,
+    TRACER,
+)
 from parsers import SQLParser
 from scope import Scope
+from solving_profiles import get_solving_profile
 from utils import CodeSnippet
 from verifiers import (
     Verifier,
@@ -64,10 +72,32 @@ from verifiers import (
 from visitors.interm_function import IntermFunc
 from visitors.visitor import Visitor
 from writers.script import Script
+from writers.smt2 import (
+    smt2_file_name,
+    write_smt2,
+)
 
 UN_SUPPORTED_CAST_TYPE = FVarchar | FTime | FTimestamp
 
 
+def _model_value(model, term, model_completion=False):
+    """
+    python value of a z3 term in a model, read by numeric accessors rather than `eval(str(...))`
+    """
+    term = model.eval(term, model_completion=model_completion)
+    if is_true(term):
+        return True
+    elif is_false(term):
+        return False
+    elif is_int_value(term):
+        return term.as_long()
+    elif is_rational_value(term):
+        fraction = term.as_fraction()
+        return fraction.numerator if fraction.denominator == 1 else fraction.numerator / fraction.denominator
+    else:
+        return eval(str(term))
+
+
 class Environment:
     # for verifiers and aggregation functions to write code in files
     Tuple1 = 'tuple1'
@@ -87,8 +117,8 @@ class Environment:
     SUM_FUNCTION = Function('SUM', TupleSort, StringSort, VarSort)
 
     def __init__(self, generate_code=False, semantics=None, timer=False, show_counterexample=False,
-                 dialect=DIALECT.ALL,
-                 **kwargs):
+                 dialect=DIALECT.ALL, profile=None, smt2_dir=None, solve=True,
+                 parser_backend=PARSER_BACKEND.MO_SQL_PARSING, **kwargs):
         if generate_code:
             self._script_writer = Script()
             self.sql_code = {'tables': {}, 'sql1': None, 'sql2': None}
@@ -96,6 +126,8 @@ class Environment:
             self._script_writer = self.sql_code = None
         self.show_counterexample = show_counterexample
         self.counterexample = None
+        # z3 model of the counterexample over the original (not preprocessed) goal
+        self.model = None
         self.counterexample_dict = defaultdict(list) # for Demo frontend
         if semantics == 'bag':
             self.verifier = BagSemanticsVerifier(self)
@@ -108,11 +140,20 @@ class Environment:
             LOGGER.debug("Semantics: auto")
         self.traversing_time = time() if timer else None
         self.solving_time = None
-        self.solver = Solver(ctx=Z3_CONTEXT)
+        # time of tactic preprocessing, included in the solving time
+        self.preprocessing_time = None
+        self.profile = get_solving_profile(profile)
+        self.solver = self.profile.solver(ctx=Z3_CONTEXT)
+        # export equivalence goals into `<pair hash>_<bound size>.smt2` files under `smt2_dir`,
+        # and only export them if not `solve`
+        self.smt2_dir = smt2_dir
+        self.smt2_file = None
+        self.solve = solve
+        LOGGER.debug("Solving profile: %s", self.profile)
         self.visitor = Visitor(self)
         self.symbolic_count = 1
         self.dialect = dialect
-        LOGGER.debug(f"SQL dialect: {self.dialect}")
+        LOGGER.debug("SQL dialect: %s", self.dialect)
 
         self.attributes = {}
         self.variables = {}
@@ -124,7 +165,10 @@ class Environment:
         self.base_databases = {}
         self._database_num = 1
         self.DBMS_facts = []
-        self.sql_parser = SQLParser()
+        # declared keys over base columns, e.g., {'DEPT': [('DEPT__DEPTNO',)]} and {('EMP__DEPTNO', 'DEPT__DEPTNO')}
+        self.primary_keys = defaultdict(list)
+        self.foreign_keys = set()
+        self.sql_parser = SQLParser(backend=parser_backend)
         self.checkpoints = {
             'databases': OrderedSet(),
             'tuples': OrderedSet(),
@@ -140,6 +184,12 @@ class Environment:
 
         # works for MAX/MIN
         self.bound_constraints = set()
+        # memo of pure attribute applications, (attribute uuid, tuple sort id) -> FExpressionTuple
+        self.attribute_applications = {}
+        # hash-consing of tables across/within queries, table key -> tuple sorts of the 1st table with that key
+        self.shared_tuple_sorts = {}
+        # tuple sorts whose defining formulas have been registered by a visitor, name -> defined attribute keys
+        self.encoded_tuple_sorts = {}
 
     def _define_COUNT_ALL(self):
         all_value = Const(f"COUNT_ALL__{self.StringSort}", self.StringSort)
@@ -170,6 +220,7 @@ class Environment:
         self.functions.clear()
         self.databases.clear()
         self.tuple_sorts.clear()
+        self.attribute_applications.clear()
         self.variables.clear()
         self.attributes.clear()
         del self.sql_parser
@@ -265,6 +316,29 @@ class Environment:
             )
         return tuple
 
+    def _alias_tuple_sort(self, name, tuple_sort):
+        """
+        alias a tuple sort to an existing one, instead of declaring a fresh z3 tuple sort and asserting
+        `fresh_tuple == tuple_sort`
+        """
+        self.register_tuple_sort(name, tuple_sort)
+        return tuple_sort
+
+    def find_shared_tuple_sorts(self, key, size: int):
+        """
+        tuple sorts of a previous table with the same structural key, see `formulas._utils.table_key`
+        """
+        if key is None:
+            return None
+        sorts = self.shared_tuple_sorts.get(key, None)
+        if sorts is None or len(sorts) != size:
+            return None
+        return sorts
+
+    def share_tuple_sorts(self, key, tuples):
+        if key is not None and key not in self.shared_tuple_sorts:
+            self.shared_tuple_sorts[key] = [tuple.SORT for tuple in tuples]
+
     def _get_new_tuple_sort(self) -> str:
         new_tuple = f't{len(self.tuple_sorts) + 1}'
         return self._declare_tuple_sort(new_tuple)
@@ -435,7 +509,7 @@ class Environment:
         # to register a String Sort to verify NULL
         self._declare_variable(attribute)
         attribute.NULL = IntermFunc(
-            z3_function=lambda x, **kwargs: self.NULL(x, attribute.__STRING_SORT__),
+            z3_function=lambda x, **kwargs: fast_ast.app(self.NULL, x, attribute.__STRING_SORT__),
             description=f'{self.NULL}(?, {attribute.__STRING_SORT__})',
         )
         self._declare_function(attribute)
@@ -485,6 +559,105 @@ class Environment:
     def register_base_table(self, table, name):
         self.base_databases[name] = table
 
+    def prune_schema(self, schema: Dict, constraints: Sequence | None, *queries: str):
+        """
+        keep the tables referenced by `queries` and their foreign-key closure, and the constraints over them
+
+        A table that is only referenced by a foreign key of a pruned table is pruned with that foreign key.
+        """
+        table_names = {str.upper(name) for name in schema}
+        try:
+            tables = set()
+            for query in queries:
+                tables |= utils.referenced_tables(self.parse_sql_query(query), table_names)
+        except Exception:
+            # leave errors of queries to `analyze`
+            return schema, constraints
+        if constraints is None:
+            return {name: schema[name] for name in schema if str.upper(name) in tables}, constraints
+
+        constraint_tables = [utils.referenced_tables(constraint, table_names) for constraint in constraints]
+        updated = True
+        while updated:
+            updated = False
+            for constraint, related_tables in zip(constraints, constraint_tables):
+                if isinstance(constraint, dict) and 'foreign' in constraint:
+                    # only the referencing table requires the referenced one
+                    src_tables = utils.referenced_tables(constraint['foreign'][0], table_names)
+                    if src_tables <= tables and not related_tables <= tables:
+                        tables |= related_tables
+                        updated = True
+                elif len(related_tables & tables) > 0 and not related_tables <= tables:
+                    tables |= related_tables
+                    updated = True
+        schema = {name: schema[name] for name in schema if str.upper(name) in tables}
+        constraints = [
+            constraint for constraint, related_tables in zip(constraints, constraint_tables)
+            if related_tables <= tables
+        ]
+        LOGGER.debug("Referenced tables: %s", Lazy(sorted, tables))
+        return schema, constraints
+
+    def prune_columns(self, schema: Dict, constraints: Sequence | None, *queries: str):
+        """
+        keep the live columns, i.e., columns named by `queries` and columns linked to them by constraints,
+        and the constraints over them
+
+        A column that is only referenced by a foreign key of a pruned column is pruned with that foreign key.
+        """
+        try:
+            columns = set()
+            for query in queries:
+                query_columns = utils.referenced_columns(self.parse_sql_query(query))
+                if query_columns is None:
+                    # SELECT *, T.*, NATURAL JOIN
+                    return schema, constraints
+                columns |= query_columns
+        except Exception:
+            # leave errors of queries to `analyze`
+            return schema, constraints
+
+        live_columns = {
+            f'{str.upper(name)}__{str.upper(attr)}'
+            for name, attributes in schema.items() for attr in attributes
+            if str.upper(attr) in columns
+        }
+        if constraints is not None:
+            constraint_columns = [
+                {column for column in utils.identifiers(constraint) if '__' in column} for constraint in constraints
+            ]
+            updated = True
+            while updated:
+                updated = False
+                for constraint, related_columns in zip(constraints, constraint_columns):
+                    if isinstance(constraint, dict) and 'foreign' in constraint:
+                        # only the referencing columns require the referenced ones
+                        src_columns = utils.identifiers(constraint['foreign'][0])
+                        is_live = len(src_columns & live_columns) > 0
+                    else:
+                        is_live = len(related_columns & live_columns) > 0
+                    if is_live and not related_columns <= live_columns:
+                        live_columns |= related_columns
+                        updated = True
+            constraints = [
+                constraint for constraint, related_columns in zip(constraints, constraint_columns)
+                if related_columns <= live_columns
+            ]
+
+        pruned_schema = {}
+        for name, attributes in schema.items():
+            pruned_attributes = {
+                attr: type for attr, type in attributes.items()
+                if f'{str.upper(name)}__{str.upper(attr)}' in live_columns
+            }
+            if len(pruned_attributes) == 0 and len(attributes) > 0:
+                # a table needs at least a column, e.g., SELECT COUNT(*) FROM T
+                attr = list(attributes)[0]
+                pruned_attributes[attr] = attributes[attr]
+            pruned_schema[name] = pruned_attributes
+        LOGGER.debug("Live columns: %s", Lazy(sorted, live_columns))
+        return pruned_schema, constraints
+
     def create_database(
             self,
             attributes: Dict,
@@ -565,7 +738,8 @@ class Environment:
             self.DBMS_facts.extend(type_constraints)
         table = self._declare_table(tuples, name)
         self.register_base_table(table, table.name)
-        LOGGER.debug(pprint.pformat(self.databases))
+        # formatting all databases is linear in their tuples, which is only paid if debugging
+        LOGGER.debug("%s", Lazy(pprint.pformat, self.databases))
 
     def add_constraints(self, constraints):
         if constraints is None:
@@ -753,10 +927,28 @@ class Environment:
                 raise NotImplementedError(expr)
 
         for constraint in constraints:
+            self._register_keys(constraint)
             constraint = _f(constraint)
             if constraint is not None:
                 self.DBMS_facts.append(constraint)
 
+    def _register_keys(self, constraint):
+        """
+        record primary/foreign keys of base columns, which let the encoder compact joins on keys
+        """
+        if not isinstance(constraint, dict) or len(constraint) != 1:
+            return
+        operator, operands = list(constraint.items())[0]
+        if operator not in ['primary', 'foreign'] or not isinstance(operands, list):
+            return
+        columns = [opd.get('value', None) if isinstance(opd, dict) else opd for opd in operands]
+        if len(columns) == 0 or not all(isinstance(column, str) and '__' in column for column in columns):
+            return
+        if operator == 'primary':
+            self.primary_keys[columns[0][:columns[0].find('__')]].append(tuple(columns))
+        elif len(columns) == 2:
+            self.foreign_keys.add(tuple(columns))
+
     def _get_attribute(self, attr):
         if isinstance(attr, FAttribute):
             return self.attributes.get(utils.__pos_hash__(attr), None)
@@ -784,6 +976,22 @@ class Environment:
     def _get_tuple_sort(self, tuple: str):
         return self.tuple_sorts.get(tuple, None)
 
+    def _apply_attribute(self, attribute: FAttribute, tuple_sort) -> FExpressionTuple:
+        """
+        memoized `attribute(tuple_sort)`, the same attribute over the same tuple sort shares one FExpressionTuple
+
+        The returned FExpressionTuple is shared, callers must not mutate it (e.g., `attr_tuple.VALUE = ...`), but build
+        a new one instead.
+        """
+        key = (attribute._uuid, tuple_sort.get_id())
+        out = self.attribute_applications.get(key, None)
+        # attributes with the same uuid (e.g., alias attributes) might be bound to other z3 functions
+        if out is None or out.attribute.VALUE is not attribute.VALUE or out.attribute.NULL is not attribute.NULL:
+            out = attribute(tuple_sort)
+            out.attribute, out.tuple = attribute, tuple_sort
+            self.attribute_applications[key] = out
+        return out
+
     ############################ store DBMS schemas for mulit-query comparision ############################
 
     def save_checkpoints(self):
@@ -802,6 +1010,7 @@ class Environment:
             for key in list(dict_object.keys()):
                 if key not in cp_value:
                     dict_object.pop(key)
+        self.attribute_applications.clear()
         self.solver.reset()
         self.verifier.reset()
 
@@ -823,6 +1032,12 @@ class Environment:
         return False
 
     def analyze(self, *queries, out_file: str = None):
+        if self.smt2_dir is not None:
+            # before queries are upper-cased for counterexamples
+            bound_size = max((len(table.tuples) for table in self.base_databases.values()), default=0)
+            smt2_file = os.path.join(self.smt2_dir, smt2_file_name(queries, bound_size))
+        else:
+            smt2_file = None
         if self.sql_code is not None:
             queries = list(map(str.upper, queries))
             self.sql_code['sql1'] = queries[0] if queries[0][-1] == ';' else queries[0] + ';'
@@ -834,13 +1049,17 @@ class Environment:
 
         # 1) parse SQL queries
         query_asts = [self.parse_sql_query(query) for query in queries]
+        self.shared_tuple_sorts.clear()
+        self.encoded_tuple_sorts.clear()
 
         # 2) analyze queries but do not register formulas into z3 environments,
         # and translate/visit the aforementioned queries formulas into the temporary z3 environment
         def _analyze(query, query_idx):
             with Scope(self, f'SCOPE{query_idx}') as scope:
-                ctx = scope.analyze(query)
-                tables, result_formulas = scope.visit(ctx)
+                with TRACER.span('analyze', index=query_idx):
+                    ctx = scope.analyze(query)
+                with TRACER.span('visit', index=query_idx):
+                    tables, result_formulas = scope.visit(ctx)
                 # we only consider the outermost orderby clause, otherwise it's too complicated
                 # 1) SELECT * FROM XXX ORDER BY XXX
                 # 2) SELECT XXX FROM XXX ORDER BY XXX
@@ -871,7 +1090,7 @@ class Environment:
             result_formulas.append(formulas)
 
         # 3) SQL queries equivalence verification
-        result = self.compare(tables, result_formulas)
+        result = self.compare(tables, result_formulas, smt2_file=smt2_file)
         if result == -1:
             self.sql_code = "Different #columns"
             return result
@@ -891,7 +1110,7 @@ class Environment:
         return result
 
     def compare(
-            self, tables: Sequence, result_formulas, out_file: str = None,
+            self, tables: Sequence, result_formulas, out_file: str = None, smt2_file: str = None,
     ) -> bool:
         lhs_tuple = list(tables[0].values())[0]
         rhs_tuple = list(tables[1].values())[0]
@@ -915,53 +1134,85 @@ class Environment:
                     else:
                         lhs_attr.uninterpreted_func = rhs_attr.uninterpreted_func = None
 
-        equivalence_formulas = self.verifier.run(
-            *tables, *result_formulas,
-            lhs_tuple.attributes, rhs_tuple.attributes,
-            orderby_constraints=self.orderby_constraints,
-            bound_constraints=self.bound_constraints,
-        )
+        with TRACER.span('verify', verifier=self.verifier):
+            equivalence_formulas = self.verifier.run(
+                *tables, *result_formulas,
+                lhs_tuple.attributes, rhs_tuple.attributes,
+                orderby_constraints=self.orderby_constraints,
+                bound_constraints=self.bound_constraints,
+            )
         if self.traversing_time is not None:
             self.solving_time = time()
             self.traversing_time = round(self.solving_time - self.traversing_time, 6)
-        self.solver.add(Not(equivalence_formulas))  # Not means cannot find a satisfying solution
-        out = self.solver.check()
+        # Not means cannot find a satisfying solution
+        formula = Not(equivalence_formulas)
+        goal = self.profile.preprocess(formula, Z3_CONTEXT)
+        if goal is None:
+            self.solver.add(formula)
+        else:
+            if self.solving_time is not None:
+                self.preprocessing_time = round(time() - self.solving_time, 6)
+            self.solver.add(goal.as_expr())
+        if smt2_file is not None:
+            write_smt2(self.solver, smt2_file)
+            self.smt2_file = smt2_file
+            LOGGER.debug('SMT-LIB2 file: %s', smt2_file)
+        if not self.solve:
+            self.solving_time = None
+            return None
+        with TRACER.span('solve', profile=self.profile.name) as span:
+            out = self.solver.check()
+            span.set(result=out)
         if self.solving_time is not None:
             self.solving_time = round(time() - self.solving_time, 6)
-        LOGGER.debug(f'Symbolic Reasoning Output: ==> {out} <==')
+        LOGGER.debug('Symbolic Reasoning Output: ==> %s <==', out)
         if out == sat:
             model = self.solver.model()
+            if goal is not None:
+                # recover the variables eliminated by preprocessing
+                model = goal.convert_model(model)
+            self.model = model
             LOGGER.debug(model)
             self.counterexample = "-- ----------An counterexample found by VeriEQL------------\n"
 
-            def _f(null, value, out_str=False, data_preix=None, type=None):
-                if not isinstance(null, bool):
-                    null = eval(str(model.eval(null, model_completion=True)))
-                if null:
-                    value = 99999
-                else:
-                    if not isinstance(value, int | float):
-                        value = eval(str(model.eval(value, model_completion=False)))
-
-                if value == 99999:
-                    return 'NULL'
-                else:
-                    if out_str:
-                        return f"'{value}'"
-                    else:
-                        value = value if data_preix is None else f"'{data_preix + str(value)}'"
-                        if type == 'boolean':
-                            return value != 0
-                        else:
-                            return value
+            def _cells(tuple, attributes):
+                # a tuple's cells in the model, where NULL cells (and the 99999 placeholder) are 'NULL'
+                values = []
+                for attr in attributes:
+                    null, value = attr.NULL(tuple.SORT), attr.VALUE(tuple.SORT)
+                    if not isinstance(null, bool):
+                        null = _model_value(model, null, model_completion=True)
+                    if null:
+                        value = 'NULL'
+                    elif not isinstance(value, int | float):
+                        value = _model_value(model, value)
+                    values.append('NULL' if value == 99999 else value)
+                return values
+
+            def _output_rows(table):
+                # non-deleted tuples of an output table, string variables are mapped back to their strings
+                rows = []
+                for tuple in table.values():
+                    if _model_value(model, self.DELETED_FUNCTION(tuple.SORT), model_completion=True) is True:
+                        continue
+                    values = []
+                    for v in _cells(tuple, tuple.attributes):
+                        if v in self.variables:
+                            v = str(self.variables[v])
+                            if v.startswith('String_'):
+                                v = v[7:]
+                            v = v.split('__')[0]
+                        values.append(v)
+                    rows.append(values)
+                return rows
 
             if self.sql_code is not None:
                 for name, basetable in self.base_databases.items():
                     insert_rows = []
+                    column_types = self.sql_code['tables'][basetable.name]
                     for tuple in basetable.tuples:
                         values = []
-                        for idx, attr in enumerate(basetable.attributes, start=1):
-                            v = _f(attr.NULL(tuple.SORT), attr.VALUE(tuple.SORT))
+                        for attr, v in zip(basetable.attributes, _cells(tuple, basetable.attributes)):
                             if str.startswith(self.sql_code['tables'][attr.prefix][attr.name], "VARCHAR"):
                                 if v in self.variables:
                                     v = str(self.variables[v])
@@ -976,57 +1227,23 @@ class Environment:
                             values.append(v)
 
                         self.counterexample_dict[basetable.name].append(
-                            dict(zip(self.sql_code['tables'][basetable.name].keys(), [str(v) for v in values]))
+                            dict(zip(column_types.keys(), [str(v) for v in values]))
                         )
 
                         values = f"INSERT INTO {basetable.name} VALUES ({', '.join(str(v) for v in values)});\n"
                         insert_rows.append(values)
-                    attr_rows = f',\n\t'.join(
-                        f"{attr} {type}" for attr, type in self.sql_code['tables'][basetable.name].items())
+                    attr_rows = f',\n\t'.join(f"{attr} {type}" for attr, type in column_types.items())
                     self.sql_code['tables'][basetable.name] = f"CREATE TABLE {basetable.name} (\n\t{attr_rows}\n);\n"
                     self.sql_code['tables'][basetable.name] += ''.join(insert_rows)
                     if self.show_counterexample:
                         self.counterexample += self.sql_code['tables'][basetable.name]
 
                 if self.show_counterexample:
-                    self.counterexample += '-- ----------sql1------------\n'
-                for tuple in tables[0].values():
-                    if str(model.eval(self.DELETED_FUNCTION(tuple.SORT))) == 'True':
-                        continue
-
-                    values = []
-                    for attr in tuple.attributes:
-                        v = _f(attr.NULL(tuple.SORT), attr.VALUE(tuple.SORT))
-                        if v in self.variables:
-                            v = str(self.variables[v])
-                            if v.startswith('String_'):
-                                v = v[7:]
-                            v = v.split('__')[0]
-                        values.append(v)
-                    if self.show_counterexample:
-                        self.counterexample += '-- ' + ', '.join(str(v) for v in values) + '\n'
-                if self.show_counterexample:
-                    self.counterexample += self.sql_code['sql1'] + '\n'
-
-                if self.show_counterexample:
-                    self.counterexample += '-- ----------sql2------------\n'
-                for tuple in tables[1].values():
-                    if str(model.eval(self.DELETED_FUNCTION(tuple.SORT))) == 'True':
-                        continue
-
-                    values = []
-                    for attr in tuple.attributes:
-                        v = _f(attr.NULL(tuple.SORT), attr.VALUE(tuple.SORT))
-                        if v in self.variables:
-                            v = str(self.variables[v])
-                            if v.startswith('String_'):
-                                v = v[7:]
-                            v = v.split('__')[0]
-                        values.append(v)
-                    if self.show_counterexample:
-                        self.counterexample += '-- ' + ', '.join(str(v) for v in values) + '\n'
-                if self.show_counterexample:
-                    self.counterexample += self.sql_code['sql2'] + '\n'
+                    for idx, table in enumerate(tables, start=1):
+                        self.counterexample += f'-- ----------sql{idx}------------\n'
+                        for values in _output_rows(table):
+                            self.counterexample += '-- ' + ', '.join(str(v) for v in values) + '\n'
+                        self.counterexample += self.sql_code[f'sql{idx}'] + '\n'
 
             return False
         elif out == unknown:
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""
+Low-level construction of the z3 terms on the hot paths of encoding.
+
+`z3.py` type-checks and coerces every argument (`_coerce_exprs`, `domain(i).cast`, `_to_expr_ref`) on each call,
+which dominates the formulation time of large bounds. Here, we build terms by calling `z3core` directly and wrap
+results in the known Python classes. Callers must pass z3 expressions of the right sorts from the same context,
+which holds for the DELETED/NULL/column functions and the Boolean connectives over visited formulas.
+
+It only relies on the public `z3core` bindings, so it works with a stock z3-solver wheel and does not require
+replacing z3 with the patched files in `z3py_libs`.
+"""
+
+from z3 import (
+    ArithRef,
+    ArithSortRef,
+    BoolRef,
+    BoolSortRef,
+    ExprRef,
+    FuncDeclRef,
+    IntNumRef,
+    IntSort,
+    Z3Exception,
+)
+from z3.z3core import (
+    Z3_mk_app,
+    Z3_mk_and,
+    Z3_mk_or,
+    Z3_mk_not,
+    Z3_mk_ite,
+    Z3_mk_implies,
+    Z3_mk_numeral,
+)
+from z3.z3types import Ast
+
+# function declaration id -> (function declaration, class of its applications)
+_APP_CLASSES = {}
+# (context id, value) -> IntNumRef
+_INT_VALUES = {}
+
+
+def _array(args):
+    array = (Ast * len(args))()
+    for idx, arg in enumerate(args):
+        array[idx] = arg.ast
+    return array
+
+
+def _app_class(function):
+    key = id(function)
+    if key not in _APP_CLASSES:
+        range_sort = function.range()
+        if isinstance(range_sort, BoolSortRef):
+            cls = BoolRef
+        elif isinstance(range_sort, ArithSortRef):
+            cls = ArithRef
+        else:
+            cls = ExprRef
+        # keep the function alive, otherwise its id might be reused
+        _APP_CLASSES[key] = (function, cls)
+    return _APP_CLASSES[key][1]
+
+
+def app(function, *args):
+    """
+    `function(*args)` without coercion, e.g., DELETED(t1), NULL(t1, EMP__AGE__String), EMP__AGE(t1)
+    """
+    if function.__class__ is not FuncDeclRef:
+        # IntermFunc
+        return function(*args)
+    try:
+        return _app_class(function)(
+            Z3_mk_app(function.ctx_ref(), function.ast, len(args), _array(args)),
+            function.ctx,
+        )
+    except (AttributeError, Z3Exception):
+        # Python literals or mismatched sorts, fall back to z3's coercion
+        return function(*args)
+
+
+def And(*args):
+    ctx = args[0].ctx
+    return BoolRef(Z3_mk_and(ctx.ref(), len(args), _array(args)), ctx)
+
+
+def Or(*args):
+    ctx = args[0].ctx
+    return BoolRef(Z3_mk_or(ctx.ref(), len(args), _array(args)), ctx)
+
+
+def Not(a):
+    return BoolRef(Z3_mk_not(a.ctx.ref(), a.ast), a.ctx)
+
+
+def Implies(a, b):
+    return BoolRef(Z3_mk_implies(a.ctx.ref(), a.ast, b.ast), a.ctx)
+
+
+def If(a, b, c):
+    """
+    If(a, b, c) where `b` and `c` are both Boolean or both arithmetic expressions
+    """
+    cls = ArithRef if isinstance(b, ArithRef) else BoolRef
+    return cls(Z3_mk_ite(a.ctx.ref(), a.ast, b.ast, c.ast), a.ctx)
+
+
+def is_same_context(args, ctx) -> bool:
+    """
+    whether all args are z3 expressions in the context `ctx`, i.e., safe for the functions above
+    """
+    for arg in args:
+        if not isinstance(arg, ExprRef) or arg.ctx is not ctx:
+            return False
+    return True
+
+
+def IntVal(value, ctx):
+    """
+    cached integer numerals, e.g., IntVal('1', ctx) is IntVal(1, ctx)
+    """
+    if isinstance(value, bool):
+        value = 1 if value else 0
+    elif isinstance(value, float):
+        value = int(value)
+    key = (id(ctx), str(value))
+    if key not in _INT_VALUES:
+        _INT_VALUES[key] = IntNumRef(Z3_mk_numeral(ctx.ref(), key[1], IntSort(ctx).ast), ctx)
+    return _INT_VALUES[key]
+
+
+__all__ = [
+    'app',
+    'And',
+    'Or',
+    'Not',
+    'Implies',
+    'If',
+    'IntVal',
+    'is_same_context',
+]
@@ -9,6 +9,7 @@ FORMULA_REGISTRY = {}
 
 
 def build_fomula(*args):
+    _load_formulas()
     return FORMULA_REGISTRY
 
 
@@ -29,13 +30,23 @@ __all__ = [
     'register_formula'
 ]
 
-models_dir = os.path.dirname(__file__)
-for file in os.listdir(models_dir):
-    path = os.path.join(models_dir, file)
-    if (
-            not file.startswith('_')
-            and not file.startswith('.')
-            and (file.endswith('.py') or os.path.isdir(path))
-    ):
-        model_name = file[:file.find('.py')] if file.endswith('.py') else file
-        module = importlib.import_module('formulas.' + model_name)
+_FORMULAS_LOADED = False
+
+
+def _load_formulas():
+    # formulas register themselves once their modules are imported, which is deferred until the registry is read,
+    # so that importing a single formula (or this package) does not import all of them
+    global _FORMULAS_LOADED
+    if _FORMULAS_LOADED:
+        return
+    _FORMULAS_LOADED = True
+    models_dir = os.path.dirname(__file__)
+    for file in os.listdir(models_dir):
+        path = os.path.join(models_dir, file)
+        if (
+                not file.startswith('_')
+                and not file.startswith('.')
+                and (file.endswith('.py') or os.path.isdir(path))
+        ):
+            model_name = file[:file.find('.py')] if file.endswith('.py') else file
+            importlib.import_module('formulas.' + model_name)
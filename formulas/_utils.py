@@ -4,6 +4,8 @@ from typing import (
     Sequence,
 )
 
+from z3 import AstRef
+
 from formulas.columns import (
     FAttribute,
     AggregationType,
@@ -11,6 +13,14 @@ from formulas.columns import (
 from formulas.expressions import (
     FIfPredicate,
     FCasePredicate,
+    FExpression,
+    FIsNullPredicate,
+    FIsNotNullPredicate,
+    FIsTruePredicate,
+    FIsFalsePredicate,
+    FIsNotTruePredicate,
+    FIsNotFalsePredicate,
+    FSymbol,
 )
 from formulas.expressions.base_expression import FBaseExpression
 from formulas.expressions.digits import FDigits
@@ -46,3 +56,56 @@ def require_tuples_func(expr: FBaseExpression):
         return False
     else:
         return False
+
+
+def expression_key(expr):
+    """
+    structural key of a predicate, which is equal for predicates evaluating to the same formula on the same tuple,
+    e.g., `E.AGE > 25` and `EMP.AGE > 25`; return None if the predicate reads tables or derived attributes
+    """
+    if expr is None or isinstance(expr, bool | int | float | str):
+        return type(expr).__name__, expr
+    elif isinstance(expr, AstRef):
+        return 'z3', expr.sexpr()
+    elif isinstance(expr, FAttribute):
+        if expr.EXPR is not None or expr.require_tuples:
+            return None
+        return attribute_key(expr)
+    elif isinstance(expr, FSymbol):
+        return type(expr).__name__, type(expr.value).__name__, expr.value
+    elif type(expr) in (FExpression, FIsNullPredicate, FIsNotNullPredicate, FIsTruePredicate, FIsFalsePredicate,
+                        FIsNotTruePredicate, FIsNotFalsePredicate):
+        operands = expression_key(expr.operands)
+        if operands is None:
+            return None
+        return type(expr).__name__, str(expr.operator), operands
+    elif isinstance(expr, FCasePredicate):
+        keys = expression_key([expr.when_clauses, expr.then_clauses, expr.else_clause])
+        if keys is None:
+            return None
+        return type(expr).__name__, keys
+    elif isinstance(expr, list | tuple):
+        keys = [expression_key(operand) for operand in expr]
+        if any(key is None for key in keys):
+            return None
+        return tuple(keys)
+    else:
+        return None
+
+
+def attribute_key(attribute: FAttribute):
+    """
+    attributes applied to the same tuple sort are the same z3 terms if their z3 functions are the same
+    """
+    return 'attribute', str(attribute.VALUE), str(attribute.NULL)
+
+
+def table_key(operator: str, fathers: Sequence, *predicates):
+    """
+    structural key of a table, i.e., its operator, the tuple sorts of its fathers and its predicates.
+    Fathers sharing tuple sorts are the same tables, therefore, tables with the same keys can share tuple sorts.
+    """
+    keys = expression_key(list(predicates))
+    if keys is None:
+        return None
+    return operator, tuple(tuple(str(t.SORT) for t in table) for table in fathers), keys
@@ -4,6 +4,7 @@ from copy import copy
 
 from z3 import ArithRef
 
+import fast_ast
 from constants import (
     NumericType,
     Z3_NULL_VALUE,
@@ -95,7 +96,9 @@ class FAttribute(FBaseColumn):
         return self._uuid
 
     def __call__(self, *args, **kwargs):
-        return FExpressionTuple(self.NULL(*args, **kwargs), self.VALUE(*args, **kwargs))
+        if len(kwargs) > 0:
+            return FExpressionTuple(self.NULL(*args, **kwargs), self.VALUE(*args, **kwargs))
+        return FExpressionTuple(self.NULL(*args), fast_ast.app(self.VALUE, *args))
 
     def __expr__(self, src_tuples, **kwargs):
         from formulas.columns.aggregations import AggregationType
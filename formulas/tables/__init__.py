@@ -21,6 +21,7 @@ from .join_tables import (
     FInnerJoinTable,
     FCrossJoinTable,
     FNaturalJoinTable,
+    FKeyJoinTable,
     FOuterJoinBaseTable,
     FLeftOuterJoinTable,
     FRightOuterJoinTable,
@@ -34,6 +35,7 @@ from .offset_table import FOffsetTable
 from .order_by_table import FOrderByTable
 from .product_table import FProductTable
 from .projection_table import FProjectionTable
+from .semi_join_table import FSemiJoinTable
 from .stack_table import FStackTable
 from .union_all_table import FUnionAllTable
 from .union_table import FUnionTable
@@ -42,7 +44,7 @@ from .value_table import FValueTable
 TableType = JoinTableType | FGroupByMapTable | FGroupByTable | \
             FBaseTable | FAliasTable | FFilterTable | FProductTable | FProjectionTable | FDistinctTable | FOrderByTable | \
             FUnionTable | FUnionAllTable | FIntersectTable | FIntersectAllTable | FExceptTable | FExceptAllTable | \
-            FEmptyTable | FOffsetTable | FFetchTable | FLimitTable | FStackTable | FFakeProjectionTable
+            FEmptyTable | FOffsetTable | FFetchTable | FLimitTable | FStackTable | FFakeProjectionTable | FSemiJoinTable
 
 __all__ = [
     'FBaseTable',
@@ -56,11 +58,13 @@ __all__ = [
     'FInnerJoinTable',
     'FCrossJoinTable',
     'FNaturalJoinTable',
+    'FKeyJoinTable',
 
     'FOuterJoinBaseTable',
     'FLeftOuterJoinTable',
     'FRightOuterJoinTable',
     'FFullOuterJoinTable',
+    'FSemiJoinTable',
 
     'OuterJoinTableType',
     'JoinTableType',
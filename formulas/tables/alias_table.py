@@ -32,6 +32,7 @@ class FAliasTable(FBaseTable):
     """
     1) in most cases, we won't create new attributes and mapping values of old attributes to new ones;
     2) in union cases, father tables might have different attributes, therefore, we need to create new attributes if they are different.
+    3) a WITH clause is materialized, i.e., it is encoded once and all its references share its tuples.
     """
 
     def __init__(self,
@@ -40,9 +41,11 @@ class FAliasTable(FBaseTable):
                  condition: Sequence,
                  name: str = None,
                  alias_attributes: bool = False,
+                 materialized: bool = False,
                  ):
         tuples = _alias(scope, table, condition, alias_attributes)
         self.alias_attributes = alias_attributes
+        self.materialized = materialized
         name = name or scope._get_new_databases_name()
         super(FAliasTable, self).__init__(tuples, name)
         scope.register_database(name, self)
@@ -1,6 +1,6 @@
 # -*- coding:utf-8 -*-
 
-from copy import deepcopy
+from copy import copy
 from typing import Sequence
 
 from formulas import register_formula
@@ -19,6 +19,8 @@ class FBaseTable(BaseFormula):
         self.fathers = None
         self.root = self.name
         self.is_correlated_subquery = is_correlated_subquery
+        # whether this subquery refers to outer queries anywhere, e.g., only in its SELECT clause
+        self.refers_outer_query = is_correlated_subquery
 
     def __getitem__(self, idx):
         return self.tuples[idx]
@@ -59,10 +61,22 @@ class FBaseTable(BaseFormula):
         for attr in self.attributes:
             attr._sugar_full_name = attr._sugar_name = None
 
+    def has_correlated_subquery(self) -> bool:
+        """
+        whether this table or any table under it refers to outer queries
+        """
+        return self.is_correlated_subquery or \
+            any(father.has_correlated_subquery() for father in (self.fathers or []))
+
     def detach(self, scope, postfix):
-        out = deepcopy(self)
+        # a view sharing attributes and fields with this table, only its tuples are copied to be renamed and
+        # re-sorted, since visitors never modify formulas in place
+        out = copy(self)
         out.name = f"{out.name}_{postfix}"
-        for idx, tuple in enumerate(out.tuples):
+        out.tuples = []
+        for tuple in self.tuples:
+            tuple = copy(tuple)
             tuple.name = f"{tuple.name}_{postfix}"
             tuple.SORT = scope._declare_tuple_sort(tuple.name)
+            out.tuples.append(tuple)
         return out
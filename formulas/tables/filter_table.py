@@ -1,6 +1,7 @@
 # -*- coding:utf-8 -*-
 
 from formulas import register_formula
+from formulas._utils import table_key
 from formulas.expressions import (
     PredicateType,
 )
@@ -15,7 +16,13 @@ def _filter(
         scope,
         table: FBaseTable,
         condition: PredicateType,
+        is_correlated_subquery: bool = False,
 ):
+    if is_correlated_subquery or scope.subquery_depth > 0 or isinstance(table, FOuterJoinBaseTable):
+        key = None
+    else:
+        key = table_key('filter', [table], condition)
+    shared_sorts = scope.find_shared_tuple_sorts(key, len(table))
     new_table = []
     for idx, prev_tuple in enumerate(table):
         if isinstance(condition, list):
@@ -23,8 +30,16 @@ def _filter(
         else:
             tuple = FFilterTuple(prev_tuple, condition, name=scope._get_new_tuple_name())
         scope.register_tuple(tuple.name, tuple)
-        tuple.SORT = scope._declare_tuple_sort(tuple.name)
+        if tuple.condition is True and not isinstance(table, FOuterJoinBaseTable):
+            # a tautological filter only renames its previous tuple
+            tuple.SORT = scope._alias_tuple_sort(tuple.name, prev_tuple.SORT)
+        elif shared_sorts is not None:
+            # the same filter over the same tuples has been analyzed
+            tuple.SORT = scope._alias_tuple_sort(tuple.name, shared_sorts[idx])
+        else:
+            tuple.SORT = scope._declare_tuple_sort(tuple.name)
         new_table.append(tuple)
+    scope.share_tuple_sorts(key, new_table)
 
     if isinstance(table, FOuterJoinBaseTable):
         for mutex_indices in table._children:
@@ -42,7 +57,7 @@ class FFilterTable(FBaseTable):
                  is_correlated_subquery: bool = False,
                  name: str = None,
                  ):
-        tuples = _filter(scope, table, condition)
+        tuples = _filter(scope, table, condition, is_correlated_subquery)
         if name is None:
             name = scope._get_new_databases_name()
         super(FFilterTable, self).__init__(tuples, name, is_correlated_subquery)
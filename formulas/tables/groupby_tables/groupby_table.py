@@ -9,12 +9,8 @@ from ordered_set import OrderedSet
 from z3 import Function
 
 from formulas import register_formula
-from formulas.expressions.expression import FExpression
-from formulas.expressions.operator import FOperator
 from formulas.tables.base_table import FBaseTable
-from formulas.tables.filter_table import FFilterTable
 from formulas.tables.groupby_tables.groupby_map_table import FGroupByMapTable
-from formulas.tables.union_all_table import FUnionAllTable
 from writers.code_writer import CodeSnippet
 
 
@@ -81,47 +77,21 @@ class FGroupByTable(FBaseTable):
               groupby_fuzzy=False,
               name: str = None,
               ):
-        if len(groupby_clause) == 1:
-            groupby_keys = [key for _, key in groupby_clause[0]]
-            groupby_keys = [groupby_keys for _ in range(len(table))]
-            name = name or scope._get_new_databases_name()
-            func = Function(f'{name}_GROUP_FUNC', scope.TupleSort, scope.VarSort, scope.BooleanSort)
-            scope.register_function(name=str(func), function=func)
-            if scope._script_writer is not None:
-                scope._script_writer.function_declaration.append(
-                    CodeSnippet(
-                        code=f"{func} = Function('{func}', __TupleSort, __Int, __Boolean)",
-                        docstring=f'define `{func}` function to partition tuples into groups',
-                    )
-                )
-            table = cls(scope, table, groupby_keys, func, select_clause,
-                        is_vanilla_grouby_keys=True, groupby_fuzzy=groupby_fuzzy, name=name)
-        else:
-            filter_tables = []
-            groupby_keys = []
-            for idx, paired_keys in enumerate(groupby_clause):
-                conds, keys = zip(*paired_keys)
-                conds = [cond for cond in conds if cond is not None]
-                if len(conds) == 1:
-                    cond = conds[0]
-                else:
-                    cond = FExpression(FOperator('and'), conds)
-                filter_tables.append(FFilterTable(scope, table, cond))
-                groupby_keys.extend([list(keys) for _ in range(len(table))])
-
-            merged_table = FUnionAllTable(scope, filter_tables)
-            name = name or scope._get_new_databases_name()
-            func = Function(f'{name}_GROUP_FUNC', scope.TupleSort, scope.VarSort, scope.BooleanSort)
-            scope.register_function(name=str(func), function=func)
-            if scope._script_writer is not None:
-                scope._script_writer.function_declaration.append(
-                    CodeSnippet(
-                        code=f"{func} = Function('{func}', __TupleSort, __Int, __Boolean)",
-                        docstring=f'define `{func}` function to partition tuples into groups',
-                    )
+        # CASE keys are grouped by their values, i.e., a single If chain per tuple
+        groupby_keys = [key for _, key in groupby_clause[0]]
+        groupby_keys = [groupby_keys for _ in range(len(table))]
+        name = name or scope._get_new_databases_name()
+        func = Function(f'{name}_GROUP_FUNC', scope.TupleSort, scope.VarSort, scope.BooleanSort)
+        scope.register_function(name=str(func), function=func)
+        if scope._script_writer is not None:
+            scope._script_writer.function_declaration.append(
+                CodeSnippet(
+                    code=f"{func} = Function('{func}', __TupleSort, __Int, __Boolean)",
+                    docstring=f'define `{func}` function to partition tuples into groups',
                 )
-            table = cls(scope, merged_table, groupby_keys, func, select_clause,
-                        groupby_fuzzy=groupby_fuzzy, name=name)
+            )
+        table = cls(scope, table, groupby_keys, func, select_clause,
+                    is_vanilla_grouby_keys=True, groupby_fuzzy=groupby_fuzzy, name=name)
         return table
 
     def __str__(self):
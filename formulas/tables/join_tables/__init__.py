@@ -4,6 +4,7 @@
 from .cross_join_table import FCrossJoinTable
 from .inner_join_table import FInnerJoinTable
 from .join_base_table import FJoinBaseTable
+from .key_join_table import FKeyJoinTable
 from .natural_join_table import FNaturalJoinTable
 from .outer_join_tables import (
     FOuterJoinBaseTable,
@@ -13,13 +14,15 @@ from .outer_join_tables import (
     OuterJoinTableType,
 )
 
-JoinTableType = OuterJoinTableType | FJoinBaseTable | FInnerJoinTable | FCrossJoinTable | FNaturalJoinTable
+JoinTableType = OuterJoinTableType | FJoinBaseTable | FInnerJoinTable | FCrossJoinTable | FNaturalJoinTable | \
+                FKeyJoinTable
 
 __all__ = [
     'FJoinBaseTable',
     'FInnerJoinTable',
     'FCrossJoinTable',
     'FNaturalJoinTable',
+    'FKeyJoinTable',
 
     'FOuterJoinBaseTable',
     'FLeftOuterJoinTable',
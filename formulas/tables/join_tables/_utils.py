@@ -4,6 +4,10 @@ import copy
 import itertools
 from typing import Sequence
 
+from formulas._utils import (
+    attribute_key,
+    table_key,
+)
 from formulas.expressions.expression import FExpression
 from formulas.expressions.operator import FOperator
 from formulas.tables.alias_table import FAliasTable
@@ -94,3 +98,11 @@ def alias_check(
                                 name=f"Alias_created_for_{rhs_table.name}", alias_attributes=True)
     tables = [lhs_table, rhs_table]
     return tables
+
+
+def product_key(tables: Sequence[FBaseTable]):
+    """
+    products of the same tuples share tuple sorts if they map the same attributes
+    """
+    attributes = [attribute_key(attr) for table in tables for attr in table.attributes]
+    return table_key('product', tables, attributes)
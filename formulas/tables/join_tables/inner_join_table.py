@@ -13,6 +13,7 @@ from formulas.expressions.predicates import PredicateType
 from formulas.tables.base_table import FBaseTable
 from formulas.tables.join_tables._utils import (
     _analyze_using,
+    product_key,
 )
 from formulas.tables.join_tables._utils import alias_check
 from formulas.tables.join_tables.join_base_table import FJoinBaseTable
@@ -32,12 +33,18 @@ def _inner_product(
     curr_table = []
     # cannot change the order of tuple_pairs
     tuple_pairs = [[lhs_tuple, rhs_tuple] for rhs_tuple in tables[1] for lhs_tuple in tables[0]]
-    for tuple_list in tuple_pairs:
+    key = product_key(tables)
+    shared_sorts = scope.find_shared_tuple_sorts(key, len(tuple_pairs))
+    for idx, tuple_list in enumerate(tuple_pairs):
         # update condition later
         tuple = FInnerJoinTuple(*tuple_list, condition=None, name=scope._get_new_tuple_name())
         scope.register_tuple(tuple.name, tuple)
-        tuple.SORT = scope._declare_tuple_sort(tuple.name)
+        if shared_sorts is None:
+            tuple.SORT = scope._declare_tuple_sort(tuple.name)
+        else:
+            tuple.SORT = scope._alias_tuple_sort(tuple.name, shared_sorts[idx])
         curr_table.append(tuple)
+    scope.share_tuple_sorts(key, curr_table)
     return tables, curr_table
 
 
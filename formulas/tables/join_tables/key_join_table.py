@@ -0,0 +1,68 @@
+# -*- coding:utf-8 -*-
+
+from typing import (
+    Sequence,
+)
+
+from context import Context
+from errors import NotSupportedError
+from formulas import register_formula
+from formulas.columns.attribute import FAttribute
+from formulas.expressions.expression_tuple import FExpressionTuple
+from formulas.expressions.predicates import PredicateType
+from formulas.tables.base_table import FBaseTable
+from formulas.tables.join_tables._utils import alias_check
+from formulas.tables.join_tables.join_base_table import FJoinBaseTable
+from formulas.tuples.key_join_tuple import FKeyJoinTuple
+
+
+@register_formula('key_join')
+class FKeyJoinTable(FJoinBaseTable):
+    """
+    `lhs (LEFT) JOIN rhs ON condition` where the condition equates a primary key of the keyed table (rhs if keyed = 1,
+    otherwise lhs), so that every tuple of the other table matches at most one keyed tuple.
+    Instead of n * m product tuples, the table has a tuple for each tuple of the other table. For LEFT JOIN (outer),
+    an unmatched tuple is padded with NULLs, unless a foreign key guarantees its match (total).
+    """
+
+    def __init__(self,
+                 scope,
+                 tables: Sequence[FBaseTable],
+                 condition: PredicateType,
+                 keyed: int = 1,
+                 outer: bool = False,
+                 total: bool = False,
+                 name: str = None,
+                 ):
+        name = name or '_KeyJoin_'.join(t.name for t in tables)
+        prev_tables = alias_check(scope, tables, name)
+        keyed_table = prev_tables[keyed]
+
+        curr_table = []
+        for tuple in prev_tables[1 - keyed]:
+            curr_tuple = FKeyJoinTuple(tuple, keyed_table.tuples, condition=[], keyed=keyed,
+                                       name=scope._get_new_tuple_name())
+            scope.register_tuple(curr_tuple.name, curr_tuple)
+            curr_tuple.SORT = scope._declare_tuple_sort(curr_tuple.name)
+            curr_table.append(curr_tuple)
+
+        tmp_ctx = Context(databases={'tmp': curr_table})
+        tmp_ctx.prev_database = tmp_ctx['tmp']
+        tmp_ctx.attributes = curr_table[0].attributes
+        for curr_tuple in curr_table:
+            for candidate in keyed_table:
+                bound_scope = {str(attr): t.SORT for t in [curr_tuple[0], candidate] for attr in t.attributes}
+                tmp = scope.encoder.parse_expression(condition, bound_scope=bound_scope, ctx=tmp_ctx)
+                if isinstance(tmp, FAttribute | FExpressionTuple):
+                    raise NotSupportedError(
+                        f"{self.__class__.__name__} ON condition does support only an attribute.")
+                curr_tuple.condition.append(tmp)
+
+        super(FKeyJoinTable, self).__init__(scope, curr_table, name)
+        self.fathers = prev_tables
+        self.root = [t.root for t in prev_tables]
+        self.keyed = keyed
+        self.outer = outer
+        self.total = total
+        self.is_using = False
+        self._hidden_attributes = None
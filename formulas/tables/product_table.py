@@ -4,7 +4,10 @@ from typing import Sequence
 
 from formulas import register_formula
 from formulas.tables.base_table import FBaseTable
-from formulas.tables.join_tables._utils import alias_check
+from formulas.tables.join_tables._utils import (
+    alias_check,
+    product_key,
+)
 from formulas.tuples.concate_tuple import FConcateTuple
 
 
@@ -18,11 +21,17 @@ def _cartesian_product(
     curr_table = []
     # cannot change the order of tuple_pairs
     tuple_pairs = [[lhs_tuple, rhs_tuple] for rhs_tuple in tables[1] for lhs_tuple in tables[0]]
-    for tuple_list in tuple_pairs:
+    key = product_key(tables)
+    shared_sorts = scope.find_shared_tuple_sorts(key, len(tuple_pairs))
+    for idx, tuple_list in enumerate(tuple_pairs):
         tuple = FConcateTuple(*tuple_list, name=scope._get_new_tuple_name())
         scope.register_tuple(tuple.name, tuple)
-        tuple.SORT = scope._declare_tuple_sort(tuple.name)
+        if shared_sorts is None:
+            tuple.SORT = scope._declare_tuple_sort(tuple.name)
+        else:
+            tuple.SORT = scope._alias_tuple_sort(tuple.name, shared_sorts[idx])
         curr_table.append(tuple)
+    scope.share_tuple_sorts(key, curr_table)
     return tables, curr_table
 
 
@@ -0,0 +1,35 @@
+# -*- coding:utf-8 -*-
+
+from typing import Sequence
+
+from formulas import register_formula
+from formulas.tables.base_table import FBaseTable
+
+
+@register_formula('semi_join_table')
+class FSemiJoinTable(FBaseTable):
+    """
+    A decorrelated subquery `SELECT attributes FROM table WHERE condition` of EXISTS/IN/NOT IN (an anti-join for NOT IN).
+    Only the condition refers to outer queries, so the table is encoded once and its tuples are matched
+    with each outer tuple by the condition, instead of re-encoding the subquery for each outer tuple.
+    """
+
+    def __init__(self,
+                 scope,
+                 table: FBaseTable,
+                 condition: Sequence,
+                 attributes: Sequence,
+                 name: str = None,
+                 ):
+        name = name or scope._get_new_databases_name()
+        super(FSemiJoinTable, self).__init__(table.tuples, name, is_correlated_subquery=True)
+        scope.register_database(name, self)
+        self.fathers = [table]
+        self.root = table.root or table.name
+        # conditions of tuples
+        self.condition = condition
+        self._attributes = attributes
+
+    @property
+    def attributes(self):
+        return self._attributes
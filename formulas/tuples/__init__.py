@@ -17,6 +17,7 @@ from .fake_projection_tuple import FFakeProjectionTuple
 from .distinct_tuple import FDistinctTuple
 
 from .inner_join_tuple import FInnerJoinTuple
+from .key_join_tuple import FKeyJoinTuple
 from .natural_join_tuple import FNaturalJoinTuple
 from .group_by_tuple import FGroupByTuple
 from .deleted_tuple import FDeletedTuple
@@ -25,7 +26,7 @@ from .limit_tuple import FLimitTuple
 TupleType = FBaseTupleType | \
             FNullTuple | FAliasTuple | FFilterTuple | \
             FProjectionTuple | FProjectionPityTuple | FFakeProjectionTuple | \
-            FConcateTuple | FInnerJoinTuple | FNaturalJoinTuple | FDistinctTuple | \
+            FConcateTuple | FInnerJoinTuple | FKeyJoinTuple | FNaturalJoinTuple | FDistinctTuple | \
             FGroupByTuple | FDeletedTuple | FLimitTuple
 
 __all__ = [
@@ -41,6 +42,7 @@ __all__ = [
     'FFakeProjectionTuple',
     'FProjectionPityTuple',
     'FInnerJoinTuple',
+    'FKeyJoinTuple',
     'FNaturalJoinTuple',
     'FDistinctTuple',
     'FGroupByTuple',
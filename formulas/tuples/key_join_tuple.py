@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+import itertools
+from typing import (
+    Sequence,
+)
+
+from formulas import register_formula
+from formulas.tuples.base_tuple import FBaseTuple
+from formulas.tuples.tuple import FTuple
+
+
+@register_formula('key_join_tuple')
+class FKeyJoinTuple(FTuple):
+    """
+    A tuple joined with at most one of its candidate tuples, i.e., the candidates that agree on a key.
+    condition[j] is the JOIN condition of this tuple and the j-th candidate.
+    """
+
+    def __init__(self,
+                 tuple: FBaseTuple | FTuple,
+                 candidates: Sequence[FBaseTuple | FTuple],
+                 condition: Sequence = None,
+                 keyed: int = 1,
+                 name: str = None,
+                 ):
+        super(FKeyJoinTuple, self).__init__([tuple, *candidates], condition, name)
+        # the candidates are the right (1) or left (0) operand of a JOIN
+        self.keyed = keyed
+        self.attributes = self._attributes()
+
+    def __getitem__(self, index):
+        return self.tuples[index]
+
+    def __str__(self):
+        return f'{self.name} := KeyJoin({self.fathers[0]}, [{", ".join(self.fathers[1:])}])'
+
+    def _attributes(self):
+        tuples = [self.tuples[0], self.tuples[1]]
+        if self.keyed == 0:
+            tuples = tuples[::-1]
+        attributes = list(itertools.chain(*[t.attributes for t in tuples]))
+        return attributes
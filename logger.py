@@ -1,6 +1,10 @@
 # -*- coding:utf-8 -*-
 
 import logging
+import os
+import time
+
+import ujson
 
 """
 CRITICAL
@@ -21,6 +25,115 @@ logging.basicConfig(
 LOGGER = logging.getLogger(__name__)
 LOGGER.setLevel(LOGGING_LEVEL)
 
+
+class Lazy:
+    """
+    an argument formatted only if its record/event is emitted, e.g., `LOGGER.debug('%s', Lazy(pprint.pformat, obj))`
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+class _NullSpan:
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, fields):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+        self.start = None
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.tracer.emit({
+            'span': self.name,
+            'time': round(time.perf_counter() - self.start, 6),
+            'error': None if exc_type is None else exc_type.__name__,
+            **self.fields,
+        })
+
+
+class Tracer:
+    """
+    span events of parse/analyze/visit/verify/solve written as JSON lines, e.g.,
+    `VERIEQL_TRACE=trace.jsonlines python -m __main__` writes
+    {"span":"solve","time":0.01,"error":null,"result":"unsat","pid":1,"timestamp":1700000000.0}
+
+    Disabled tracers return a shared no-op span, and fields are only formatted (by `str`) once they are written.
+    """
+
+    def __init__(self, out_file: str = None):
+        self.out_file = out_file
+        self._writer = self._pid = None
+
+    @property
+    def enabled(self):
+        return self.out_file is not None
+
+    def span(self, name, **fields):
+        if self.out_file is None:
+            return _NULL_SPAN
+        return Span(self, name, fields)
+
+    def event(self, name, **fields):
+        if self.out_file is not None:
+            self.emit({'event': name, **fields})
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            # every (forked) process appends to the file by its own writer
+            os.makedirs(os.path.dirname(self.out_file) or '.', exist_ok=True)
+            self._writer = open(self.out_file, 'a', buffering=1)
+            self._pid = os.getpid()
+        record['pid'] = self._pid
+        record['timestamp'] = time.time()
+        print(ujson.dumps(record, ensure_ascii=False, default=str), file=self._writer)
+
+    def close(self):
+        if self._writer is not None and self._pid == os.getpid():
+            self._writer.close()
+        self._writer = self._pid = None
+
+
+TRACER = Tracer(os.environ.get('VERIEQL_TRACE', None))
+
+
+def set_tracing(out_file: str = None):
+    """
+    reconfigure the shared tracer in place, `None` disables tracing
+    """
+    TRACER.close()
+    TRACER.out_file = out_file
+    return TRACER
+
+
 __all___ = [
-    'LOGGER'
+    'LOGGER',
+    'Lazy',
+    'TRACER',
+    'set_tracing',
 ]
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""
+Encode SQL pairs into SMT-LIB2 files once, and solve them by external SMT solvers in subprocesses.
+
+# 1) encode pairs under bound sizes 1..10 into `<pair hash>_<bound size>.smt2` files
+python -m parallel.cli_smt2 -m encode -f benchmarks/calcite/calcite2.jsonlines -s 10 -d smt2/calcite -o smt2/calcite.encode
+# 2) solve them by the z3 binary (or any other solver reading SMT-LIB2 files, e.g., `cvc5 --lang=smt2`)
+python -m parallel.cli_smt2 -m solve -d smt2/calcite --solver z3 -t 600 --memory 8192 -c 8 -o smt2/calcite.out
+"""
+
+import argparse
+import glob
+import resource
+import shlex
+import signal
+import subprocess
+import time
+from multiprocessing import (
+    Queue,
+    cpu_count,
+    Manager,
+)
+from multiprocessing.pool import ThreadPool
+
+import tqdm
+import ujson
+
+from constants import *
+from environment import Environment
+from errors import *
+from parallel.fork_server import (
+    job_process,
+    start_fork_server,
+)
+from parsers import (
+    SQLParser,
+    set_parse_cache,
+)
+from solving_profiles import (
+    SOLVING_PROFILES,
+    DEFAULT_PROFILE,
+)
+from writers.smt2 import (
+    SMT2_SUFFIX,
+    pair_hash,
+    parse_smt2_file_name,
+)
+
+parser = argparse.ArgumentParser(description='DBChecker SMT-LIB2 cli')
+parser.add_argument('-m', '--mode', type=str, default='encode', choices=['encode', 'solve'])
+parser.add_argument('-f', '--file', type=str)
+parser.add_argument('-d', '--smt2_dir', type=str)
+parser.add_argument('-s', '--bound_size', type=int, default=10)
+parser.add_argument('-t', '--timeout', type=int, default=TIMEOUT)
+# memory limit (MB) of a solver process
+parser.add_argument('--memory', type=int, default=None)
+# solver command, the SMT-LIB2 file is appended as its last argument
+parser.add_argument('--solver', type=str, default='z3')
+# solver processes running in parallel
+parser.add_argument('-c', '--cores', type=int, default=1, choices=list(range(1, 1 + cpu_count())))
+parser.add_argument('-i', '--integrity_constraint', default=1, choices=[0, 1], type=int)
+parser.add_argument('-o', '--out_file', type=str, default=None)
+parser.add_argument('-p', '--profile', type=str, default=DEFAULT_PROFILE, choices=list(SOLVING_PROFILES))
+# directory of parsed ASTs shared by workers and runs
+parser.add_argument('--parse_cache', type=str, default=None)
+# fork jobs from a preloaded zygote process instead of this runner (Linux only),
+# ASTs parsed by the runner are shared with jobs through `--parse_cache` only
+parser.add_argument('--fork_server', default=0, choices=[0, 1], type=int)
+args = parser.parse_args()
+
+
+def encode(schema, constraint, query1, query2, bound_size, profile, smt2_dir, queue: Queue):
+    err_info = smt2_file = None
+    with Environment(timer=True, profile=profile, smt2_dir=smt2_dir, solve=False) as env:
+        if not args.integrity_constraint:
+            constraint = None
+        schema, constraint = env.prune_schema(schema, constraint, query1, query2)
+        schema, constraint = env.prune_columns(schema, constraint, query1, query2)
+        for name, db in schema.items():
+            env.create_database(db, bound_size=bound_size, name=name)
+        if constraint is not None:
+            env.add_constraints(constraint)
+        env.save_checkpoints()
+        env.reload_checkpoints()
+        try:
+            result = env.analyze(query1, query2)
+            if result == -1:
+                raise NotEquivalenceError()
+            smt2_file = env.smt2_file
+            state = None
+        except SyntaxError as err:
+            err_info = str(err)
+            state = STATE.SYN_ERR
+        except NotEquivalenceError as err:
+            err_info = str(err)
+            state = STATE.NON_EQUIV
+        except NotSupportedError as err:
+            err_info = str(err)
+            state = STATE.NOT_SUP_ERR
+        except NotImplementedError as err:
+            err_info = str(err)
+            state = STATE.NOT_IMPL_ERR
+        except Exception as err:
+            err_info = str(err)
+            state = STATE.OTHER_ERR
+        # encoding time
+        traversing_time = env.traversing_time if smt2_file is not None else round(time.time() - env.traversing_time, 6)
+        for o in [state, traversing_time, smt2_file, err_info]:
+            queue.put(o)
+
+
+def encode_pair(index, schema, constraint, query1, query2, max_bound_size, profile, smt2_dir, timeout, queue: Queue):
+    result = {
+        'index': index,
+        'pair': [query1, query2],
+        'hash': pair_hash([query1, query2]),
+        'profile': profile,
+        'smt2_files': [],
+        'states': [],
+        'times': [],
+        'err': None,
+    }
+    # parse queries before forking, so that encodings under all bound sizes reuse their ASTs
+    for query in (query1, query2):
+        try:
+            SQLParser().parse(query)
+        except Exception:
+            pass
+    for bound_size in range(1, max_bound_size + 1):
+        queue.empty()
+        proc = job_process(
+            target=encode,
+            args=(schema, constraint, query1, query2, bound_size, profile, smt2_dir, queue,),
+        )
+        proc.start()
+        proc.join(timeout)
+        if proc.is_alive():
+            proc.terminate()
+            proc.join()
+            result['states'].append(STATE.TIMEOUT)
+            result['times'].append(timeout)
+            result['err'] = 'Time Out!'
+            break
+        try:
+            state, traversing_time, smt2_file, err = [queue.get() for _ in range(queue.qsize())]
+        except ValueError:
+            # out of memory
+            result['states'].append(STATE.OOM)
+            result['times'].append(None)
+            break
+        result['times'].append(traversing_time)
+        if smt2_file is None:
+            # encoding errors do not depend on bound sizes
+            result['states'].append(state)
+            result['err'] = err
+            break
+        smt2_file = os.path.basename(smt2_file)
+        if smt2_file in result['smt2_files']:
+            # no base table is read, so goals do not depend on bound sizes
+            result['times'].pop(-1)
+            break
+        result['states'].append(None)
+        result['smt2_files'].append(smt2_file)
+    return result
+
+
+def solve(smt2_file, command, timeout, memory=None):
+    """
+    solve an SMT-LIB2 file by an external solver under CPU time/memory limits, `unsat` means equivalence
+    """
+
+    def _set_limits():
+        resource.setrlimit(resource.RLIMIT_CPU, (timeout, timeout))
+        if memory is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (memory * 2 ** 20, memory * 2 ** 20))
+
+    hash, bound_size = parse_smt2_file_name(smt2_file)
+    result = {'file': os.path.basename(smt2_file), 'hash': hash, 'bound_size': bound_size, 'err': None}
+    start = time.time()
+    try:
+        proc = subprocess.run(
+            [*shlex.split(command), smt2_file], capture_output=True, text=True,
+            # wall-clock timeout in case the solver sleeps on I/O
+            timeout=timeout + 1, preexec_fn=_set_limits,
+        )
+        out = proc.stdout.strip().split('\n')[0] if proc.stdout.strip() else None
+        if out == 'unsat':
+            result['state'] = STATE.EQUIV
+        elif out == 'sat':
+            result['state'] = STATE.NON_EQUIV
+        elif out in {'unknown', 'timeout'}:
+            result['state'] = STATE.UNKNOWN
+        elif proc.returncode < 0 and -proc.returncode in {signal.SIGXCPU, signal.SIGKILL}:
+            result['state'] = STATE.TIMEOUT
+        elif memory is not None and proc.returncode != 0 and 'memory' in (proc.stdout + proc.stderr).lower():
+            result['state'] = STATE.OOM
+        else:
+            result['state'] = STATE.OTHER_ERR
+            result['err'] = (proc.stdout + proc.stderr).strip() or f'return code {proc.returncode}'
+    except subprocess.TimeoutExpired:
+        result['state'] = STATE.TIMEOUT
+    result['time'] = round(time.time() - start, 6)
+    if result['state'] == STATE.TIMEOUT:
+        result['time'] = timeout
+        result['err'] = 'Time Out!'
+    return result
+
+
+def encode_all(args):
+    with open(args.file, 'r') as reader:
+        parameters = []
+        for line in reader:
+            context = ujson.loads(line)
+            if context.get('contain_unsupported_constraints', False):
+                constraint = None
+            else:
+                constraint = context.get('constraint', None)
+            profile = context.get('profile', args.profile)
+            parameters.append([
+                context['index'], context['schema'], constraint, *context['pair'], args.bound_size, profile,
+                args.smt2_dir,
+            ])
+
+    os.makedirs(args.smt2_dir, exist_ok=True)
+    os.makedirs(os.path.dirname(args.out_file) or '.', exist_ok=True)
+    queue = Manager().Queue()
+    with open(args.out_file, 'w') as writer:
+        for parameter in tqdm.tqdm(parameters, desc=f'Encoding | Bound size: {args.bound_size:3d}', mininterval=10):
+            out = encode_pair(*parameter, args.timeout, queue)
+            print(ujson.dumps(out, ensure_ascii=False), file=writer)
+
+
+def solve_all(args):
+    files = sorted(glob.glob(os.path.join(args.smt2_dir, f'*{SMT2_SUFFIX}')))
+    # solvers run in subprocesses, threads only wait for them
+    with ThreadPool(args.cores) as pool:
+        outs = pool.imap(lambda file: solve(file, args.solver, args.timeout, args.memory), files)
+        os.makedirs(os.path.dirname(args.out_file) or '.', exist_ok=True)
+        with open(args.out_file, 'w') as writer:
+            for out in tqdm.tqdm(outs, total=len(files), desc=f'Solving | Solver: {args.solver}', mininterval=10):
+                print(ujson.dumps(out, ensure_ascii=False), file=writer)
+
+
+if __name__ == '__main__':
+    print(args)
+    if args.parse_cache is not None:
+        set_parse_cache(cache_dir=args.parse_cache)
+    if args.fork_server and args.mode == 'encode':
+        # before loading benchmarks, so that the zygote stays small
+        start_fork_server()
+    if args.mode == 'encode':
+        encode_all(args)
+    elif args.mode == 'solve':
+        solve_all(args)
+    else:
+        raise NotImplementedError
@@ -2,6 +2,7 @@
 
 import argparse
 import time
+from collections import defaultdict
 from multiprocessing import (
     Process,
     Queue,
@@ -17,6 +18,18 @@ from constants import *
 from environment import Environment
 from errors import *
 from logger import LOGGER
+from parallel.fork_server import (
+    job_process,
+    start_fork_server,
+)
+from parsers import (
+    canonical_hash,
+    set_parse_cache,
+)
+from solving_profiles import (
+    SOLVING_PROFILES,
+    DEFAULT_PROFILE,
+)
 from utils import (
     divide,
 )
@@ -30,15 +43,27 @@ parser.add_argument('-m', '--mode', type=str, default='train', choices=['train',
 parser.add_argument('-c', '--cores', type=int, default=1, choices=list(range(1, 1 + cpu_count())))
 parser.add_argument('-i', '--integrity_constraint', default=1, choices=[0, 1], type=int)
 parser.add_argument('-o', '--out_file', type=str, default=None)
+# a benchmark line can override it with its `profile` field
+parser.add_argument('-p', '--profile', type=str, default=DEFAULT_PROFILE, choices=list(SOLVING_PROFILES))
+# directory of parsed ASTs shared by workers and runs
+parser.add_argument('--parse_cache', type=str, default=None)
+# fork jobs from a preloaded zygote process instead of this runner (Linux only),
+# ASTs parsed by the runner are shared with jobs through `--parse_cache` only
+parser.add_argument('--fork_server', default=0, choices=[0, 1], type=int)
 args = parser.parse_args()
 
 
-def verify(schema, constraint, query1, query2, bound_size, queue: Queue):
+def verify(schema, constraint, query1, query2, bound_size, profile, queue: Queue):
     err_info = None
-    with Environment(timer=True, generate_code=True) as env:
+    with Environment(timer=True, generate_code=True, profile=profile) as env:
+        if not args.integrity_constraint:
+            constraint = None
+        # only materialize the tables and columns referenced by queries
+        schema, constraint = env.prune_schema(schema, constraint, query1, query2)
+        schema, constraint = env.prune_columns(schema, constraint, query1, query2)
         for name, db in schema.items():
             env.create_database(db, bound_size=bound_size, name=name)
-        if args.integrity_constraint and constraint is not None:
+        if constraint is not None:
             env.add_constraints(constraint)
         env.save_checkpoints()
         env.reload_checkpoints()
@@ -79,12 +104,13 @@ def verify(schema, constraint, query1, query2, bound_size, queue: Queue):
 
 
 def process_ends_with_max_timeout(
-        index, schema, constraint, query1, query2, max_bound_size, states, time_cost,
+        index, schema, constraint, query1, query2, max_bound_size, states, time_cost, profile,
         timeout, queue: Queue
 ):
     result = {
         'index': index,
         'pair': [query1, query2],
+        'profile': profile,
         'states': [],
         'times': [],
         'counterexample': None,
@@ -94,15 +120,23 @@ def process_ends_with_max_timeout(
         result['states'] = states
         result['times'] = time_cost
 
+    # syntactically equivalent queries are equivalent under any bound size
+    start = time.time()
+    result['canonical_hashes'] = [canonical_hash(query1), canonical_hash(query2)]
+    if result['canonical_hashes'][0] is not None and len(set(result['canonical_hashes'])) == 1:
+        result['states'].append(STATE.EQUIV)
+        result['times'].append([round(time.time() - start, 6), 0.0])
+        return result
+
     pbar = tqdm.tqdm(total=max_bound_size, desc=f'Bound size: {0:5d} | Thread: {1:3d}', )
 
     bound_size = len(result['states']) + 1
     pbar.set_description(f'Bound size: {bound_size:5d} | Thread: {1:3d}', refresh=False)
     pbar.update(bound_size)
     queue.empty()
-    proc = Process(
+    proc = job_process(
         target=verify,
-        args=(schema, constraint, query1, query2, bound_size, queue,),
+        args=(schema, constraint, query1, query2, bound_size, profile, queue,),
     )
     proc.start()
 
@@ -128,9 +162,9 @@ def process_ends_with_max_timeout(
                 pbar.set_description(f'Bound size: {bound_size:5d} | Thread: {1:3d}', refresh=False)
                 pbar.update(bound_size)
                 queue.empty()
-                proc = Process(
+                proc = job_process(
                     target=verify,
-                    args=(schema, constraint, query1, query2, bound_size, queue,),
+                    args=(schema, constraint, query1, query2, bound_size, profile, queue,),
                 )
                 proc.start()
             else:
@@ -184,7 +218,8 @@ def train(args):
             elif 'benchmark' in context:
                 file_path = context['benchmark']
             states = timecost = None
-            parameters.append([index, schema, constraint, *pair, args.bound_size, states, timecost, file_path])
+            profile = context.get('profile', args.profile)
+            parameters.append([index, schema, constraint, *pair, args.bound_size, states, timecost, profile, file_path])
         # out_file = args.file[:args.file.rfind('.jsonlines')] + '.out'
         # if os.path.exists(out_file):
         #     with open(out_file, 'r') as reader:
@@ -243,6 +278,23 @@ def evaluation(args):
         return performances
 
     performances = load_records(file=args.out_file)
+    # time costs per solving profile, compare outputs of `train` with different profiles to pick the default
+    profile_history = PrettyTable(['Profile', '#Pairs', 'TraversingTime(s)', 'SolvingTime(s)'])
+    profile_costs = defaultdict(lambda: [0, 0.0, 0.0])
+    for prf in performances:
+        costs = profile_costs[prf.get('profile', DEFAULT_PROFILE)]
+        costs[0] += 1
+        for time_cost in prf['times']:
+            if time_cost is None:
+                # out of memory
+                continue
+            traversing_time, solving_time = time_cost
+            costs[1] += traversing_time or 0.0
+            costs[2] += solving_time or 0.0
+    for profile, (count, traversing_time, solving_time) in profile_costs.items():
+        profile_history.add_row([profile, f'{count:3,}', f'{traversing_time:6.4f}', f'{solving_time:6.4f}'])
+    print(profile_history)
+
     history = PrettyTable([
         'Datatime', '#Rows', '#Equiv', '#NotEquiv', '#SynErr', f'#TimeOut({args.timeout})', '#NotSupErr',
         '#NotImplErr', '#Unknown', '#OtherErrs', '#Total', 'SuccessRate(%)', 'TotalTime(s)',
@@ -348,6 +400,11 @@ if __name__ == '__main__':
     # args.file = 'benchmark/leetcode/leetcode.jsonlines'
     # args.out_file = 'benchmark/leetcode/leetcode.out'
     print(args)
+    if args.parse_cache is not None:
+        set_parse_cache(cache_dir=args.parse_cache)
+    if args.fork_server:
+        # before loading benchmarks, so that the zygote stays small
+        start_fork_server()
     if args.mode == 'train':
         train(args)
     elif args.mode == 'eval':
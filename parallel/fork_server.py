@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fork server of verification jobs (Linux only).
+
+A zygote process is forked from a runner before it loads benchmarks. It imports VeriEQL modules, runs a toy
+verification to initialize parsers and z3 once, and freezes its objects for the garbage collector. Every job is then
+`os.fork()`ed from the zygote, so that it starts warm from copy-on-write pages, however much memory the runner holds.
+
+    start_fork_server()
+    proc = job_process(target=verify, args=(..., queue,))
+    proc.start()
+    proc.join(timeout)
+    if proc.is_alive():
+        proc.terminate()
+
+Jobs are isolated as `multiprocessing.Process` jobs, e.g., a z3 crash or an OOM kill of a job leaves the zygote intact.
+"""
+
+import gc
+# imported before forking the zygote, since jobs unpickle proxies of result queues
+import multiprocessing.managers
+import os
+import pickle
+import select
+import signal
+import sys
+import traceback
+from multiprocessing import (
+    Lock,
+    Pipe,
+    get_context,
+    reduction,
+    util,
+)
+
+from logger import LOGGER
+
+
+def preload():
+    """
+    initialize parsers and z3 by a toy verification
+    """
+    from environment import Environment
+
+    with Environment() as env:
+        env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=1, name='EMP')
+        env.analyze("SELECT ID FROM EMP WHERE AGE > 1", "SELECT ID FROM EMP WHERE 1 < AGE")
+
+
+def _reap():
+    try:
+        while os.waitpid(-1, os.WNOHANG)[0] != 0:
+            pass
+    except ChildProcessError:
+        pass
+
+
+def _run_job(job):
+    exitcode = 1
+    try:
+        # finalizers of the zygote are not run by jobs, as multiprocessing does for forked processes
+        util._finalizer_registry.clear()
+        util._run_after_forkers()
+        target, args, kwargs = pickle.loads(job)
+        target(*args, **kwargs)
+        exitcode = 0
+    except SystemExit as err:
+        exitcode = err.code if isinstance(err.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        try:
+            util._exit_function()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exitcode)
+
+
+def _serve(conn, runner_conn, initializer, initargs):
+    # the zygote exits once runners close their ends
+    runner_conn.close()
+    if initializer is not None:
+        initializer(*initargs)
+    # objects of the zygote are never collected by jobs, which keeps their pages shared
+    gc.collect()
+    gc.freeze()
+    while True:
+        while not conn.poll(1):
+            _reap()
+        try:
+            job = conn.recv_bytes()
+        except EOFError:
+            break
+        if len(job) == 0:
+            break
+        _reap()
+        pid = os.fork()
+        if pid == 0:
+            conn.close()
+            _run_job(job)
+        # a pidfd refers to the job even if its pid is reused after exiting
+        pidfd = os.pidfd_open(pid)
+        try:
+            conn.send(pid)
+            reduction.send_handle(conn, pidfd, None)
+        finally:
+            os.close(pidfd)
+    _reap()
+
+
+class ForkedProcess:
+    """
+    a job forked from the zygote, with the methods of `multiprocessing.Process` used by runners
+    """
+
+    def __init__(self, fork_server, target, args=(), kwargs=None):
+        self._fork_server = fork_server
+        self._job = pickle.dumps((target, tuple(args), dict(kwargs or {})), protocol=pickle.HIGHEST_PROTOCOL)
+        self.pid = self._pidfd = None
+
+    def start(self):
+        self.pid, self._pidfd = self._fork_server.fork(self._job)
+        self._job = None
+
+    def is_alive(self):
+        return self._pidfd is not None and len(select.select([self._pidfd], [], [], 0)[0]) == 0
+
+    def join(self, timeout=None):
+        if self._pidfd is not None:
+            select.select([self._pidfd], [], [], timeout)
+
+    def terminate(self):
+        if self.is_alive():
+            try:
+                signal.pidfd_send_signal(self._pidfd, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def kill(self):
+        if self.is_alive():
+            try:
+                signal.pidfd_send_signal(self._pidfd, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def __del__(self):
+        if self._pidfd is not None:
+            os.close(self._pidfd)
+            self._pidfd = None
+
+
+class ForkServer:
+    def __init__(self, initializer=preload, initargs=()):
+        self.initializer = initializer
+        self.initargs = initargs
+        self._conn = self._zygote = None
+        # runner processes forked after the zygote share it
+        self._lock = Lock()
+
+    def start(self):
+        parent_conn, child_conn = Pipe()
+        # the zygote is forked to inherit modules and arguments of the runner, whatever its start method is
+        self._zygote = get_context('fork').Process(
+            target=_serve, args=(child_conn, parent_conn, self.initializer, self.initargs), daemon=True,
+        )
+        self._zygote.start()
+        child_conn.close()
+        self._conn = parent_conn
+        LOGGER.debug('fork server %s started', self._zygote.pid)
+        return self
+
+    def fork(self, job: bytes):
+        """
+        fork a pickled (target, args, kwargs) job from the zygote, return its pid and pidfd
+        """
+        with self._lock:
+            self._conn.send_bytes(job)
+            pid = self._conn.recv()
+            pidfd = reduction.recv_handle(self._conn)
+        return pid, pidfd
+
+    def Process(self, target, args=(), kwargs=None):
+        return ForkedProcess(self, target, args, kwargs)
+
+    def shutdown(self):
+        if self._zygote is None:
+            return
+        with self._lock:
+            self._conn.send_bytes(b'')
+        self._zygote.join()
+        self._conn.close()
+        self._conn = self._zygote = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+# fork server shared by runners of a process, see `start_fork_server`
+FORK_SERVER = None
+
+
+def start_fork_server(initializer=preload, initargs=()):
+    """
+    start the shared fork server, so that `job_process` forks jobs from it
+    """
+    global FORK_SERVER
+    if FORK_SERVER is None:
+        FORK_SERVER = ForkServer(initializer, initargs).start()
+    return FORK_SERVER
+
+
+def job_process(target, args=()):
+    """
+    a job process forked from the shared fork server if it runs, otherwise a `multiprocessing.Process`
+    """
+    if FORK_SERVER is not None:
+        return FORK_SERVER.Process(target=target, args=args)
+    return get_context().Process(target=target, args=args)
+
+
+__all__ = [
+    'ForkServer',
+    'ForkedProcess',
+    'start_fork_server',
+    'job_process',
+    'preload',
+]
@@ -1,4 +1,27 @@
 # -*- coding:utf-8 -*-
 
-from .constraint_parser import ConstraintParser
+import importlib
+
 from .sql_parser import SQLParser
+from .parse_cache import (
+    ParseCache,
+    PARSE_CACHE,
+    set_parse_cache,
+)
+from .canonicalizer import (
+    canonicalize,
+    canonical_hash,
+    is_syntactically_equivalent,
+)
+
+# parsers built on lark/yaml are imported on first use, which saves startup time of processes not using them
+_LAZY_PARSERS = {
+    'ConstraintParser': 'parsers.constraint_parser',
+    'LarkSQLParser': 'parsers.lark_sql_parser',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_PARSERS:
+        return getattr(importlib.import_module(_LAZY_PARSERS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,212 @@
+# -*- coding:utf-8 -*-
+
+"""
+Canonical forms of parsed SQL queries.
+Queries with the same canonical form are equivalent, e.g., queries only differing in table aliases, the order of
+AND/OR/= operands or the direction of comparisons, so they need no symbolic reasoning at all.
+"""
+
+import hashlib
+from typing import (
+    Dict,
+    Sequence,
+)
+
+import ujson
+
+from constants import DIALECT
+from parsers.sql_parser import SQLParser
+
+# operators whose operands can be reordered
+COMMUTATIVE_OPERATORS = {'and', 'or', 'eq', 'neq'}
+# `a > b` => `b < a`
+FLIPPED_OPERATORS = {'gt': 'lt', 'gte': 'lte'}
+JOIN_KEYWORD = 'join'
+# `SELECT * FROM EMP NATURAL JOIN DEPT` => [{'value': 'EMP', 'name': 'NATURAL'}, {'join': 'DEPT'}]
+NATURAL_KEYWORD = 'NATURAL'
+SEPARATOR = '__'
+
+
+class _NotCanonicalizable(Exception):
+    pass
+
+
+def _from_items(from_clause):
+    """
+    tables of a FROM clause, including joined ones
+    """
+    if isinstance(from_clause, list):
+        for item in from_clause:
+            joins = [key for key in item if JOIN_KEYWORD in key] if isinstance(item, Dict) else []
+            if len(joins) == 1:
+                yield item[joins[0]]
+            else:
+                yield item
+    else:
+        yield from_clause
+
+
+def _collect_bindings(obj, aliases: list, tables: list):
+    if isinstance(obj, list):
+        for item in obj:
+            _collect_bindings(item, aliases, tables)
+    elif isinstance(obj, Dict):
+        if 'with' in obj:
+            clauses = obj['with'] if isinstance(obj['with'], list) else [obj['with']]
+            tables.extend(clause['name'] for clause in clauses)
+        if 'from' in obj:
+            for item in _from_items(obj['from']):
+                if isinstance(item, str):
+                    tables.append(item)
+                elif isinstance(item, Dict) and isinstance(item.get('name', None), str):
+                    if item['name'] == NATURAL_KEYWORD or item['name'] == item['value']:
+                        # e.g., `EMP AS EMP` is kept as it is
+                        tables.append(item['name'])
+                    else:
+                        aliases.append(item['name'])
+        for value in obj.values():
+            _collect_bindings(value, aliases, tables)
+
+
+def _rename(obj, renaming: Dict):
+    """
+    rename table aliases of FROM clauses and the attributes of those aliases, e.g., `E__ID` => `#1__ID`
+    """
+    if isinstance(obj, list):
+        return [_rename(item, renaming) for item in obj]
+    elif isinstance(obj, Dict):
+        out = {}
+        for key, value in obj.items():
+            if key == 'literal':
+                out[key] = value
+            elif key == 'from':
+                out[key] = _rename_from(value, renaming)
+            elif key == 'with':
+                clauses = value if isinstance(value, list) else [value]
+                out[key] = [{'name': clause['name'], 'value': _rename(clause['value'], renaming)} for clause in clauses]
+                if not isinstance(value, list):
+                    out[key] = out[key][0]
+            else:
+                out[key] = _rename(value, renaming)
+        return out
+    elif isinstance(obj, str):
+        prefix, *names = obj.split(SEPARATOR)
+        if prefix in renaming:
+            if len(names) == 0:
+                # refer to the table itself, e.g., `B1(X)`
+                raise _NotCanonicalizable(obj)
+            return SEPARATOR.join([renaming[prefix], *names])
+        return obj
+    elif obj is None or isinstance(obj, (bool, int, float)):
+        return obj
+    else:
+        # e.g., VALUES tables
+        raise _NotCanonicalizable(obj)
+
+
+def _rename_table(item, renaming: Dict):
+    if isinstance(item, str):
+        return item
+    elif isinstance(item, Dict) and isinstance(item.get('name', None), str):
+        value = item['value'] if isinstance(item['value'], str) else _rename(item['value'], renaming)
+        return {**item, 'value': value, 'name': renaming.get(item['name'], item['name'])}
+    else:
+        return _rename(item, renaming)
+
+
+def _rename_from(from_clause, renaming: Dict):
+    if isinstance(from_clause, list):
+        out = []
+        for item in from_clause:
+            joins = [key for key in item if JOIN_KEYWORD in key] if isinstance(item, Dict) else []
+            if len(joins) == 1:
+                item = {
+                    key: _rename_table(value, renaming) if key == joins[0] else _rename(value, renaming)
+                    for key, value in item.items()
+                }
+            else:
+                item = _rename_table(item, renaming)
+            out.append(item)
+        return out
+    else:
+        return _rename_table(from_clause, renaming)
+
+
+def _dumps(obj) -> str:
+    return ujson.dumps(obj, sort_keys=True, ensure_ascii=False)
+
+
+def _normalize(obj):
+    """
+    reorder operands of commutative operators, flip comparisons and unify numerals bottom-up
+    """
+    if isinstance(obj, list):
+        return [_normalize(item) for item in obj]
+    elif isinstance(obj, Dict):
+        obj = {key: value if key == 'literal' else _normalize(value) for key, value in obj.items()}
+        if len(obj) == 1:
+            operator, operands = list(obj.items())[0]
+            if operator in FLIPPED_OPERATORS and isinstance(operands, list) and len(operands) == 2:
+                operator, operands = FLIPPED_OPERATORS[operator], operands[::-1]
+            if operator in COMMUTATIVE_OPERATORS and isinstance(operands, list):
+                if operator in {'and', 'or'}:
+                    # (a AND b) AND c => a AND b AND c
+                    operands = [
+                        opd
+                        for operand in operands
+                        for opd in (operand[operator] if isinstance(operand, Dict) and list(operand) == [operator]
+                                    else [operand])
+                    ]
+                operands = sorted(operands, key=_dumps)
+            obj = {operator: operands}
+        return obj
+    elif isinstance(obj, float) and obj.is_integer():
+        return int(obj)
+    else:
+        return obj
+
+
+def canonicalize(query: Dict):
+    """
+    canonical form of a parsed query, or None if the query cannot be canonicalized safely, e.g.,
+    an alias is also the name of a table or another alias
+    """
+    aliases, tables = [], []
+    _collect_bindings(query, aliases, tables)
+    if len(set(aliases)) != len(aliases) or len(set(aliases) & set(tables)) > 0:
+        return None
+    renaming = {alias: f'#{idx}' for idx, alias in enumerate(aliases, start=1)}
+    try:
+        query = _rename(query, renaming)
+    except _NotCanonicalizable:
+        return None
+    return _normalize(query)
+
+
+def canonical_hash(query: str, dialect=DIALECT.ALL, sql_parser: SQLParser = None):
+    """
+    hash of the canonical form of a query, which can be used as a key to cache results; None if the query cannot be
+    parsed or canonicalized
+    """
+    sql_parser = sql_parser or SQLParser()
+    try:
+        query = sql_parser.parse(query, dialect=dialect)
+    except Exception:
+        return None
+    query = canonicalize(query)
+    if query is None:
+        return None
+    return hashlib.md5(_dumps(query).encode('utf-8')).hexdigest()
+
+
+def is_syntactically_equivalent(queries: Sequence[str], dialect=DIALECT.ALL) -> bool:
+    sql_parser = SQLParser()
+    hashes = [canonical_hash(query, dialect, sql_parser) for query in queries]
+    return hashes[0] is not None and all(hash == hashes[0] for hash in hashes)
+
+
+__all__ = [
+    'canonicalize',
+    'canonical_hash',
+    'is_syntactically_equivalent',
+]
@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
 
+import copy
+import glob
 import itertools
+import os
+from typing import Dict
 
+import ujson
 import yaml
 from lark import (
     Lark,
     Transformer,
 )
+from lark.exceptions import LarkError
+
+CONSTRAINT_FILE_SUFFIXES = ['.yml', '.yaml']
 
 
 class ConstraintVisitor(Transformer):
@@ -92,77 +100,146 @@ class ConstraintVisitor(Transformer):
         return {'literal': str.upper(tree.value[1:-1])}
 
 
+CONSTRAINT_GRAMMAR = r'''
+    constraints: constraint (";" constraint)* [";"]
+    ?constraint : membership | not_null | comparison | unique | inc | unsupported
+    membership : attribute "<-" attribute
+               | attribute "<-" value_range
+               | attribute "<-" value_items
+    not_null : value "!=" null
+    comparison : value op value
+    unique : "unique" "(" [attribute ("," attribute)*] ")"
+    inc : "inc" "(" [attribute ("," attribute)*] ")"
+
+    unsupported : attribute "|" type ["+" "null"]
+                | attribute "^" attribute
+                | attribute "=" value "=>" attribute "=" value
+    type : "int" | "varchar"
+
+    ?value : attribute | NUMBER | DATE
+    !op : ">" | "<" | "!=" | ">=" | "<="
+    attribute : /[^\W\d]\w*/ "." /[^\W\d]\w*/
+    null: "null" | "NULL"
+    value_range : "[" NUMBER "," NUMBER "]"
+                | "[" DATE "," DATE "]"
+    value_items : "{" [value_item ("," value_item)*] "}"
+    ?value_item : STRING | NUMBER
+    DATE: NUMBER "-" NUMBER "-" NUMBER
+
+    STRING : "'" /[^']+/ "'" | ESCAPED_STRING
+
+    %import common.ESCAPED_STRING
+    %import common.SIGNED_NUMBER    -> NUMBER
+    %import common.WS
+    %ignore WS
+'''
+
+
 class ConstraintParser:
+    # LALR parser shared by all instances, its tables are also cached on disk by lark across processes
+    _parser = None
 
     def __init__(self):
         self._visitor = ConstraintVisitor()
-        self._parser = Lark(
-            r'''
-            constraints: constraint (";" constraint)* [";"]
-            ?constraint : membership | not_null | comparison | unique | inc | unsupported
-            membership : attribute "<-" attribute
-                       | attribute "<-" value_range
-                       | attribute "<-" value_items
-            not_null : attribute "!=" null
-            comparison : value op value
-            unique : "unique" "(" [attribute ("," attribute)*] ")"
-            inc : "inc" "(" [attribute ("," attribute)*] ")"
-            
-            unsupported : attribute "|" type ["+" "null"]
-                        | attribute "^" attribute
-                        | attribute "=" value "=>" attribute "=" value
-                        | "inc(" [attribute ("," attribute)*] ")"
-            type : "int" | "varchar"
-    
-            ?value : attribute | NUMBER | DATE
-            !op : ">" | "<" | "!=" | ">=" | "<="
-            attribute : /[^\W\d]\w*/ "." /[^\W\d]\w*/
-            null: "null" | "NULL"
-            value_range : "[" NUMBER "," NUMBER "]"
-                        | "[" DATE "," DATE "]"
-            value_items : "{" [value_item ("," value_item)*] "}"
-            ?value_item : STRING | NUMBER
-            DATE: NUMBER "-" NUMBER "-" NUMBER
-            
-            STRING : "'" /[^']+/ "'" | ESCAPED_STRING
-            
-            %import common.ESCAPED_STRING
-            %import common.SIGNED_NUMBER    -> NUMBER
-            %import common.WS
-            %ignore WS
-            ''',
-            start='constraints')
+        if ConstraintParser._parser is None:
+            ConstraintParser._parser = Lark(CONSTRAINT_GRAMMAR, start='constraints', parser='lalr', cache=True)
+        # file -> (mtime, constraints, whether it contains unsupported constraints)
+        self._file_cache = {}
 
     def parse(self, constraints):
         return self._visitor.transform(self._parser.parse(constraints))
 
     def parse_file(self, file) -> (list, bool):
+        mtime = os.stat(file).st_mtime_ns
+        cached = self._file_cache.get(file, None)
+        if cached is not None and cached[0] == mtime:
+            return copy.deepcopy(cached[1]), cached[2]
+        out, contain_unsupported_constraints = self._parse_file(file)
+        self._file_cache[file] = (mtime, copy.deepcopy(out), contain_unsupported_constraints)
+        return out, contain_unsupported_constraints
+
+    def _parse_file(self, file) -> (list, bool):
         out = []
         contain_unsupported_constraints = False
         with open(file, 'r') as reader:
             try:
                 constraints = yaml.safe_load(reader)
-                if not isinstance(constraints, dict):
-                    return out, contain_unsupported_constraints
-                constraints = list(itertools.chain(*[constraint.split(";") for constraint in constraints.values()]))
-                for constraint in constraints:
-                    constraint = constraint.strip()
-                    if len(constraint) == 0:
-                        continue
-                    try:
-                        out.extend(self.parse(constraint))
-                    except:
-                        print(f"Unknown constraint {constraint} from {file}")
-                        contain_unsupported_constraints = True
-            except:
+            except yaml.YAMLError:
                 print(SyntaxError(file))
-                contain_unsupported_constraints = False
+                return out, contain_unsupported_constraints
+        if not isinstance(constraints, dict):
+            return out, contain_unsupported_constraints
+        if not all(isinstance(constraint, str) for constraint in constraints.values()):
+            print(SyntaxError(file))
+            return out, contain_unsupported_constraints
+        constraints = list(itertools.chain(*[constraint.split(";") for constraint in constraints.values()]))
+        constraints = [constraint.strip() for constraint in constraints if len(constraint.strip()) > 0]
+        try:
+            # parse all constraints at once, and only locate unknown constraints one by one
+            return self.parse('; '.join(constraints)), contain_unsupported_constraints
+        except LarkError:
+            pass
+        for constraint in constraints:
+            try:
+                out.extend(self.parse(constraint))
+            except LarkError:
+                print(f"Unknown constraint {constraint} from {file}")
+                contain_unsupported_constraints = True
         return out, contain_unsupported_constraints
 
+    def parse_dir(self, directory, cache_file=None) -> Dict[str, dict]:
+        """
+        compile all YAML files under `directory` into
+        {file: {'constraint': [...], 'contain_unsupported_constraints': bool}}, as in benchmark `.jsonlines` files.
+        Files are relative to `directory`, and compiled results are reused in `cache_file` unless files are modified.
+        """
+        cache = {}
+        if cache_file is not None and os.path.exists(cache_file):
+            with open(cache_file, 'r') as reader:
+                cache = ujson.load(reader)
+        out = {}
+        files = sorted(
+            file
+            for suffix in CONSTRAINT_FILE_SUFFIXES
+            for file in glob.glob(os.path.join(directory, '**', f'*{suffix}'), recursive=True)
+        )
+        for file in files:
+            name = os.path.relpath(file, directory)
+            mtime = os.stat(file).st_mtime_ns
+            if name in cache and cache[name]['mtime'] == mtime:
+                constraint, contain_unsupported_constraints = cache[name]['constraint'], \
+                    cache[name]['contain_unsupported_constraints']
+            else:
+                constraint, contain_unsupported_constraints = self.parse_file(file)
+            cache[name] = {
+                'mtime': mtime,
+                'constraint': constraint,
+                'contain_unsupported_constraints': contain_unsupported_constraints,
+            }
+            out[name] = {'constraint': constraint, 'contain_unsupported_constraints': contain_unsupported_constraints}
+        if cache_file is not None:
+            # deleted files are dropped from the cache
+            cache = {name: cache[name] for name in out}
+            os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+            with open(cache_file, 'w') as writer:
+                ujson.dump(cache, writer, ensure_ascii=False)
+        return out
 
-if __name__ == '__main__':
-    parser = ConstraintParser()
 
-    string = "inc(Queue.turn)"
-    out = parser.parse(string)
-    print(out)
+if __name__ == '__main__':
+    """
+    python -m parsers.constraint_parser <directory of YAML files> <out file> [cache file]
+    """
+    import sys
+
+    if len(sys.argv) > 2:
+        directory, out_file, cache_file = sys.argv[1], sys.argv[2], (sys.argv[3:] or [None])[0]
+        with open(out_file, 'w') as writer:
+            for file, constraints in ConstraintParser().parse_dir(directory, cache_file).items():
+                print(ujson.dumps({'file': file, **constraints}, ensure_ascii=False), file=writer)
+    else:
+        parser = ConstraintParser()
+
+        string = "inc(Queue.turn)"
+        out = parser.parse(string)
+        print(out)
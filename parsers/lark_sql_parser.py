@@ -0,0 +1,622 @@
+# -*- coding:utf-8 -*-
+
+"""
+LALR SQL front-end built on lark, an alternative to `mo_sql_parsing`.
+
+It emits the dict AST of `mo_sql_parsing.parse(query, null=SQL_NULL)`, after the rewrites of VALUES, TIMESTAMP(n),
+`LIMIT a, b` and `= NULL` by `SQLParser`, so that `Encoder.analyze` consumes ASTs of both backends alike.
+Queries are expected to be upper-cased by `SQLParser` beforehand.
+"""
+
+import re
+from typing import Dict
+
+from lark import (
+    Lark,
+    Transformer,
+    Token,
+    v_args,
+)
+from lark.exceptions import LarkError
+
+from constants import SQL_NULL
+from errors import ParserSyntaxError
+from utils import ValuesTable
+
+SQL_GRAMMAR = r'''
+    start: query
+         | subquery
+
+    query: [with_clause] set_expr [order_by] [limit_clause]
+         | [with_clause] subquery order_by [limit_clause]
+         | [with_clause] subquery limit_clause -> query_limit
+    with_clause: "WITH" cte ("," cte)*
+    cte: alias "AS" subquery
+
+    // a parenthesized query alone is an expression, it is a query only with set operations, ORDER BY or LIMIT
+    ?set_expr: set_term
+             | set_expr SET_OP set_operand -> set_operation
+             | subquery SET_OP set_operand -> set_operation
+    ?set_term: select
+             | set_term INTERSECT_OP set_primary -> set_operation
+             | subquery INTERSECT_OP set_primary -> set_operation
+    ?set_operand: set_term
+                | subquery
+    ?set_primary: select
+                | subquery
+    SET_OP.2: /UNION(\s+ALL)?/ | /EXCEPT(\s+ALL)?/
+    INTERSECT_OP.2: /INTERSECT(\s+ALL)?/
+
+    select: "SELECT" [DISTINCT] select_items [from_clause] [where_clause] [groupby_clause] [having_clause]
+    DISTINCT: "DISTINCT"
+    select_items: select_item ("," select_item)*
+    select_item: STAR -> select_star
+               | expr [["AS"] IDENT] -> select_value
+    from_clause: "FROM" from_items
+    from_items: from_item ("," from_item)*
+    ?from_item: table_ref
+              | from_item join_op table_ref [join_condition] -> join
+    join_condition: "ON" expr -> on
+                  | "USING" "(" IDENT ("," IDENT)* ")" -> using
+    join_op: [(INNER | LEFT | RIGHT | FULL) [OUTER]] "JOIN"
+           | "CROSS" "JOIN" -> cross_join
+    table_ref: column [["AS"] alias] -> table
+             | subquery [["AS"] alias] -> derived_table
+             | "(" column ")" [["AS"] alias] -> table
+             | "(" "VALUES" values_row ("," values_row)* ")" ["AS"] alias -> values_table
+             | "LATERAL" subquery [["AS"] alias] -> lateral_table
+    values_row: "(" expr ("," expr)* ")"
+    alias: IDENT ["(" IDENT ("," IDENT)* ")"]
+
+    where_clause: "WHERE" expr
+    groupby_clause: "GROUP" "BY" group_item ("," group_item)*
+    group_item: expr
+              | "GROUPING" "SETS" "(" IDENT ("," IDENT)* ")" -> grouping_sets
+    having_clause: "HAVING" expr
+    order_by: "ORDER" "BY" order_item ("," order_item)*
+    order_item: expr [ASC | DESC] ["NULLS" (FIRST | LAST)]
+    limit_clause: "LIMIT" NUMBER "," NUMBER -> limit_offset
+                | "LIMIT" NUMBER ["OFFSET" NUMBER [ROWS | ROW]] -> limit
+                | "OFFSET" NUMBER [ROWS | ROW] ["FETCH" (NEXT | FIRST) NUMBER (ROWS | ROW) "ONLY"] -> offset
+                | "FETCH" (NEXT | FIRST) NUMBER (ROWS | ROW) "ONLY" -> fetch
+
+    ?expr: or_expr
+    ?or_expr: and_expr
+            | or_expr "OR" and_expr -> or_
+    ?and_expr: not_expr
+             | and_expr "AND" not_expr -> and_
+    ?not_expr: predicate
+             | "NOT" not_expr -> not_
+    // IN, LIKE and BETWEEN bind looser than comparisons in mo_sql_parsing, e.g., `A IN (1) = B` is `A IN ((1) = B)`
+    ?predicate: comparison
+              | predicate [NOT] "IN" comparison -> in_
+              | predicate [NOT] "LIKE" comparison -> like
+              | predicate [NOT] "BETWEEN" comparison "AND" comparison -> between
+    ?comparison: arith_expr
+               | comparison COMP_OP arith_expr
+               | comparison COMP_OP (ANY | ALL | SOME) subquery -> quantified_comparison
+               | comparison "IS" [NOT] "NULL" -> is_null
+               | comparison "IS" [NOT] "DISTINCT" "FROM" arith_expr -> is_distinct_from
+               | comparison "IS" [NOT] (IDENT | TRUE | FALSE) -> is_
+    NOT: "NOT"
+    COMP_OP: "=" | "<>" | "!=" | "<=" | ">=" | "<" | ">"
+
+    // `||` binds tighter than `+` in mo_sql_parsing
+    ?arith_expr: concat_expr
+               | arith_expr "+" concat_expr -> add
+               | arith_expr "-" concat_expr -> sub
+    ?concat_expr: mul_expr
+                | concat_expr "||" mul_expr -> concat
+    ?mul_expr: unary_expr
+             | mul_expr "*" unary_expr -> mul
+             | mul_expr "/" unary_expr -> div
+             | mul_expr "%" unary_expr -> mod
+    ?unary_expr: primary
+               | "-" unary_expr -> neg
+               | "+" unary_expr
+    ?primary: NUMBER -> number
+            | STRING -> string
+            | "NULL" -> null
+            | TRUE -> true
+            | FALSE -> false
+            | "DATE" STRING -> date
+            | "TIMESTAMP" STRING -> timestamp
+            | "INTERVAL" STRING IDENT -> interval
+            | column
+            | function
+            | function "FILTER" "(" "WHERE" expr ")" -> filter
+            | function "OVER" "(" window ")" -> over
+            | "CAST" "(" expr "AS" data_type ")" -> cast
+            | "EXTRACT" "(" IDENT "FROM" expr ")" -> extract
+            | "CASE" case_when+ ["ELSE" expr] "END" -> case
+            | "CASE" expr case_when+ ["ELSE" expr] "END" -> simple_case
+            | "EXISTS" subquery -> exists
+            | subquery
+            | "(" expr ")"
+            | "(" expr ("," expr)+ ")" -> row
+    subquery: "(" query ")"
+    TRUE: "TRUE"
+    FALSE: "FALSE"
+    case_when: "WHEN" expr "THEN" expr
+    function: IDENT "(" [DISTINCT] [args] ")"
+    args: STAR -> star_arg
+        | expr ("," expr)*
+    window: ["PARTITION" "BY" expr ("," expr)*] [order_by] [frame]
+    frame: (ROWS | RANGE) "BETWEEN" frame_bound "AND" frame_bound -> frame_between
+         | (ROWS | RANGE) frame_bound
+    frame_bound: "UNBOUNDED" (PRECEDING | FOLLOWING) -> unbounded
+               | "CURRENT" ROW -> current_row
+               | NUMBER (PRECEDING | FOLLOWING) -> offset_bound
+    data_type: IDENT ["(" NUMBER ("," NUMBER)* ")"]
+             | "DOUBLE" "PRECISION" -> double_precision
+             | "DATE" -> date_type
+             | "TIMESTAMP" ["(" NUMBER ")"] -> timestamp_type
+    column: IDENT ("." IDENT)* ["." STAR]
+
+    // keywords kept in trees
+    INNER: "INNER"
+    OUTER: "OUTER"
+    LEFT: "LEFT"
+    RIGHT: "RIGHT"
+    FULL: "FULL"
+    ASC: "ASC"
+    DESC: "DESC"
+    FIRST: "FIRST"
+    LAST: "LAST"
+    NEXT: "NEXT"
+    ROWS: "ROWS"
+    ROW: "ROW"
+    RANGE: "RANGE"
+    ANY: "ANY"
+    ALL: "ALL"
+    SOME: "SOME"
+    PRECEDING: "PRECEDING"
+    FOLLOWING: "FOLLOWING"
+    STAR: "*"
+    IDENT: /[A-Z_][A-Z0-9_]*/i | /"[^"]+"/ | /`[^`]+`/
+    NUMBER: /(\d+\.?\d*|\.\d+)(E[+-]?\d+)?/i
+    STRING: /'([^']|'')*'/
+
+    %import common.WS
+    %ignore WS
+'''
+
+
+# keywords which are not identifiers unless quoted, e.g., `SELECT FROM T` is not `SELECT "FROM" T`
+RESERVED_KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'UNION', 'EXCEPT', 'INTERSECT',
+    'JOIN', 'ON', 'USING', 'AS', 'AND', 'OR', 'NOT', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'WITH',
+}
+
+
+def _flatten(operator, operands):
+    # n-ary AND/OR/+/*/|| as `mo_sql_parsing` does, parentheses do not matter
+    out = []
+    for operand in operands:
+        if isinstance(operand, Dict) and list(operand) == [operator]:
+            out.extend(operand[operator])
+        else:
+            out.append(operand)
+    return {operator: out}
+
+
+def _one_or_list(items):
+    items = list(items)
+    return items[0] if len(items) == 1 else items
+
+
+def _is_null(value):
+    return isinstance(value, Dict) and value == SQL_NULL
+
+
+@v_args(inline=True)
+class SQLVisitor(Transformer):
+    COMPARISONS = {'=': 'eq', '<>': 'neq', '!=': 'neq', '<': 'lt', '<=': 'lte', '>': 'gt', '>=': 'gte'}
+
+    def __init__(self, null_comparisons=False):
+        super(SQLVisitor, self).__init__()
+        # whether SQLParser rewrites `XX = NULL` into `{'eq': ['XX', NULL]}`, otherwise it is `{'missing': 'XX'}`
+        self.null_comparisons = null_comparisons
+
+    ############################ tokens ############################
+
+    def IDENT(self, token):
+        if token[0] in '"`':
+            return token[1:-1]
+        if token.upper() in RESERVED_KEYWORDS:
+            raise ParserSyntaxError(token)
+        return str(token)
+
+    def number(self, token):
+        value = float(token)
+        if '.' not in token and value == int(value):
+            return int(value)
+        return value
+
+    def string(self, token):
+        return {'literal': token[1:-1].replace("''", "'")}
+
+    def null(self):
+        return dict(SQL_NULL)
+
+    def true(self, _):
+        return True
+
+    def false(self, _):
+        return False
+
+    def date(self, token):
+        return {'date': self.string(token)}
+
+    def timestamp(self, token):
+        return {'timestamp': self.string(token)}
+
+    def interval(self, token, unit):
+        return {'interval': [self.string(token), unit.lower()]}
+
+    def column(self, *names):
+        return '.'.join(str(name) for name in names if name is not None)
+
+    ############################ queries ############################
+
+    def start(self, query):
+        return query
+
+    def query(self, with_clause, body, orderby, limit):
+        clauses = {}
+        if orderby is not None:
+            clauses['orderby'] = orderby
+        if limit is not None:
+            clauses.update(limit)
+        if len(clauses) > 0:
+            if 'select' in body or 'select_distinct' in body:
+                if any(key in body for key in clauses):
+                    # ORDER BY/LIMIT of a parenthesized query
+                    body = {'from': body}
+            else:
+                # ORDER BY/LIMIT of set operations
+                body = {'from': body}
+            body.update(clauses)
+        if with_clause is not None:
+            body['with'] = with_clause
+        return body
+
+    def query_limit(self, with_clause, body, limit):
+        return self.query(with_clause, body, None, limit)
+
+    def with_clause(self, *ctes):
+        return _one_or_list(ctes)
+
+    def cte(self, name, query):
+        return {'name': name, 'value': query}
+
+    def set_operation(self, lhs, operator, rhs):
+        operator = '_'.join(str(operator).lower().split())
+        if operator.startswith('union'):
+            return _flatten(operator, [lhs, rhs])
+        return {operator: [lhs, rhs]}
+
+    def select(self, distinct, items, from_clause, where, groupby, having):
+        query = {('select' if distinct is None else 'select_distinct'): items}
+        for key, value in [('from', from_clause), ('where', where), ('groupby', groupby), ('having', having)]:
+            if value is not None:
+                query[key] = value
+        return query
+
+    def select_items(self, *items):
+        return _one_or_list(items)
+
+    def select_star(self, _):
+        return '*'
+
+    def select_value(self, value, name):
+        # keys are ordered as mo_sql_parsing does, since encoders read the first key of a dict as its operator
+        if isinstance(value, Dict) and 'value' in value and ('over' in value or 'filter' in value):
+            # OVER/FILTER of a select item is merged into the item
+            item = {} if name is None else {'name': name}
+            item['value'] = value['value']
+            item.update((key, clause) for key, clause in value.items() if key != 'value')
+            return item
+        item = {'value': value}
+        if name is not None:
+            item['name'] = name
+        return item
+
+    def from_clause(self, items):
+        return items
+
+    def from_items(self, *items):
+        out = []
+        for item in items:
+            if isinstance(item, list):
+                out.extend(item)
+            else:
+                out.append(item)
+        return _one_or_list(out)
+
+    def join(self, lhs, join_op, rhs, condition):
+        join = {join_op: rhs}
+        if condition is not None:
+            join.update(condition)
+        return (lhs if isinstance(lhs, list) else [lhs]) + [join]
+
+    def join_op(self, join_type, outer):
+        if join_type is None:
+            return 'join'
+        return f'{join_type.lower()} outer join' if outer is not None else f'{join_type.lower()} join'
+
+    def cross_join(self):
+        return 'cross join'
+
+    def on(self, expr):
+        return {'on': expr}
+
+    def using(self, *columns):
+        return {'using': _one_or_list(columns)}
+
+    def table(self, name, alias):
+        return name if alias is None else {'value': name, 'name': alias}
+
+    def derived_table(self, query, alias):
+        return query if alias is None else {'value': query, 'name': alias}
+
+    def lateral_table(self, query, alias):
+        return {'lateral': self.derived_table(query, alias)}
+
+    def values_table(self, *rows_alias):
+        *rows, alias = rows_alias
+        if isinstance(alias, Dict):
+            name, columns = list(alias.items())[0]
+            columns = [columns] if isinstance(columns, str) else columns
+            return ValuesTable(name=name, rows=rows, attributes=columns)
+        return ValuesTable(name=alias, rows=rows)
+
+    def values_row(self, *values):
+        return [{'value': value} for value in values]
+
+    def alias(self, name, *columns):
+        columns = [column for column in columns if column is not None]
+        if len(columns) == 0:
+            return name
+        return {name: _one_or_list(columns)}
+
+    def where_clause(self, expr):
+        return expr
+
+    def having_clause(self, expr):
+        return expr
+
+    def groupby_clause(self, *items):
+        return _one_or_list(items)
+
+    def group_item(self, expr):
+        return {'value': expr}
+
+    def grouping_sets(self, *columns):
+        return {'value': 'GROUPING', 'name': {'SETS': _one_or_list(columns)}}
+
+    def order_by(self, *items):
+        return _one_or_list(items)
+
+    def order_item(self, expr, sort, nulls):
+        item = {'value': expr}
+        if sort is not None:
+            item['sort'] = sort.lower()
+        if nulls is not None:
+            item['nulls'] = nulls.lower()
+        return item
+
+    def limit(self, limit, offset, _):
+        out = {'limit': self.number(limit)}
+        if offset is not None:
+            out['offset'] = self.number(offset)
+        return out
+
+    def limit_offset(self, offset, limit):
+        return {'limit': [self.number(offset), self.number(limit)]}
+
+    def offset(self, offset, _, fetch_order, fetch, __):
+        out = {'offset': self.number(offset)}
+        if fetch is not None:
+            out['fetch'] = self.number(fetch)
+        return out
+
+    def fetch(self, _, fetch, __):
+        return {'fetch': self.number(fetch)}
+
+    ############################ expressions ############################
+
+    def or_(self, lhs, rhs):
+        return _flatten('or', [lhs, rhs])
+
+    def and_(self, lhs, rhs):
+        return _flatten('and', [lhs, rhs])
+
+    def not_(self, expr):
+        return {'not': expr}
+
+    def comparison(self, lhs, operator, rhs):
+        operator = self.COMPARISONS[str(operator)]
+        if operator in {'eq', 'neq'} and (_is_null(lhs) or _is_null(rhs)):
+            if self.null_comparisons and any(
+                    isinstance(operand, str) and re.fullmatch(r'[A-Z_.]+', operand) for operand in (lhs, rhs)):
+                return {operator: [lhs, rhs]}
+            value = rhs if _is_null(lhs) else lhs
+            return {'missing' if operator == 'eq' else 'exists': value}
+        return {operator: [lhs, rhs]}
+
+    def quantified_comparison(self, lhs, operator, quantifier, query):
+        return {self.COMPARISONS[str(operator)]: [lhs, {quantifier.lower(): query}]}
+
+    def is_null(self, expr, not_):
+        return {'missing' if not_ is None else 'exists': expr}
+
+    def is_distinct_from(self, lhs, not_, rhs):
+        return {('eq!' if not_ is None else 'ne!'): [lhs, rhs]}
+
+    def is_(self, lhs, not_, rhs):
+        if isinstance(rhs, Token):
+            rhs = rhs.type == 'TRUE'
+        return {('eq' if not_ is None else 'neq'): [lhs, rhs]}
+
+    def in_(self, lhs, not_, values):
+        return {('in' if not_ is None else 'nin'): [lhs, values]}
+
+    def like(self, lhs, not_, rhs):
+        return {('like' if not_ is None else 'not_like'): [lhs, rhs]}
+
+    def between(self, expr, not_, lower, upper):
+        return {('between' if not_ is None else 'not_between'): [expr, lower, upper]}
+
+    def add(self, lhs, rhs):
+        return _flatten('add', [lhs, rhs])
+
+    def sub(self, lhs, rhs):
+        return {'sub': [lhs, rhs]}
+
+    def concat(self, lhs, rhs):
+        return _flatten('concat', [lhs, rhs])
+
+    def mul(self, lhs, rhs):
+        return _flatten('mul', [lhs, rhs])
+
+    def div(self, lhs, rhs):
+        return {'div': [lhs, rhs]}
+
+    def mod(self, lhs, rhs):
+        return {'mod': [lhs, rhs]}
+
+    def neg(self, expr):
+        if isinstance(expr, int | float) and not isinstance(expr, bool):
+            return -expr
+        return {'neg': expr}
+
+    def row(self, *exprs):
+        if any(isinstance(expr, Dict) and list(expr) == ['literal'] for expr in exprs) and all(
+                isinstance(expr, Dict) and list(expr) == ['literal'] or
+                isinstance(expr, int | float) and not isinstance(expr, bool) and expr >= 0
+                for expr in exprs
+        ):
+            # a list of literals is a literal
+            return {'literal': [expr['literal'] if isinstance(expr, Dict) else expr for expr in exprs]}
+        return list(exprs)
+
+    def subquery(self, query):
+        return query
+
+    def exists(self, query):
+        return {'exists': query}
+
+    def function(self, name, distinct, args):
+        if args is None:
+            args = {}
+        elif isinstance(args, list):
+            args = _one_or_list(args)
+        if distinct is not None:
+            if isinstance(args, list):
+                args = [{'value': arg} for arg in args]
+            args = {'distinct': args}
+        return {name.lower(): args}
+
+    def star_arg(self, _):
+        return '*'
+
+    def args(self, *exprs):
+        return list(exprs)
+
+    def filter(self, function, condition):
+        return {'filter': condition, 'value': function}
+
+    def over(self, function, window):
+        return {'over': window, 'value': function}
+
+    def window(self, *parts):
+        *partitions, orderby, frame = parts
+        window = {}
+        partitions = [partition for partition in partitions if partition is not None]
+        if len(partitions) > 0:
+            window['partitionby'] = _one_or_list(partitions)
+        if orderby is not None:
+            window['orderby'] = orderby
+        if frame is not None and (len(window) > 0 or frame != {'range': {}}):
+            window.update(frame)
+        return window
+
+    def frame_between(self, _, lower, upper):
+        frame = {}
+        if lower[1] is not None:
+            frame['min'] = lower[1]
+        if upper[1] is not None:
+            frame['max'] = upper[1]
+        return {'range': frame}
+
+    def frame(self, _, bound):
+        # `ROWS 1 PRECEDING` is merged into the window
+        frame = {'max': 0}
+        if bound[1] is not None:
+            frame['min'] = bound[1]
+        return frame
+
+    def unbounded(self, direction):
+        return direction, None
+
+    def current_row(self, _):
+        return None, 0
+
+    def offset_bound(self, offset, direction):
+        offset = self.number(offset)
+        return direction, -offset if direction == 'PRECEDING' else offset
+
+    def cast(self, expr, data_type):
+        return {'cast': [expr, data_type]}
+
+    def data_type(self, name, *parameters):
+        parameters = [self.number(parameter) for parameter in parameters if parameter is not None]
+        return {name.lower(): _one_or_list(parameters) if len(parameters) > 0 else {}}
+
+    def double_precision(self):
+        return {'double_precision': {}}
+
+    def date_type(self):
+        return {'date': {}}
+
+    def timestamp_type(self, precision):
+        return {'timestamp': {} if precision is None else self.number(precision)}
+
+    def extract(self, unit, expr):
+        return {'extract': [unit.lower(), expr]}
+
+    def case(self, *clauses):
+        *whens, else_ = clauses
+        whens = list(whens)
+        if else_ is not None:
+            whens.append(else_)
+        return {'case': _one_or_list(whens)}
+
+    def simple_case(self, value, *clauses):
+        *whens, else_ = clauses
+        whens = [{'then': when['then'], 'when': {'eq': [value, when['when']]}} for when in whens]
+        if else_ is not None:
+            whens.append(else_)
+        return {'case': _one_or_list(whens)}
+
+    def case_when(self, condition, value):
+        return {'then': value, 'when': condition}
+
+
+class LarkSQLParser:
+    def __init__(self):
+        self._parser = Lark(SQL_GRAMMAR, parser='lalr', maybe_placeholders=True)
+
+    def parse(self, query: str, null_comparisons: bool = False):
+        try:
+            return SQLVisitor(null_comparisons).transform(self._parser.parse(query))
+        except LarkError as err:
+            raise ParserSyntaxError(query) from err
+
+
+__all__ = [
+    'SQL_GRAMMAR',
+    'SQLVisitor',
+    'LarkSQLParser',
+]
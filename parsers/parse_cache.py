@@ -0,0 +1,116 @@
+# -*- coding:utf-8 -*-
+
+"""
+LRU cache of parsed SQL ASTs keyed by (query, dialect).
+
+ASTs are stored pickled, so that every hit returns a fresh copy which callers are free to mutate.
+If `cache_dir` is given, ASTs are also stored in `<cache_dir>/<md5 of key>.pkl` and shared across processes and runs.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from errors import ParserSyntaxError
+
+# bump it once the parser produces different ASTs, so that stale ASTs on disk are not loaded
+PARSE_CACHE_VERSION = 1
+
+
+class ParseCache:
+    def __init__(self, maxsize: int = 4096, cache_dir: str = None):
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        if self.cache_dir is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        # key -> pickled AST or the error raised by parsing
+        self._cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def lookup(self, key, parse):
+        """
+        a copy of the cached AST of `key`, `parse()` is called on misses
+        """
+        value = self._cache.get(key, None)
+        if value is not None:
+            self._cache.move_to_end(key)
+        else:
+            value = self._load(key)
+        if value is None:
+            self.misses += 1
+            try:
+                value = pickle.dumps(parse(), protocol=pickle.HIGHEST_PROTOCOL)
+            except (ParserSyntaxError, NotImplementedError) as err:
+                # failures are deterministic as well, but only cached in memory
+                self._put(key, err)
+                raise
+            self._dump(key, value)
+            self._put(key, value)
+        else:
+            self.hits += 1
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return pickle.loads(value)
+
+    def _put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._cache[key] = value
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def _file(self, key):
+        key = repr((PARSE_CACHE_VERSION, key))
+        return os.path.join(self.cache_dir, hashlib.md5(key.encode('utf-8')).hexdigest() + '.pkl')
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._file(key), 'rb') as reader:
+                value = reader.read()
+        except FileNotFoundError:
+            return None
+        self._put(key, value)
+        return value
+
+    def _dump(self, key, value):
+        if self.cache_dir is None:
+            return
+        # write and rename, cuz other processes might read the file at the same time
+        fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as writer:
+            writer.write(value)
+        os.replace(tmp_file, self._file(key))
+
+    def clear(self):
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __str__(self):
+        return f'{self.__class__.__name__}(size={len(self)}, hits={self.hits}, misses={self.misses}, ' \
+               f'cache_dir={self.cache_dir})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+# shared by all parsers in a process, forked workers inherit the ASTs parsed before forking
+PARSE_CACHE = ParseCache()
+
+
+def set_parse_cache(maxsize: int = 4096, cache_dir: str = None):
+    """
+    reconfigure the shared cache in place, e.g., `set_parse_cache(cache_dir='.parse_cache')` in benchmark runners
+    """
+    PARSE_CACHE.clear()
+    PARSE_CACHE.maxsize = maxsize
+    PARSE_CACHE.cache_dir = cache_dir
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    return PARSE_CACHE
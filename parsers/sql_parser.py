@@ -6,20 +6,25 @@ from typing import (
     Union,
 )
 
-from mo_parsing import ParseException
-from mo_sql_parsing import parse
-
 from constants import (
     SQL_NULL,
     IS_TRUE,
     IS_FALSE,
     SPACE_STRING,
     DIALECT,
+    PARSER_BACKEND,
 )
 from errors import (
     ParserSyntaxError,
 )
-from logger import LOGGER
+from logger import (
+    LOGGER,
+    TRACER,
+)
+from parsers.parse_cache import (
+    ParseCache,
+    PARSE_CACHE,
+)
 from utils import (
     is_date_format,
     ValuesTable,
@@ -32,6 +37,17 @@ VALUES_REGEX = r'\(VALUES\s*\(\S+\s*\S*(\s*,\s*\S+\s*\S*)*\)(\s*,\s*\(\S+\s*\S*(
 LIMIT_REGEX = r'LIMIT\s+\d+,\s*\d+'
 
 
+def parse(query: str, **kwargs):
+    # mo_sql_parsing builds its grammar when imported, so it is imported by the first query it parses
+    from mo_parsing import ParseException
+    from mo_sql_parsing import parse as _parse
+
+    try:
+        return _parse(query, **kwargs)
+    except ParseException as err:
+        raise ParserSyntaxError(query) from err
+
+
 def is_VALUES(value):
     # {'value': 'VALUES', 'name': XX}
     return isinstance(value, Dict) and value.get('value', False) == 'VALUES' and value.get('name', False)
@@ -77,12 +93,45 @@ def parse_from_values(values, VALUE_TABLES):
 
 
 class SQLParser:
-    def __init__(self):
+    # LALR parser of the lark backend, built once it is used
+    _lark_parser = None
+
+    def __init__(self, cache: ParseCache = None, backend=PARSER_BACKEND.MO_SQL_PARSING):
         " a + b -c"
         "GroupByTable: 10k"
-        pass
+        # parsed ASTs are shared by parsers unless a dedicated cache is given
+        self.cache = cache if cache is not None else PARSE_CACHE
+        if backend not in {PARSER_BACKEND.MO_SQL_PARSING, PARSER_BACKEND.LARK}:
+            raise NotImplementedError(f"Parser backend `{backend}` is not supported.")
+        self.backend = backend
 
     def parse(self, query: str, dialect=DIALECT.ALL):
+        # every call returns a copy of the cached AST, since analyzing queries modifies their ASTs
+        if self.backend == PARSER_BACKEND.MO_SQL_PARSING:
+            key = (query, dialect)
+        else:
+            key = (query, dialect, self.backend)
+        with TRACER.span('parse', query=query, backend=self.backend) as span:
+            misses = self.cache.misses
+            ast = self.cache.lookup(key, lambda: self._parse(query, dialect))
+            span.set(cached=self.cache.misses == misses)
+        return ast
+
+    def _lark_parse(self, query: str, dialect=DIALECT.ALL):
+        if SQLParser._lark_parser is None:
+            from parsers.lark_sql_parser import LarkSQLParser
+
+            SQLParser._lark_parser = LarkSQLParser()
+        values = re.search(VALUES_REGEX, query) is not None
+        if values and dialect not in {DIALECT.ALL, DIALECT.PSQL, DIALECT.POSTGRESQL}:
+            raise NotImplementedError(f"Only PostgreSQL supports VALUES, but your dialect is {dialect}")
+        # the grammar covers VALUES, TIMESTAMP(n), `LIMIT a, b` and `FROM (T)`, while `XX = NULL` is kept as a
+        # comparison only if none of them appears, as the mo_sql_parsing backend does
+        null_comparisons = not values and 'TIMESTAMP' not in query and \
+                           re.search(LIMIT_REGEX, query) is None and len(re.findall(FROM_REGEX, query)) == 0
+        return SQLParser._lark_parser.parse(query, null_comparisons=null_comparisons)
+
+    def _parse(self, query: str, dialect=DIALECT.ALL):
         # preprocessing
 
         query = query.replace('$', '_DOLLAR_') \
@@ -165,7 +214,9 @@ class SQLParser:
 
         try:
             query = str.upper(query)
-            if re.search(VALUES_REGEX, query) is not None:
+            if self.backend == PARSER_BACKEND.LARK:
+                parsed_query = self._lark_parse(query, dialect)
+            elif re.search(VALUES_REGEX, query) is not None:
                 if dialect not in {DIALECT.ALL, DIALECT.PSQL, DIALECT.POSTGRESQL}:
                     raise NotImplementedError(f"Only PostgreSQL supports VALUES, but your dialect is {dialect}")
                 sub_queries, VALUE_TABLES = [], []
@@ -316,9 +367,9 @@ class SQLParser:
             _remove_dots(parsed_query)
             LOGGER.debug(parsed_query)
             return parsed_query
-        except ParseException as err:
+        except ParserSyntaxError as err:
             LOGGER.debug(query)
-            LOGGER.debug(err)
+            LOGGER.debug(err.__cause__ or err)
             raise ParserSyntaxError(query)
 
     def __str__(self):
@@ -2,6 +2,8 @@
 
 import pprint
 
+import utils
+from constants import ORDERED_OPERATORS
 from context import Context
 from encoder import Encoder
 from logger import LOGGER
@@ -22,7 +24,11 @@ class Scope:
         self.tuple_sorts = self.environment.tuple_sorts
         self.databases = self.environment.databases
         self.base_databases = self.environment.base_databases
+        self.primary_keys = self.environment.primary_keys
+        self.foreign_keys = self.environment.foreign_keys
         self.bound_constraints = self.environment.bound_constraints
+        self.attribute_applications = self.environment.attribute_applications
+        self.encoded_tuple_sorts = self.environment.encoded_tuple_sorts
         self._display_datasets = set(self.databases.keys())
 
         # function
@@ -43,8 +49,12 @@ class Scope:
         self._declare_value = self.environment._declare_value
         self._get_variable = self.environment._get_variable
         self._get_tuple_sort = self.environment._get_tuple_sort
+        self._apply_attribute = self.environment._apply_attribute
         self._declare_tuple = self.environment._declare_tuple
         self._declare_tuple_sort = self.environment._declare_tuple_sort
+        self._alias_tuple_sort = self.environment._alias_tuple_sort
+        self.find_shared_tuple_sorts = self.environment.find_shared_tuple_sorts
+        self.share_tuple_sorts = self.environment.share_tuple_sorts
         self.register_tuple = self.environment.register_tuple
         self.register_tuple_sort = self.environment.register_tuple_sort
         self.register_database = self.environment.register_database
@@ -55,6 +65,10 @@ class Scope:
         # self._declare_lb_attribute = self.environment._declare_lb_attribute
         # self._declare_ub_attribute = self.environment._declare_ub_attribute
         self.orderby_constraints = None
+        # filters of subqueries are not shared, cuz outer attributes could shadow theirs
+        self.subquery_depth = 0
+        # whether the order of tuples matters, e.g., ORDER BY; otherwise joins might reorder tuples
+        self.is_ordered = True
 
         # type
         self.TupleSort = self.environment.TupleSort
@@ -104,18 +118,19 @@ class Scope:
     ############################ with construction ############################
 
     def __enter__(self):
-        LOGGER.debug(f'############################ CREATING SCOPE-{self.name} ############################')
+        LOGGER.debug('############################ CREATING SCOPE-%s ############################', self.name)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         del self.visitor
         # remove partial info from the current query in environment
         self.environment.reload_checkpoints(keys=['variables', 'attributes', 'functions', 'databases'])
-        LOGGER.debug(f'############################ SCOPE-{self.name} Cleared ############################\n\n')
+        LOGGER.debug('############################ SCOPE-%s Cleared ############################\n\n', self.name)
 
     ############################ Analyze SQL AST ############################
 
     def analyze(self, query) -> Context:
+        self.is_ordered = len(utils.operators(query) & ORDERED_OPERATORS) > 0
         ctx = self.encoder.analyze(query)
         return ctx
 
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Named solving profiles for the equivalence goal `Not(premise => conclusion)`.
+
+A profile optionally simplifies the goal with a chain of z3 tactics and then checks the (simplified) goal with
+either the generic solver or a logic-specific one, e.g., `SolverFor('QF_UFLIA')`.
+Models of a simplified goal are converted back to the original goal, so counterexamples are unaffected.
+"""
+
+from z3 import (
+    Goal,
+    Solver,
+    SolverFor,
+    Then,
+    Tactic,
+)
+
+from errors import NotSupportedError
+
+
+class SolvingProfile:
+    def __init__(self, name: str, tactics=None, logic: str = None):
+        self.name = name
+        self.tactics = list(tactics) if tactics is not None else []
+        self.logic = logic
+
+    def solver(self, ctx):
+        if self.logic is None:
+            return Solver(ctx=ctx)
+        else:
+            return SolverFor(self.logic, ctx=ctx)
+
+    def tactic(self, ctx):
+        if len(self.tactics) == 0:
+            return None
+        elif len(self.tactics) == 1:
+            return Tactic(self.tactics[0], ctx=ctx)
+        else:
+            return Then(*self.tactics, ctx=ctx)
+
+    def preprocess(self, formula, ctx):
+        """
+        apply the tactic chain to `formula`, return the simplified goal or None if no tactic is given
+        """
+        tactic = self.tactic(ctx)
+        if tactic is None:
+            return None
+        goal = Goal(ctx=ctx)
+        goal.add(formula)
+        subgoals = tactic(goal)
+        # preprocessing tactics must not split goals
+        if len(subgoals) != 1:
+            raise NotSupportedError(f"tactics `{self.tactics}` splitting the goal into {len(subgoals)} subgoals")
+        return subgoals[0]
+
+    def __str__(self):
+        return f'{self.__class__.__name__}(name={self.name}, tactics={self.tactics}, logic={self.logic})'
+
+    def __repr__(self):
+        return self.__str__()
+
+
+PREPROCESSING_TACTICS = ['simplify', 'propagate-values', 'solve-eqs', 'elim-uncnstr', 'ctx-simplify']
+
+SOLVING_PROFILES = {
+    profile.name: profile
+    for profile in [
+        SolvingProfile('default'),
+        SolvingProfile('preprocess', tactics=PREPROCESSING_TACTICS),
+        SolvingProfile('qf_uflia', logic='QF_UFLIA'),
+        SolvingProfile('preprocess_qf_uflia', tactics=PREPROCESSING_TACTICS, logic='QF_UFLIA'),
+    ]
+}
+DEFAULT_PROFILE = 'default'
+
+
+def get_solving_profile(profile) -> SolvingProfile:
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    if isinstance(profile, SolvingProfile):
+        return profile
+    if profile not in SOLVING_PROFILES:
+        raise NotSupportedError(f"solving profile `{profile}`")
+    return SOLVING_PROFILES[profile]
+
+
+__all__ = [
+    'SolvingProfile',
+    'SOLVING_PROFILES',
+    'DEFAULT_PROFILE',
+    'PREPROCESSING_TACTICS',
+    'get_solving_profile',
+]
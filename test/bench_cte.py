@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+Encoding size of queries referencing the same WITH clause several times
+
+python -m test.bench_cte [bound_size]
+
+Each WITH query is reported next to the same query with its references inlined as subqueries.
+"""
+
+import sys
+import time
+
+from environment import Environment
+from scope import Scope
+
+SCHEMA = {
+    'EMPLOYEE': {'ID': 'INT', 'SALARY': 'INT', 'DEPARTMENTID': 'INT', 'MANAGERID': 'INT'},
+}
+CTE = "SELECT DEPARTMENTID, MAX(SALARY) AS TOP FROM EMPLOYEE GROUP BY DEPARTMENTID"
+CASES = [
+    ('self join',
+     f"WITH T AS ({CTE}) SELECT A.DEPARTMENTID FROM T A JOIN T B ON A.TOP > B.TOP",
+     f"SELECT A.DEPARTMENTID FROM ({CTE}) A JOIN ({CTE}) B ON A.TOP > B.TOP"),
+    ('scalar subquery',
+     f"WITH T AS ({CTE}) SELECT DEPARTMENTID FROM T WHERE TOP > (SELECT AVG(TOP) FROM T)",
+     f"SELECT DEPARTMENTID FROM ({CTE}) A WHERE TOP > (SELECT AVG(TOP) FROM ({CTE}) B)"),
+    ('IN subquery',
+     f"WITH T AS ({CTE}) SELECT E.ID FROM EMPLOYEE E, T WHERE E.DEPARTMENTID = T.DEPARTMENTID AND "
+     f"E.SALARY IN (SELECT TOP FROM T)",
+     f"SELECT E.ID FROM EMPLOYEE E, ({CTE}) A WHERE E.DEPARTMENTID = A.DEPARTMENTID AND "
+     f"E.SALARY IN (SELECT TOP FROM ({CTE}) B)"),
+    ('three references',
+     f"WITH T AS ({CTE}) SELECT DEPARTMENTID FROM T WHERE TOP > (SELECT MIN(TOP) FROM T) "
+     f"UNION ALL SELECT DEPARTMENTID FROM T",
+     f"SELECT DEPARTMENTID FROM ({CTE}) A WHERE TOP > (SELECT MIN(TOP) FROM ({CTE}) B) "
+     f"UNION ALL SELECT DEPARTMENTID FROM ({CTE}) C"),
+]
+
+
+def encoding_size(query, bound_size):
+    with Environment() as env:
+        for name, attributes in SCHEMA.items():
+            env.create_database(attributes=attributes, name=name, bound_size=bound_size)
+        env.save_checkpoints()
+        start = time.perf_counter()
+        with Scope(env) as scope:
+            _, formulas = scope.visit(scope.analyze(env.parse_sql_query(query)))
+        elapsed = time.perf_counter() - start
+        return len(formulas), sum(len(formula.code.sexpr()) for formula in formulas), elapsed
+
+
+def main(bound_size=3):
+    print(f'{"query":<18}{"#formulas":>10}{"size":>10}{"time (s)":>10}'
+          f'{"#inlined":>10}{"size":>10}{"time (s)":>10}')
+    for name, with_query, inlined_query in CASES:
+        num, size, elapsed = encoding_size(with_query, bound_size)
+        inlined_num, inlined_size, inlined_elapsed = encoding_size(inlined_query, bound_size)
+        print(f'{name:<18}{num:>10}{size:>10}{elapsed:>10.3f}'
+              f'{inlined_num:>10}{inlined_size:>10}{inlined_elapsed:>10.3f}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""
+Micro-benchmark of fast_ast against the installed z3.py
+
+python -m test.bench_fast_ast [repeats]
+
+If the patched files in `z3py_libs` are copied over the installed z3 package, the `z3.py` column reports them.
+"""
+
+import sys
+import time
+
+import z3
+
+import fast_ast
+from constants import Z3_CONTEXT
+
+
+def _timeit(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return time.perf_counter() - start
+
+
+def main(repeats=20000):
+    T = z3.DeclareSort('T', ctx=Z3_CONTEXT)
+    deleted = z3.Function('DELETED', T, z3.BoolSort(ctx=Z3_CONTEXT))
+    null = z3.Function('NULL', T, z3.StringSort(ctx=Z3_CONTEXT), z3.BoolSort(ctx=Z3_CONTEXT))
+    emp_age = z3.Function('EMP__AGE', T, z3.IntSort(ctx=Z3_CONTEXT))
+    attr_age = z3.StringVal('EMP__AGE', ctx=Z3_CONTEXT)
+    t1, t2 = z3.Const('t1', T), z3.Const('t2', T)
+    a, b = deleted(t1), deleted(t2)
+    x, y = emp_age(t1), emp_age(t2)
+
+    cases = [
+        ('column application', lambda: emp_age(t1), lambda: fast_ast.app(emp_age, t1)),
+        ('DELETED application', lambda: deleted(t1), lambda: fast_ast.app(deleted, t1)),
+        ('NULL application', lambda: null(t1, attr_age), lambda: fast_ast.app(null, t1, attr_age)),
+        ('And', lambda: z3.And(a, b), lambda: fast_ast.And(a, b)),
+        ('Or', lambda: z3.Or(a, b), lambda: fast_ast.Or(a, b)),
+        ('If', lambda: z3.If(a, x, y), lambda: fast_ast.If(a, x, y)),
+        ('IntVal', lambda: z3.IntVal(42, ctx=Z3_CONTEXT), lambda: fast_ast.IntVal(42, ctx=Z3_CONTEXT)),
+    ]
+    print(f'{"term":<22}{"z3.py (s)":>12}{"fast_ast (s)":>14}{"speedup":>10}')
+    for name, slow, fast in cases:
+        assert z3.eq(slow(), fast()), name
+        slow_time, fast_time = _timeit(slow, repeats), _timeit(fast, repeats)
+        print(f'{name:<22}{slow_time:>12.4f}{fast_time:>14.4f}{slow_time / fast_time:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+"""
+Import time of entry modules, read from `python -X importtime`
+
+python -m test.bench_import [repeat]
+
+Every module is imported by a fresh interpreter, and its median cumulative import time is checked against its budget.
+Exits with 1 if any budget is exceeded or a deferred module is imported at startup.
+"""
+
+import statistics
+import subprocess
+import sys
+
+from constants import PROJ_PATH
+
+# cumulative import time budgets (ms)
+IMPORT_BUDGETS = {
+    'environment': 250,
+    'parsers': 120,
+    'formulas': 10,
+}
+# modules imported on first use only, e.g., SQL/constraint parsers other than the ones in use
+DEFERRED_MODULES = ['mo_sql_parsing', 'mo_parsing', 'lark', 'yaml']
+
+
+def import_times(module):
+    """
+    [(depth, imported module, cumulative import time (ms))] of importing `module` in a fresh interpreter,
+    where modules follow the ones they import
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJ_PATH, capture_output=True, text=True, check=True,
+    )
+    times = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times.append(((len(name) - len(name.lstrip())) // 2, name.strip(), int(cumulative) / 1000))
+    return times
+
+
+def top_imports(times, module, k=5):
+    # modules imported by `module` directly
+    index = max(i for i, (_, name, _) in enumerate(times) if name == module)
+    depth, imports = times[index][0], []
+    for child_depth, name, cumulative in reversed(times[:index]):
+        if child_depth <= depth:
+            break
+        if child_depth == depth + 1:
+            imports.append((name, cumulative))
+    return sorted(imports, key=lambda item: -item[1])[:k]
+
+
+def main(repeat=5):
+    exceeded = False
+    print(f'{"module":<16}{"median (ms)":>12}{"budget (ms)":>12}  top imports')
+    for module, budget in IMPORT_BUDGETS.items():
+        runs = [import_times(module) for _ in range(repeat)]
+        median = statistics.median(cumulative for times in runs for _, name, cumulative in times if name == module)
+        top = top_imports(runs[0], module)
+        print(f'{module:<16}{median:>12.1f}{budget:>12}  ' + ', '.join(f'{name} {t:.1f}' for name, t in top))
+        deferred = [name for name in DEFERRED_MODULES if any(name == imported for _, imported, _ in runs[0])]
+        if median > budget:
+            print(f'  `{module}` exceeds its budget')
+            exceeded = True
+        if len(deferred) > 0:
+            print(f'  `{module}` imports deferred modules: {deferred}')
+            exceeded = True
+    sys.exit(int(exceeded))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
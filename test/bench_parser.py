@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""
+Parsing time of benchmark queries under both parser backends
+
+python -m test.bench_parser [repeat]
+
+ASTs are not cached, and the lark backend is timed after its LALR tables are built.
+"""
+
+import glob
+import os
+import sys
+import time
+
+import ujson
+
+from constants import (
+    PROJ_PATH,
+    PARSER_BACKEND,
+)
+from errors import ParserSyntaxError
+from parsers import (
+    ParseCache,
+    SQLParser,
+)
+
+
+def benchmark_queries():
+    queries = {}
+    for file in sorted(glob.glob(os.path.join(PROJ_PATH, 'benchmarks', '*', '*.jsonlines'))):
+        with open(file, 'r') as reader:
+            for line in reader:
+                for query in ujson.loads(line)['pair']:
+                    queries[query] = None
+    return list(queries)
+
+
+def parsing_time(backend, queries, repeat=1):
+    parser = SQLParser(cache=ParseCache(maxsize=0), backend=backend)
+    start = time.perf_counter()
+    # build parsers beforehand, e.g., LALR tables of lark
+    try:
+        parser.parse(queries[0])
+    except ParserSyntaxError:
+        pass
+    warmup = time.perf_counter() - start
+    times, failures = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            try:
+                parser.parse(query)
+            except ParserSyntaxError:
+                failures += 1
+        times.append((time.perf_counter() - start) / repeat)
+    return warmup, times, failures // repeat
+
+
+def main(repeat=1):
+    queries = benchmark_queries()
+    print(f'{len(queries)} queries')
+    print(f'{"backend":<16}{"warmup (s)":>12}{"total (s)":>12}{"mean (ms)":>12}{"median (ms)":>12}'
+          f'{"max (ms)":>12}{"#errors":>10}')
+    for backend in [PARSER_BACKEND.MO_SQL_PARSING, PARSER_BACKEND.LARK]:
+        warmup, times, failures = parsing_time(backend, queries, repeat)
+        times = sorted(times)
+        print(f'{backend:<16}{warmup:>12.3f}{sum(times):>12.3f}{1000 * sum(times) / len(times):>12.3f}'
+              f'{1000 * times[len(times) // 2]:>12.3f}{1000 * times[-1]:>12.3f}{failures:>10}')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
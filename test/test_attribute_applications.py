@@ -0,0 +1,43 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from z3 import eq
+
+from environment import Environment
+
+
+class TestAttributeApplications(TestCase):
+    def setUp(self):
+        self.env = Environment()
+        self.env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=2, name='EMP')
+        self.env.save_checkpoints()
+        table = self.env.databases['EMP']
+        self.attribute = table.attributes[0]
+        self.tuple_sorts = [tuple.SORT for tuple in table.tuples]
+
+    def tearDown(self):
+        self.env.__exit__(None, None, None)
+
+    def test_memo(self):
+        t0, t1 = self.tuple_sorts
+        out = self.env._apply_attribute(self.attribute, t0)
+        self.assertIs(self.env._apply_attribute(self.attribute, t0), out)
+        self.assertIsNot(self.env._apply_attribute(self.attribute, t1), out)
+        self.assertTrue(eq(out.VALUE, self.attribute(t0).VALUE))
+
+    def test_rebound_alias(self):
+        # an alias attribute shares the uuid of its origin, but not its z3 functions
+        t0 = self.tuple_sorts[0]
+        out = self.env._apply_attribute(self.attribute, t0)
+        alias = self.env.declare_attribute('E', 'ID', _uuid=self.attribute._uuid)
+        alias_out = self.env._apply_attribute(alias, t0)
+        self.assertIsNot(alias_out, out)
+        self.assertTrue(eq(alias_out.VALUE, alias(t0).VALUE))
+        self.assertFalse(eq(alias_out.VALUE, out.VALUE))
+
+    def test_reload_checkpoints(self):
+        self.env._apply_attribute(self.attribute, self.tuple_sorts[0])
+        self.assertGreater(len(self.env.attribute_applications), 0)
+        self.env.reload_checkpoints()
+        self.assertEqual(len(self.env.attribute_applications), 0)
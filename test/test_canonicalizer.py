@@ -0,0 +1,37 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from parsers import (
+    canonical_hash,
+    is_syntactically_equivalent,
+)
+
+
+class TestCanonicalizer(TestCase):
+    def test_alias_renaming(self):
+        sql1 = "SELECT E.id FROM EMP AS E JOIN DEPT AS D ON E.dept_id = D.id"
+        sql2 = "SELECT X.id FROM EMP X JOIN DEPT Y ON X.dept_id = Y.id"
+        self.assertTrue(is_syntactically_equivalent([sql1, sql2]))
+        sql2 = "SELECT Y.id FROM EMP X JOIN DEPT Y ON X.dept_id = Y.id"
+        self.assertFalse(is_syntactically_equivalent([sql1, sql2]))
+
+    def test_commutative_operators(self):
+        sql1 = "SELECT id FROM EMP WHERE age > 25 AND (id = 1 OR name = 'A')"
+        sql2 = "SELECT id FROM EMP WHERE (name = 'A' OR 1 = id) AND 25 < age"
+        self.assertTrue(is_syntactically_equivalent([sql1, sql2]))
+        sql2 = "SELECT id FROM EMP WHERE age < 25 AND (id = 1 OR name = 'A')"
+        self.assertFalse(is_syntactically_equivalent([sql1, sql2]))
+
+    def test_literals(self):
+        self.assertEqual(canonical_hash("SELECT id FROM EMP WHERE age = 2.0"),
+                         canonical_hash("SELECT id FROM EMP WHERE age = 2"))
+        # string literals are never renamed
+        self.assertNotEqual(canonical_hash("SELECT E.id FROM EMP E WHERE E.name = 'E'"),
+                            canonical_hash("SELECT X.id FROM EMP X WHERE X.name = 'X'"))
+
+    def test_ambiguous_aliases(self):
+        # an alias shadowing a table name is left to the verifier
+        self.assertIsNone(canonical_hash("SELECT DEPT.id FROM EMP AS DEPT, DEPT"))
+        self.assertIsNone(canonical_hash("SELECT FROM WHERE"))
+        self.assertFalse(is_syntactically_equivalent(["SELECT FROM WHERE", "SELECT FROM WHERE"]))
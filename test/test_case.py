@@ -0,0 +1,80 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from errors import NotSupportedError
+from formulas.tables import (
+    FFilterTable,
+    FGroupByTable,
+)
+from scope import Scope
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'id': 'int', 'age': 'int', 'sal': 'int', 'dept_id': 'int'},
+}
+
+
+class TestCasePredicate(TestCase):
+    def test_where_case(self):
+        sql1 = "SELECT id FROM EMP WHERE CASE WHEN age > 20 THEN sal ELSE dept_id END > 5"
+        sql2 = "SELECT id FROM EMP WHERE (age > 20 AND sal > 5) OR ((age <= 20 OR age IS NULL) AND dept_id > 5)"
+        with environment(SCHEMA) as env:
+            with Scope(env) as scope:
+                # a single filter rather than a union of filters per branch
+                table = scope.analyze(env.parse_sql_query(sql1)).prev_database
+                self.assertIsInstance(table.fathers[0], FFilterTable)
+                self.assertEqual(len(table), 2)
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql1 = "SELECT id FROM EMP WHERE CASE WHEN age > 20 THEN TRUE ELSE FALSE END"
+        sql2 = "SELECT id FROM EMP WHERE age > 20"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_nested_case(self):
+        # nested CASE in a WHEN clause
+        sql1 = "SELECT id FROM EMP WHERE CASE WHEN (CASE WHEN age > 20 THEN 1 ELSE 0 END) = 1 THEN sal ELSE 0 END > 5"
+        sql2 = "SELECT id FROM EMP WHERE age > 20 AND sal > 5"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql2 = "SELECT id FROM EMP WHERE sal > 5"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+
+    def test_groupby_case(self):
+        sql1 = "SELECT SUM(id) FROM EMP GROUP BY CASE WHEN age > 20 THEN sal ELSE dept_id END"
+        sql2 = "SELECT SUM(id) FROM EMP GROUP BY CASE WHEN age <= 20 OR age IS NULL THEN dept_id ELSE sal END"
+        with environment(SCHEMA) as env:
+            with Scope(env) as scope:
+                # a group table over the base table, not over a union of filters per branch
+                table = scope.analyze(env.parse_sql_query(sql1)).prev_database
+                while not isinstance(table, FGroupByTable):
+                    table = table.fathers[0]
+                self.assertEqual(len(table), 2)
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql2 = "SELECT SUM(id) FROM EMP GROUP BY sal"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+
+    def test_predicate_compared_to_bool(self):
+        # `x IN (SELECT ...) = TRUE` is parsed as `x IN ((SELECT ...) = TRUE)`, e.g., calcite pair 380
+        for sql1 in [
+            "SELECT id FROM EMP WHERE id < CASE WHEN age IN (SELECT sal FROM EMP) = TRUE THEN 10 ELSE 30 END",
+            "SELECT id FROM EMP WHERE id < CASE WHEN age NOT IN (SELECT sal FROM EMP) <> FALSE THEN 10 ELSE 30 END",
+        ]:
+            with self.subTest(sql1=sql1), environment(SCHEMA) as env:
+                with self.assertRaises(NotSupportedError):
+                    env.analyze(sql1, "SELECT id FROM EMP")
+        # other predicates compared with booleans are encoded
+        for sql1, sql2 in [
+            (
+                "SELECT id FROM EMP WHERE id < CASE WHEN (age IN (1, 2)) = TRUE THEN 10 ELSE 30 END",
+                "SELECT id FROM EMP WHERE id < CASE WHEN age IN (1, 2) THEN 10 ELSE 30 END",
+            ),
+            (
+                "SELECT id FROM EMP WHERE id < CASE WHEN EXISTS (SELECT sal FROM EMP) <> FALSE THEN 10 ELSE 30 END",
+                "SELECT id FROM EMP WHERE id < CASE WHEN EXISTS (SELECT sal FROM EMP) THEN 10 ELSE 30 END",
+            ),
+        ]:
+            with self.subTest(sql1=sql1), environment(SCHEMA) as env:
+                self.assertTrue(env.analyze(sql1, sql2))
@@ -0,0 +1,64 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from z3 import (
+    Bool,
+    Int,
+    eq,
+    is_and,
+    is_or,
+)
+
+from constants import (
+    And,
+    If,
+    Implies,
+    Not,
+    Or,
+    Z3_FALSE,
+    Z3_TRUE,
+)
+
+
+class TestSmartConstructors(TestCase):
+    def setUp(self):
+        self.a, self.b, self.c = Bool('a'), Bool('b'), Bool('c')
+
+    def assertZ3Equal(self, lhs, rhs):
+        self.assertTrue(eq(lhs, rhs), f'{lhs} != {rhs}')
+
+    def test_constants(self):
+        # TRUE/FALSE operands are dropped, or absorb the others
+        self.assertZ3Equal(And(Z3_TRUE, self.a, True), self.a)
+        self.assertZ3Equal(And(self.a, Z3_FALSE), Z3_FALSE)
+        self.assertZ3Equal(Or(Z3_FALSE, self.a, False), self.a)
+        self.assertZ3Equal(Or(self.a, Z3_TRUE), Z3_TRUE)
+        self.assertZ3Equal(And(), Z3_TRUE)
+        self.assertZ3Equal(Or(), Z3_FALSE)
+        self.assertZ3Equal(Not(Z3_TRUE), Z3_FALSE)
+        self.assertZ3Equal(Not(Not(self.a)), self.a)
+
+    def test_single_operand(self):
+        self.assertZ3Equal(And(self.a), self.a)
+        self.assertZ3Equal(Or([self.a]), self.a)
+
+    def test_flatten(self):
+        formula = And(And(self.a, self.b), self.c)
+        self.assertTrue(is_and(formula))
+        self.assertEqual(formula.num_args(), 3)
+        formula = Or(self.a, Or(self.b, self.c))
+        self.assertTrue(is_or(formula))
+        self.assertEqual(formula.num_args(), 3)
+
+    def test_if(self):
+        x, y = Int('x'), Int('y')
+        self.assertZ3Equal(If(Z3_TRUE, x, y), x)
+        self.assertZ3Equal(If(Z3_FALSE, x, y), y)
+        self.assertZ3Equal(If(self.a, x, x), x)
+
+    def test_implies(self):
+        self.assertZ3Equal(Implies(Z3_FALSE, self.a), Z3_TRUE)
+        self.assertZ3Equal(Implies(self.a, Z3_TRUE), Z3_TRUE)
+        self.assertZ3Equal(Implies(Z3_TRUE, self.a), self.a)
+        self.assertZ3Equal(Implies(self.a, Z3_FALSE), Not(self.a))
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+from lark.exceptions import LarkError
+
+from parsers.constraint_parser import ConstraintParser
+
+
+class TestConstraintParser(TestCase):
+    def setUp(self):
+        self.parser = ConstraintParser()
+
+    def test_parse(self):
+        self.assertEqual(
+            self.parser.parse('EMP.age <- [1, 100]; EMP.name != NULL; unique(EMP.id)'),
+            ConstraintParser().parse('EMP.age <- [1, 100]')
+            + ConstraintParser().parse('EMP.name != NULL')
+            + ConstraintParser().parse('unique(EMP.id)'),
+        )
+        with self.assertRaises(LarkError):
+            self.parser.parse('EMP.age == 1')
+
+    def test_parse_dir(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, 'a.yml')
+            with open(file, 'w') as writer:
+                writer.write("EMP: 'EMP.age <- [1, 100]; EMP.age == 1'\nDEPT: 'unique(DEPT.id)'\n")
+            os.makedirs(os.path.join(directory, 'b'))
+            with open(os.path.join(directory, 'b', 'c.yaml'), 'w') as writer:
+                writer.write("DEPT: 'unique(DEPT.id)'\n")
+            cache_file = os.path.join(directory, 'cache', 'constraints.json')
+
+            out = self.parser.parse_dir(directory, cache_file)
+            self.assertEqual(sorted(out), ['a.yml', os.path.join('b', 'c.yaml')])
+            # unknown constraints are dropped and flagged
+            self.assertEqual(
+                out['a.yml']['constraint'],
+                self.parser.parse('EMP.age <- [1, 100]; unique(DEPT.id)'),
+            )
+            self.assertTrue(out['a.yml']['contain_unsupported_constraints'])
+            self.assertFalse(out[os.path.join('b', 'c.yaml')]['contain_unsupported_constraints'])
+
+            # unmodified files are not recompiled
+            stat = os.stat(file)
+            with open(file, 'w') as writer:
+                writer.write("EMP: 'EMP.age <- [1, 10]'\n")
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertEqual(ConstraintParser().parse_dir(directory, cache_file), out)
+
+            os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            out = ConstraintParser().parse_dir(directory, cache_file)
+            self.assertEqual(out['a.yml']['constraint'], self.parser.parse('EMP.age <- [1, 10]'))
+            self.assertFalse(out['a.yml']['contain_unsupported_constraints'])
@@ -0,0 +1,39 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'ID': 'INT', 'NAME': 'VARCHAR', 'AGE': 'INT'},
+}
+
+
+class TestCounterexample(TestCase):
+    def test_base_tables(self):
+        with environment(SCHEMA, generate_code=True, show_counterexample=True) as env:
+            self.assertFalse(env.analyze("SELECT ID FROM EMP WHERE AGE > 1", "SELECT ID FROM EMP"))
+            model, table = env.model, env.base_databases['EMP']
+            rows = env.counterexample_dict['EMP']
+            self.assertEqual(len(rows), len(table.tuples))
+            for tuple, row in zip(table.tuples, rows):
+                self.assertEqual(list(row), ['ID', 'NAME', 'AGE'])
+                self.assertIn(f"INSERT INTO EMP VALUES ({', '.join(row.values())});", env.counterexample)
+                for attr in table.attributes:
+                    if str(model.eval(attr.NULL(tuple.SORT), model_completion=True)) == 'True':
+                        self.assertEqual(row[attr.name], 'NULL')
+                    elif attr.name == 'NAME':
+                        self.assertTrue(row[attr.name].startswith("'") and row[attr.name].endswith("'"))
+                    else:
+                        self.assertEqual(row[attr.name], str(model.eval(attr.VALUE(tuple.SORT))))
+
+    def test_output_tables(self):
+        with environment(SCHEMA, generate_code=True, show_counterexample=True) as env:
+            self.assertFalse(env.analyze("SELECT ID FROM EMP WHERE AGE > 1", "SELECT ID FROM EMP"))
+            sql1, sql2 = env.counterexample.split('-- ----------sql1------------\n')[1].split(
+                '-- ----------sql2------------\n')
+            rows = env.counterexample_dict['EMP']
+            # deleted tuples of outputs are not shown
+            self.assertEqual(sql1.count('-- '), sum(row['AGE'] != 'NULL' and int(row['AGE']) > 1 for row in rows))
+            self.assertEqual(sql2.count('-- '), len(rows))
+            self.assertEqual([line[3:] for line in sql2.splitlines()[:-1]], [row['ID'] for row in rows])
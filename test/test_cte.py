@@ -0,0 +1,42 @@
+# -*- coding:utf-8 -*-
+
+from collections import Counter
+from unittest import TestCase
+
+from scope import Scope
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'id': 'int', 'age': 'int', 'sal': 'int', 'dept_id': 'int'},
+}
+CTE = "WITH T AS (SELECT dept_id, SUM(sal) AS s FROM EMP GROUP BY dept_id) "
+SUBQUERY = "(SELECT dept_id, SUM(sal) AS s FROM EMP GROUP BY dept_id)"
+
+
+class TestCTE(TestCase):
+    def test_encoded_once(self):
+        queries = [
+            CTE + "SELECT A.dept_id FROM T A, T B WHERE A.s > B.s",
+            CTE + "SELECT dept_id FROM T WHERE s > (SELECT AVG(s) FROM T)",
+            CTE + "SELECT dept_id FROM T WHERE s IN (SELECT MAX(s) FROM T) UNION ALL SELECT dept_id FROM T",
+        ]
+        for query in queries:
+            with environment(SCHEMA, ROW_NUM=3) as env:
+                with Scope(env) as scope:
+                    _, formulas = scope.visit(scope.analyze(env.parse_sql_query(query)))
+                    # no formula is registered twice
+                    counter = Counter(str(formula.code) for formula in formulas)
+                    self.assertEqual(max(counter.values()), 1, query)
+
+    def test_references(self):
+        sql1 = CTE + "SELECT A.dept_id FROM T A, T B WHERE A.s > B.s"
+        sql2 = f"SELECT A.dept_id FROM {SUBQUERY} A, {SUBQUERY} B WHERE A.s > B.s"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql1 = CTE + "SELECT dept_id FROM T WHERE s > (SELECT AVG(s) FROM T)"
+        sql2 = f"SELECT dept_id FROM {SUBQUERY} A WHERE s > (SELECT AVG(s) FROM {SUBQUERY} B)"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql2 = f"SELECT dept_id FROM {SUBQUERY} A WHERE s >= (SELECT AVG(s) FROM {SUBQUERY} B)"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
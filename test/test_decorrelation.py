@@ -0,0 +1,50 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from test.utils import analyze
+
+SCHEMA = {
+    'EMP': {'ID': 'INT', 'AGE': 'INT', 'DEPT_ID': 'INT'},
+    'DEPT': {'ID': 'INT', 'NAME': 'INT'},
+}
+
+
+class TestDecorrelation(TestCase):
+    def test_exists(self):
+        sql1 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT D.id FROM DEPT D WHERE D.id = E.dept_id)"
+        sql2 = "SELECT E.id FROM EMP E WHERE E.dept_id IN (SELECT id FROM DEPT)"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
+        sql2 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT D.id FROM DEPT D WHERE D.id + 1 = E.dept_id)"
+        self.assertFalse(analyze(sql1, sql2, SCHEMA))
+
+    def test_in(self):
+        sql1 = "SELECT E.id FROM EMP E WHERE E.age IN (SELECT D.id FROM DEPT D WHERE D.name = E.dept_id)"
+        sql2 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT * FROM DEPT D WHERE D.name = E.dept_id AND D.id = E.age)"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
+
+    def test_not_in(self):
+        sql1 = "SELECT E.id FROM EMP E WHERE E.age NOT IN " \
+               "(SELECT D.id FROM DEPT D WHERE D.name = E.dept_id AND D.id IS NOT NULL) AND E.age IS NOT NULL"
+        sql2 = "SELECT E.id FROM EMP E WHERE NOT EXISTS " \
+               "(SELECT * FROM DEPT D WHERE D.name = E.dept_id AND D.id = E.age) AND E.age IS NOT NULL"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
+        # `D.id` might be NULL
+        sql1 = "SELECT E.id FROM EMP E WHERE E.age NOT IN (SELECT D.id FROM DEPT D WHERE D.name = E.dept_id)"
+        self.assertFalse(analyze(sql1, sql2, SCHEMA))
+
+    def test_outer_attributes_in_predicates(self):
+        # outer attributes under CASE/IS NULL are read from the outer tuple
+        sql1 = "SELECT E.id FROM EMP E WHERE EXISTS " \
+               "(SELECT 1 FROM DEPT D WHERE CASE WHEN E.age > 1 THEN D.id ELSE D.name END = E.dept_id)"
+        sql2 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT 1 FROM DEPT D WHERE (E.age > 1 AND D.id = E.dept_id) " \
+               "OR ((E.age <= 1 OR E.age IS NULL) AND D.name = E.dept_id))"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
+        sql1 = "SELECT E.id FROM EMP E WHERE EXISTS " \
+               "(SELECT 1 FROM DEPT D WHERE CASE WHEN D.name > 1 THEN D.id ELSE D.name END = E.dept_id)"
+        sql2 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT 1 FROM DEPT D WHERE (D.name > 1 AND D.id = E.dept_id) " \
+               "OR ((D.name <= 1 OR D.name IS NULL) AND D.name = E.dept_id))"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
+        sql1 = "SELECT E.id FROM EMP E WHERE EXISTS (SELECT 1 FROM DEPT D WHERE E.age IS NULL AND D.id = 1)"
+        sql2 = "SELECT E.id FROM EMP E WHERE E.age IS NULL AND EXISTS (SELECT 1 FROM DEPT D WHERE D.id = 1)"
+        self.assertTrue(analyze(sql1, sql2, SCHEMA))
@@ -0,0 +1,31 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from environment import Environment
+
+
+class TestDetach(TestCase):
+    def test_view(self):
+        with Environment() as env:
+            env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=2, name='EMP')
+            table = env.databases['EMP']
+            names = [tuple.name for tuple in table.tuples]
+            detached = table.detach(env, 0)
+            self.assertEqual(detached.name, f'{table.name}_0')
+            self.assertEqual([tuple.name for tuple in detached.tuples], [f'{name}_0' for name in names])
+            # the original table is left intact
+            self.assertEqual([tuple.name for tuple in table.tuples], names)
+            for tuple, detached_tuple in zip(table.tuples, detached.tuples):
+                self.assertIsNot(detached_tuple, tuple)
+                self.assertIsNot(detached_tuple.SORT, tuple.SORT)
+                # fields and attributes are shared, not copied
+                self.assertIs(detached_tuple.fields, tuple.fields)
+                self.assertIs(detached_tuple.attributes, tuple.attributes)
+
+    def test_correlated_subquery(self):
+        sql1 = "SELECT ID FROM EMP E WHERE E.AGE IN (SELECT AGE FROM EMP WHERE ID <> E.ID)"
+        sql2 = "SELECT ID FROM EMP E WHERE EXISTS (SELECT * FROM EMP WHERE AGE = E.AGE AND ID <> E.ID)"
+        with Environment() as env:
+            env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=2, name='EMP')
+            self.assertTrue(env.analyze(sql1, sql2))
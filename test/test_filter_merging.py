@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'id': 'int', 'name': 'int', 'age': 'int', 'dept_id': 'int'},
+    'DEPT': {'id': 'int', 'name': 'int'}
+}
+
+
+class TestFilterMerging(TestCase):
+    def test_nested_filters(self):
+        sql1 = "SELECT * FROM (SELECT * FROM EMP WHERE age > 25) T WHERE T.id > 2"
+        sql2 = "SELECT * FROM EMP WHERE id > 2 AND age > 25"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_nested_filters_with_projection(self):
+        sql1 = "SELECT * FROM (SELECT id, age FROM EMP WHERE age > 25) T WHERE T.id > 2"
+        sql2 = "SELECT id, age FROM EMP WHERE id > 2 AND age > 25"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_nested_filters_not_eq(self):
+        sql1 = "SELECT * FROM (SELECT * FROM EMP WHERE age > 25) T WHERE T.id > 2"
+        sql2 = "SELECT * FROM EMP WHERE id > 2 OR age > 25"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+
+    def test_join_condition_and_filter(self):
+        sql1 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id WHERE E.age > 3"
+        sql2 = "SELECT E.id FROM EMP E, DEPT D WHERE E.age > 3 AND E.dept_id = D.id"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_join_condition_and_filter_not_eq(self):
+        sql1 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id WHERE E.age > 3"
+        sql2 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id WHERE E.age >= 3"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+
+    def test_symbolic_predicates_are_not_merged(self):
+        # B1/B2 read whole tables, so they are evaluated on their own filters
+        sql1 = "SELECT * FROM (SELECT * FROM EMP X WHERE B1(X)) Y WHERE B2(Y)"
+        sql2 = "SELECT * FROM (SELECT * FROM EMP X WHERE B2(X)) Y WHERE B1(Y)"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
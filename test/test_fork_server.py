@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+
+import os
+import time
+from multiprocessing import Manager
+from unittest import TestCase
+
+from environment import Environment
+from parallel.fork_server import ForkServer
+
+
+def verify(query1, query2, queue):
+    with Environment() as env:
+        env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=2, name='EMP')
+        result = env.analyze(query1, query2)
+    for o in [os.getpid(), result]:
+        queue.put(o)
+
+
+def sleep(seconds):
+    time.sleep(seconds)
+
+
+def crash():
+    os._exit(1)
+
+
+class TestForkServer(TestCase):
+    def test_jobs(self):
+        queue = Manager().Queue()
+        with ForkServer() as fork_server:
+            for query2, result in [
+                ("SELECT ID FROM EMP WHERE 1 < AGE", True),
+                ("SELECT ID FROM EMP WHERE AGE >= 1", False),
+            ]:
+                proc = fork_server.Process(target=verify, args=("SELECT ID FROM EMP WHERE AGE > 1", query2, queue))
+                proc.start()
+                proc.join(60)
+                self.assertFalse(proc.is_alive())
+                self.assertEqual([queue.get() for _ in range(queue.qsize())], [proc.pid, result])
+
+            # a crashed job leaves no result
+            proc = fork_server.Process(target=crash)
+            proc.start()
+            proc.join(60)
+            self.assertFalse(proc.is_alive())
+            self.assertEqual(queue.qsize(), 0)
+
+    def test_terminate(self):
+        with ForkServer(initializer=None) as fork_server:
+            proc = fork_server.Process(target=sleep, args=(60,))
+            proc.start()
+            proc.join(0.1)
+            self.assertTrue(proc.is_alive())
+            proc.terminate()
+            proc.join(60)
+            self.assertFalse(proc.is_alive())
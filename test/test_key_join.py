@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from formulas.tables import FKeyJoinTable
+from scope import Scope
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'EMPNO': 'INT', 'SAL': 'INT', 'DEPTNO': 'INT'},
+    'DEPT': {'DEPTNO': 'INT', 'NAME': 'INT'},
+}
+CONSTRAINTS = [
+    {'primary': [{'value': 'EMP__EMPNO'}]},
+    {'primary': [{'value': 'DEPT__DEPTNO'}]},
+    {'foreign': [{'value': 'EMP__DEPTNO'}, {'value': 'DEPT__DEPTNO'}]},
+]
+
+
+class TestKeyJoin(TestCase):
+    def test_compact_table(self):
+        with environment(SCHEMA, ROW_NUM=3, constraints=CONSTRAINTS) as env:
+            with Scope(env) as scope:
+                query = env.parse_sql_query("SELECT * FROM EMP JOIN DEPT ON EMP.DEPTNO = DEPT.DEPTNO")
+                table = scope.analyze(query).prev_database
+                self.assertIsInstance(table, FKeyJoinTable)
+                self.assertEqual(len(table), 3)
+                self.assertTrue(table.total)
+            with Scope(env) as scope:
+                # DEPT.NAME is not a key
+                query = env.parse_sql_query("SELECT * FROM EMP JOIN DEPT ON EMP.DEPTNO = DEPT.NAME")
+                self.assertNotIsInstance(scope.analyze(query).prev_database, FKeyJoinTable)
+
+    def test_inner_join(self):
+        sql1 = "SELECT E.EMPNO, D.NAME FROM EMP E JOIN DEPT D ON E.SAL = D.DEPTNO AND D.NAME > 2"
+        sql2 = "SELECT E.EMPNO, D.NAME FROM EMP E, DEPT D WHERE E.SAL = D.DEPTNO AND D.NAME > 2"
+        with environment(SCHEMA, ROW_NUM=3, constraints=CONSTRAINTS) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql2 = "SELECT E.EMPNO, D.NAME FROM EMP E, DEPT D WHERE E.SAL = D.DEPTNO"
+        with environment(SCHEMA, ROW_NUM=3, constraints=CONSTRAINTS) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+
+    def test_left_join(self):
+        # the foreign key guarantees a match for each employee
+        sql1 = "SELECT EMP.EMPNO, DEPT.NAME FROM EMP LEFT JOIN DEPT ON EMP.DEPTNO = DEPT.DEPTNO"
+        sql2 = "SELECT EMP.EMPNO, DEPT.NAME FROM EMP, DEPT WHERE EMP.DEPTNO = DEPT.DEPTNO"
+        with environment(SCHEMA, ROW_NUM=3, constraints=CONSTRAINTS) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+        sql1 = "SELECT EMP.EMPNO, DEPT.NAME FROM EMP LEFT JOIN DEPT ON EMP.SAL = DEPT.DEPTNO"
+        sql2 = "SELECT EMP.EMPNO, DEPT.NAME FROM EMP, DEPT WHERE EMP.SAL = DEPT.DEPTNO"
+        with environment(SCHEMA, ROW_NUM=3, constraints=CONSTRAINTS) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
@@ -0,0 +1,43 @@
+# -*- coding:utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+from environment import Environment
+from utils import (
+    CodeSnippet,
+    LazyString,
+    lazy_code,
+)
+
+
+class TestLazyCode(TestCase):
+    def test_lazy_string(self):
+        calls = []
+
+        def _render(value):
+            calls.append(value)
+            return value
+
+        snippet = CodeSnippet(code=None, docstring=LazyString(_render, 't1 := Filter(t0)'), docstring_first=True,
+                              code_string=lazy_code('\nAnd(\n{premise}\n)\n', premise=['x', 'y']))
+        self.assertEqual(calls, [])
+        self.assertEqual(str(snippet), '# t1 := Filter(t0)\nAnd(\nx,\ny\n)')
+        # rendered once
+        str(snippet)
+        self.assertEqual(calls, ['t1 := Filter(t0)'])
+
+    def test_script(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_file = os.path.join(tmp_dir, 'script.py')
+            with Environment(generate_code=True) as env:
+                env.create_database(attributes={'id': 'int', 'age': 'int'}, name='EMP', bound_size=2)
+                env.save_checkpoints()
+                sql1 = "SELECT DISTINCT age FROM EMP WHERE id > 1"
+                sql2 = "SELECT age FROM EMP WHERE id > 1 GROUP BY age"
+                self.assertTrue(env.analyze(sql1, sql2, out_file=out_file))
+            with open(out_file) as reader:
+                script = reader.read()
+            compile(script, out_file, 'exec')
+            self.assertIn('solver.add(Not(Implies(premise, conclusion)))', script)
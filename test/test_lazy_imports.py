@@ -0,0 +1,32 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from test.bench_import import (
+    DEFERRED_MODULES,
+    import_times,
+)
+
+
+def imported_modules(module):
+    return {name for _, name, _ in import_times(module)}
+
+
+class TestLazyImports(TestCase):
+    def test_deferred_modules(self):
+        modules = imported_modules('environment')
+        self.assertIn('z3', modules)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_formula_registry(self):
+        self.assertNotIn('formulas.tables', imported_modules('formulas'))
+        import formulas
+        from formulas.tables import FFilterTable
+        self.assertIs(formulas.build_fomula()['filter_table'], FFilterTable)
+
+    def test_lazy_parsers(self):
+        from parsers import ConstraintParser, LarkSQLParser
+        from parsers.constraint_parser import ConstraintParser as _ConstraintParser
+        self.assertIs(ConstraintParser, _ConstraintParser)
+        self.assertEqual(LarkSQLParser().parse("SELECT A FROM T"), {'select': {'value': 'A'}, 'from': 'T'})
@@ -0,0 +1,49 @@
+# -*- coding:utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+from errors import ParserSyntaxError
+from parsers import (
+    ParseCache,
+    SQLParser,
+)
+
+
+class TestParseCache(TestCase):
+    def test_copy_on_return(self):
+        parser = SQLParser(cache=ParseCache())
+        query = "SELECT ID FROM EMP WHERE AGE > 1"
+        ast = parser.parse(query)
+        ast['select'] = None
+        self.assertNotEqual(parser.parse(query), ast)
+        self.assertEqual(parser.parse(query), SQLParser(cache=ParseCache(maxsize=0)).parse(query))
+        self.assertEqual((parser.cache.hits, parser.cache.misses), (2, 1))
+        # VALUES tables are copied as well
+        query = "SELECT X FROM (VALUES (1, 2), (3, 4)) AS T (X, Y)"
+        self.assertIsNot(parser.parse(query)['from'].rows, parser.parse(query)['from'].rows)
+
+    def test_syntax_error(self):
+        parser = SQLParser(cache=ParseCache())
+        for _ in range(2):
+            with self.assertRaises(ParserSyntaxError):
+                parser.parse("SELECT FROM WHERE")
+        self.assertEqual((parser.cache.hits, parser.cache.misses), (1, 1))
+
+    def test_lru(self):
+        parser = SQLParser(cache=ParseCache(maxsize=1))
+        parser.parse("SELECT ID FROM EMP")
+        parser.parse("SELECT AGE FROM EMP")
+        parser.parse("SELECT ID FROM EMP")
+        self.assertEqual((len(parser.cache), parser.cache.misses), (1, 3))
+
+    def test_disk(self):
+        query = "SELECT ID FROM EMP WHERE AGE > 1"
+        with tempfile.TemporaryDirectory() as cache_dir:
+            ast = SQLParser(cache=ParseCache(cache_dir=cache_dir)).parse(query)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            # a new process starts with an empty cache in memory
+            cache = ParseCache(cache_dir=cache_dir)
+            self.assertEqual(SQLParser(cache=cache).parse(query), ast)
+            self.assertEqual((cache.hits, cache.misses), (1, 0))
@@ -0,0 +1,55 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from constants import PARSER_BACKEND
+from errors import ParserSyntaxError
+from parsers import (
+    ParseCache,
+    SQLParser,
+)
+from test.bench_parser import benchmark_queries
+from utils import ValuesTable
+
+
+def _normalize(ast):
+    if isinstance(ast, ValuesTable):
+        return ValuesTable.__name__, ast.name, _normalize(ast.rows), ast.attributes
+    elif isinstance(ast, dict):
+        # the order of keys matters, e.g., the first key of an expression is its operator
+        return [(k, _normalize(v)) for k, v in ast.items()]
+    elif isinstance(ast, list):
+        return [_normalize(v) for v in ast]
+    return ast
+
+
+def parse(parser, query):
+    try:
+        return _normalize(parser.parse(query))
+    except ParserSyntaxError as err:
+        return type(err)
+
+
+class TestParserBackends(TestCase):
+    def setUp(self):
+        self.mo_parser = SQLParser(cache=ParseCache(maxsize=0))
+        self.lark_parser = SQLParser(cache=ParseCache(maxsize=0), backend=PARSER_BACKEND.LARK)
+
+    def test_benchmarks(self):
+        # both backends emit the same ASTs and reject the same queries
+        queries = benchmark_queries()
+        self.assertGreater(len(queries), 0)
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(parse(self.lark_parser, query), parse(self.mo_parser, query))
+
+    def test_rewrites(self):
+        for query in [
+            "SELECT * FROM EMP WHERE DEPTNO = NULL OR NULL <> ENAME",
+            "SELECT * FROM EMP WHERE DEPTNO = NULL LIMIT 1, 2",
+            "SELECT X FROM (VALUES (1, 'A'), (NULL, 'B')) AS T (X, Y) WHERE X IS NOT NULL",
+            "SELECT CAST(HIREDATE AS TIMESTAMP(0)) FROM EMP",
+            "SELECT * FROM (EMP) WHERE SAL IS TRUE",
+        ]:
+            with self.subTest(query=query):
+                self.assertEqual(parse(self.lark_parser, query), parse(self.mo_parser, query))
@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from environment import Environment
+
+SCHEMA = {
+    'EMP': {'EMPNO': 'INT', 'DEPTNO': 'INT', 'SAL': 'INT'},
+    'DEPT': {'DEPTNO': 'INT', 'NAME': 'VARCHAR'},
+    'EMP_B': {'EMPNO': 'INT', 'DEPTNO': 'INT'},
+    'BONUS': {'ENAME': 'VARCHAR', 'SAL': 'INT'},
+}
+CONSTRAINTS = [
+    {'primary': [{'value': 'EMP__EMPNO'}]},
+    {'foreign': [{'value': 'EMP__DEPTNO'}, {'value': 'DEPT__DEPTNO'}]},
+    {'primary': [{'value': 'DEPT__DEPTNO'}]},
+    {'foreign': [{'value': 'EMP_B__DEPTNO'}, {'value': 'DEPT__DEPTNO'}]},
+    {'not_null': {'value': 'BONUS__SAL'}},
+]
+
+
+def prune(*queries):
+    with Environment() as env:
+        schema, constraints = env.prune_schema(SCHEMA, CONSTRAINTS, *queries)
+        return set(schema), constraints
+
+
+class TestSchemaPruning(TestCase):
+    def test_single_table(self):
+        schema, constraints = prune("SELECT name FROM dept", "SELECT name FROM dept WHERE deptno > 0")
+        self.assertEqual(schema, {'DEPT'})
+        self.assertEqual(constraints, [{'primary': [{'value': 'DEPT__DEPTNO'}]}])
+
+    def test_foreign_key_closure(self):
+        schema, constraints = prune("SELECT sal FROM EMP", "SELECT E.sal FROM EMP AS E")
+        self.assertEqual(schema, {'EMP', 'DEPT'})
+        self.assertEqual(constraints, CONSTRAINTS[:3])
+
+    def test_subqueries_and_literals(self):
+        schema, _ = prune(
+            "SELECT empno FROM EMP_B WHERE deptno IN (SELECT deptno FROM DEPT WHERE name = 'BONUS')",
+            "SELECT empno FROM EMP_B",
+        )
+        self.assertEqual(schema, {'EMP_B', 'DEPT'})
+
+    def test_unparsable_queries(self):
+        schema, constraints = prune("SELECT FROM WHERE", "SELECT * FROM EMP")
+        self.assertEqual(schema, set(SCHEMA))
+        self.assertEqual(constraints, CONSTRAINTS)
+
+
+def prune_columns(*queries):
+    with Environment() as env:
+        schema, constraints = env.prune_schema(SCHEMA, CONSTRAINTS, *queries)
+        return env.prune_columns(schema, constraints, *queries)
+
+
+class TestColumnPruning(TestCase):
+    def test_live_columns(self):
+        schema, constraints = prune_columns("SELECT sal FROM EMP", "SELECT E.sal FROM EMP AS E WHERE E.sal > 0")
+        self.assertEqual(schema, {'EMP': {'SAL': 'INT'}, 'DEPT': {'DEPTNO': 'INT'}})
+        self.assertEqual(constraints, [])
+
+    def test_foreign_key_closure(self):
+        schema, constraints = prune_columns("SELECT deptno FROM EMP", "SELECT deptno FROM EMP WHERE sal > 0")
+        self.assertEqual(schema, {'EMP': {'DEPTNO': 'INT', 'SAL': 'INT'}, 'DEPT': {'DEPTNO': 'INT'}})
+        self.assertEqual(constraints, CONSTRAINTS[1:3])
+
+    def test_all_columns(self):
+        schema, constraints = prune_columns("SELECT * FROM EMP", "SELECT E.sal FROM EMP AS E")
+        self.assertEqual(schema, {'EMP': SCHEMA['EMP'], 'DEPT': SCHEMA['DEPT']})
+        self.assertEqual(constraints, CONSTRAINTS[:3])
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+from z3 import (
+    Solver,
+    sat,
+    unsat,
+)
+
+from environment import Environment
+from writers.smt2 import (
+    smt2_file_name,
+    parse_smt2_file_name,
+)
+
+SCHEMA = {
+    'EMP': {'ID': 'INT', 'NAME': 'VARCHAR', 'AGE': 'INT'},
+}
+
+
+def export(sql1, sql2, smt2_dir, ROW_NUM=2, solve=False):
+    with Environment(smt2_dir=smt2_dir, solve=solve) as env:
+        for k, v in SCHEMA.items():
+            env.create_database(attributes=v, name=k, bound_size=ROW_NUM)
+        env.save_checkpoints()
+        return env.analyze(sql1, sql2), env.smt2_file
+
+
+def check(smt2_file):
+    # a fresh solver out of the Environment's z3 context
+    solver = Solver()
+    solver.from_file(smt2_file)
+    return solver.check()
+
+
+class TestSMT2(TestCase):
+    def test_export(self):
+        sql1, sql2 = "SELECT ID FROM EMP WHERE AGE > 1", "SELECT ID FROM EMP WHERE 1 < AGE"
+        with tempfile.TemporaryDirectory() as smt2_dir:
+            result, smt2_file = export(sql1, sql2, smt2_dir)
+            # not solved
+            self.assertIsNone(result)
+            self.assertEqual(smt2_file, os.path.join(smt2_dir, smt2_file_name([sql1, sql2], 2)))
+            self.assertEqual(parse_smt2_file_name(smt2_file)[1], 2)
+            self.assertEqual(check(smt2_file), unsat)
+
+            result, smt2_file = export(sql1, "SELECT ID FROM EMP", smt2_dir, ROW_NUM=3, solve=True)
+            self.assertFalse(result)
+            self.assertEqual(parse_smt2_file_name(smt2_file)[1], 3)
+            self.assertEqual(check(smt2_file), sat)
+            self.assertEqual(len(os.listdir(smt2_dir)), 2)
@@ -0,0 +1,53 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from z3 import is_int_value
+
+from solving_profiles import SOLVING_PROFILES
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'id': 'int', 'name': 'int', 'age': 'int', 'dept_id': 'int'},
+    'DEPT': {'id': 'int', 'name': 'int'}
+}
+
+
+class TestSolvingProfiles(TestCase):
+    def test_equivalent(self):
+        sql1 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id"
+        sql2 = "SELECT E.id FROM EMP E, DEPT D WHERE E.dept_id = D.id"
+        for profile in SOLVING_PROFILES:
+            with environment(SCHEMA, profile=profile) as env:
+                self.assertTrue(env.analyze(sql1, sql2), profile)
+
+    def test_not_equivalent(self):
+        sql1 = "SELECT age FROM EMP ORDER BY age LIMIT 1"
+        sql2 = "SELECT MIN(age) FROM EMP"
+        for profile in SOLVING_PROFILES:
+            with environment(SCHEMA, profile=profile) as env:
+                self.assertFalse(env.analyze(sql1, sql2), profile)
+
+    def test_counterexample_of_preprocessed_goal(self):
+        with environment({'EMP': {'id': 'int', 'age': 'int'}}, profile='preprocess') as env:
+            self.assertFalse(env.analyze("SELECT age FROM EMP WHERE age > 1", "SELECT age FROM EMP"))
+            # eliminated variables are recovered by model conversion
+            model, table = env.model, env.base_databases['EMP']
+            for tuple in table.tuples:
+                for attr in table.attributes:
+                    self.assertTrue(is_int_value(model.eval(attr.VALUE(tuple.SORT))))
+
+    def test_unknown_profile(self):
+        from environment import Environment
+        from errors import NotSupportedError
+        with self.assertRaises(NotSupportedError):
+            Environment(profile='unknown')
+
+    def test_split_goal(self):
+        from z3 import Bool, Context, Or
+        from errors import NotSupportedError
+        from solving_profiles import SolvingProfile
+        ctx = Context()
+        profile = SolvingProfile('split', tactics=['split-clause'])
+        with self.assertRaises(NotSupportedError):
+            profile.preprocess(Or(Bool('a', ctx), Bool('b', ctx)), ctx)
@@ -0,0 +1,81 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from environment import Environment
+from visitors.visitor import Visitor
+
+SCHEMA = {
+    'EMP': {'ID': 'INT', 'AGE': 'INT'},
+    'DEPT': {'ID': 'INT', 'NAME': 'INT'},
+}
+
+
+def subquery_visits(sql1, sql2, ROW_NUM=2):
+    """
+    verdict, and the number of visits to each subquery table compared by IN/NOT IN or used as a scalar
+    """
+    visit, subquery_terms, table_to_value = Visitor.visit, Visitor._subquery_terms, Visitor._table_to_value
+    visits, tables = [], []
+
+    def _visit(self, formula, **kwargs):
+        visits.append(formula)
+        return visit(self, formula, **kwargs)
+
+    def _subquery_terms(self, formulas, attribute_num, **kwargs):
+        tables.append(formulas.operands[1])
+        return subquery_terms(self, formulas, attribute_num, **kwargs)
+
+    def _table_to_value(self, formulas, **kwargs):
+        tables.append(formulas)
+        return table_to_value(self, formulas, **kwargs)
+
+    with patch.object(Visitor, 'visit', _visit), patch.object(Visitor, '_subquery_terms', _subquery_terms), \
+            patch.object(Visitor, '_table_to_value', _table_to_value), Environment() as env:
+        for k, v in SCHEMA.items():
+            env.create_database(attributes=v, name=k, bound_size=ROW_NUM)
+        env.save_checkpoints()
+        out = env.analyze(sql1, sql2)
+    tables = {id(table): table for table in tables}.values()
+    return out, [sum(formula is table for formula in visits) for table in tables]
+
+
+class TestSubqueryTerms(TestCase):
+    def test_uncorrelated(self):
+        for sql1, sql2 in [
+            ("SELECT ID FROM EMP WHERE AGE IN (SELECT ID FROM DEPT)",
+             "SELECT E.ID FROM EMP E WHERE EXISTS (SELECT * FROM DEPT D WHERE D.ID = E.AGE)"),
+            ("SELECT ID FROM EMP WHERE AGE NOT IN (SELECT ID FROM DEPT WHERE ID IS NOT NULL) AND AGE IS NOT NULL",
+             "SELECT E.ID FROM EMP E WHERE NOT EXISTS (SELECT * FROM DEPT D WHERE D.ID = E.AGE) "
+             "AND E.AGE IS NOT NULL"),
+        ]:
+            with self.subTest(sql1=sql1):
+                out, visits = subquery_visits(sql1, sql2)
+                self.assertTrue(out)
+                # visited once for all (2) outer tuples
+                self.assertEqual(visits, [1])
+
+    def test_correlated(self):
+        # correlated WHERE clause
+        sql1 = "SELECT E.ID FROM EMP E WHERE E.AGE IN (SELECT D.ID FROM DEPT D WHERE D.NAME = E.ID)"
+        sql2 = "SELECT E.ID FROM EMP E WHERE EXISTS (SELECT * FROM DEPT D WHERE D.NAME = E.ID AND D.ID = E.AGE)"
+        out, visits = subquery_visits(sql1, sql2)
+        self.assertTrue(out)
+        # visited for every outer tuple
+        self.assertEqual(visits, [2])
+        # correlated SELECT list only
+        sql1 = "SELECT E.ID FROM EMP E WHERE E.AGE IN (SELECT D.ID + E.ID FROM DEPT D)"
+        _, visits = subquery_visits(sql1, "SELECT ID FROM EMP")
+        self.assertEqual(visits, [2])
+
+    def test_scalar(self):
+        sql1 = "SELECT E.ID FROM EMP E WHERE E.AGE = (SELECT D.ID FROM DEPT D WHERE D.NAME = 1)"
+        sql2 = "SELECT E.ID FROM EMP E WHERE E.AGE = (SELECT D.ID FROM DEPT D WHERE 1 = D.NAME)"
+        out, visits = subquery_visits(sql1, sql2)
+        self.assertTrue(out)
+        self.assertEqual(visits, [1, 1])
+        # correlated SELECT list only
+        sql1 = "SELECT E.ID FROM EMP E WHERE E.AGE = (SELECT D.ID + E.ID FROM DEPT D)"
+        _, visits = subquery_visits(sql1, "SELECT ID FROM EMP")
+        self.assertEqual(visits, [2])
@@ -0,0 +1,47 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+
+from test.utils import environment
+
+SCHEMA = {
+    'EMP': {'id': 'int', 'name': 'int', 'age': 'int', 'dept_id': 'int'},
+    'DEPT': {'id': 'int', 'name': 'int'}
+}
+
+
+class TestTableSharing(TestCase):
+    def test_shared_filter(self):
+        sql1 = "SELECT id FROM EMP WHERE age > 25"
+        sql2 = "SELECT E.name FROM EMP AS E WHERE E.age > 25"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+            # the filter tuples of both queries are encoded once
+            self.assertEqual(len(env.shared_tuple_sorts), 1)
+            self.assertEqual(len(env.encoded_tuple_sorts), 2)
+
+    def test_shared_join(self):
+        sql1 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id WHERE E.age > 3"
+        sql2 = "SELECT E.id FROM EMP E JOIN DEPT D ON E.dept_id = D.id WHERE E.age >= 3"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+        sql2 = "SELECT E.id FROM EMP E, DEPT D WHERE E.age > 3 AND E.dept_id = D.id"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_shared_subtrees_in_one_query(self):
+        sql1 = "SELECT id FROM EMP WHERE age > 3 UNION ALL SELECT id FROM EMP WHERE age > 3"
+        sql2 = "SELECT id FROM EMP WHERE age > 3"
+        with environment(SCHEMA) as env:
+            self.assertFalse(env.analyze(sql1, sql2))
+        sql1 = "SELECT id FROM EMP WHERE age > 3 UNION SELECT id FROM EMP WHERE age > 3"
+        sql2 = "SELECT DISTINCT id FROM EMP WHERE age > 3"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+
+    def test_different_filters(self):
+        sql1 = "SELECT id FROM EMP WHERE age > 3"
+        sql2 = "SELECT id FROM EMP WHERE 3 < age"
+        with environment(SCHEMA) as env:
+            self.assertTrue(env.analyze(sql1, sql2))
+            self.assertEqual(len(env.shared_tuple_sorts), 2)
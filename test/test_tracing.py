@@ -0,0 +1,51 @@
+# -*- coding:utf-8 -*-
+
+import os
+import tempfile
+from unittest import TestCase
+
+import ujson
+
+from environment import Environment
+from logger import (
+    LOGGER,
+    Lazy,
+    set_tracing,
+)
+
+
+def analyze():
+    with Environment() as env:
+        env.create_database({'ID': 'INT', 'AGE': 'INT'}, bound_size=2, name='EMP')
+        return env.analyze("SELECT ID FROM EMP WHERE AGE > 1", "SELECT ID FROM EMP WHERE AGE >= 1")
+
+
+class TestTracing(TestCase):
+    def tearDown(self):
+        set_tracing(None)
+
+    def test_spans(self):
+        with tempfile.TemporaryDirectory() as directory:
+            out_file = os.path.join(directory, 'trace.jsonlines')
+            set_tracing(out_file)
+            self.assertFalse(analyze())
+            set_tracing(None)
+            with open(out_file, 'r') as reader:
+                spans = [ujson.loads(line) for line in reader]
+            self.assertEqual(
+                [span['span'] for span in spans],
+                ['parse', 'parse', 'analyze', 'visit', 'analyze', 'visit', 'verify', 'solve'],
+            )
+            self.assertEqual(spans[-1]['result'], 'sat')
+            self.assertTrue(all(span['error'] is None and span['time'] >= 0 for span in spans))
+
+            # disabled tracers write nothing
+            analyze()
+            with open(out_file, 'r') as reader:
+                self.assertEqual(len(reader.readlines()), len(spans))
+
+    def test_lazy(self):
+        calls = []
+        LOGGER.debug('%s', Lazy(calls.append, None))
+        self.assertEqual(calls, [])
+        self.assertEqual(str(Lazy(sorted, {2, 1})), '[1, 2]')
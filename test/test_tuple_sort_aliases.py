@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+
+from unittest import TestCase
+from unittest.mock import patch
+
+from z3 import is_eq
+
+from environment import Environment
+
+SCHEMA = {
+    'EMP': {'ID': 'INT', 'AGE': 'INT'},
+}
+
+
+def _declare_alias(self, name, tuple_sort):
+    # a fresh tuple sort asserted to equal the aliased one
+    fresh = self._declare_tuple_sort(name)
+    self.DBMS_facts.append(fresh == tuple_sort)
+    return fresh
+
+
+def _tuple_equalities(env):
+    # number of equalities between tuple sorts in solver assertions
+    count, visited = 0, set()
+    stack = list(env.solver.assertions())
+    while len(stack) > 0:
+        expr = stack.pop()
+        if expr.get_id() in visited:
+            continue
+        visited.add(expr.get_id())
+        if is_eq(expr) and expr.arg(0).sort() == env.TupleSort:
+            count += 1
+        stack.extend(expr.children())
+    return count
+
+
+def analyze(sql1, sql2, alias=True, ROW_NUM=3):
+    with patch.object(Environment, '_alias_tuple_sort', Environment._alias_tuple_sort if alias else _declare_alias), \
+            Environment() as env:
+        for k, v in SCHEMA.items():
+            env.create_database(attributes=v, name=k, bound_size=ROW_NUM)
+        env.save_checkpoints()
+        out = env.analyze(sql1, sql2)
+        return out, _tuple_equalities(env)
+
+
+class TestTupleSortAliases(TestCase):
+    def test_aliases(self):
+        for sql1, sql2 in [
+            ("SELECT ID FROM EMP ORDER BY AGE LIMIT 1", "SELECT ID FROM EMP ORDER BY AGE LIMIT 1"),
+            ("SELECT ID FROM EMP ORDER BY AGE LIMIT 1", "SELECT ID FROM EMP ORDER BY AGE DESC LIMIT 1"),
+            ("SELECT ID FROM EMP WHERE AGE > 1 ORDER BY ID", "SELECT ID FROM EMP WHERE AGE > 1 ORDER BY ID"),
+            ("SELECT ID FROM EMP ORDER BY ID LIMIT 2", "SELECT ID FROM EMP WHERE AGE > 1 ORDER BY ID LIMIT 2"),
+        ]:
+            with self.subTest(sql1=sql1, sql2=sql2):
+                out, equalities = analyze(sql1, sql2)
+                expected_out, expected_equalities = analyze(sql1, sql2, alias=False)
+                self.assertEqual(out, expected_out)
+                self.assertLess(equalities, expected_equalities)
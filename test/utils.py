@@ -0,0 +1,22 @@
+# -*- coding:utf-8 -*-
+
+from environment import Environment
+
+
+def environment(schema, ROW_NUM=2, constraints=None, **kwargs):
+    """
+    an environment whose tables of `schema` have `ROW_NUM` tuples, e.g., `with environment(SCHEMA) as env: ...`
+    `kwargs` are passed to `Environment`
+    """
+    env = Environment(**kwargs)
+    for k, v in schema.items():
+        env.create_database(attributes=v, name=k, bound_size=ROW_NUM)
+    if constraints is not None:
+        env.add_constraints(constraints)
+    env.save_checkpoints()
+    return env
+
+
+def analyze(sql1, sql2, schema, ROW_NUM=2):
+    with environment(schema, ROW_NUM) as env:
+        return env.analyze(sql1, sql2)
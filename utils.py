@@ -110,6 +110,78 @@ def read_schema_file(file):
     return schema, constraints
 
 
+def identifiers(obj) -> set:
+    """
+    upper-case identifiers of a parsed SQL query or integrity constraint, e.g., `EMP`, `E__ID`, `*`,
+    except literals and `COUNT(*)`
+    """
+    names = set()
+
+    def _f(obj):
+        if isinstance(obj, str):
+            names.add(str.upper(obj))
+        elif isinstance(obj, list | tuple):
+            for value in obj:
+                _f(value)
+        elif isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == 'literal' or (key == 'count' and value == '*'):
+                    continue
+                _f(value)
+
+    _f(obj)
+    return names
+
+
+def operators(obj) -> set:
+    """
+    keys of a parsed SQL query, i.e., its clauses and operators, e.g., `select`, `orderby`, `eq`, except literals
+    """
+    keys = set()
+
+    def _f(obj):
+        if isinstance(obj, list | tuple):
+            for value in obj:
+                _f(value)
+        elif isinstance(obj, dict):
+            for key, value in obj.items():
+                if key == 'literal':
+                    continue
+                keys.add(key)
+                _f(value)
+
+    _f(obj)
+    return keys
+
+
+def referenced_tables(obj, table_names) -> set:
+    """
+    over-approximate which of `table_names` (upper case) a parsed SQL query or integrity constraint mentions,
+    i.e., identifiers `T` or `T__COLUMN`
+    """
+    tables = set()
+    for name in identifiers(obj):
+        if name in table_names:
+            tables.add(name)
+        elif '__' in name and name[:name.find('__')] in table_names:
+            tables.add(name[:name.find('__')])
+    return tables
+
+
+def referenced_columns(obj) -> set | None:
+    """
+    over-approximate the column names a parsed SQL query mentions, i.e., `COLUMN` of identifiers `COLUMN` or
+    `T__COLUMN`, return None if all columns might be used, e.g., `SELECT *`, `T.*` or `NATURAL JOIN`
+    """
+    columns = set()
+    for name in identifiers(obj):
+        column = name[name.rfind('__') + 2:] if '__' in name else name
+        if column == '*' or column == 'NATURAL':
+            return None
+        columns.add(column)
+    return columns
+
+
 def dedup_constraints(constraints):
     if len(constraints) == 0:
         return None
@@ -182,21 +254,59 @@ def encode_concate_by_or(nulls, values):
     )
 
 
+class LazyString(object):
+    """
+    a string rendered on demand, e.g., generated code of huge z3 terms which is only needed when a script is written
+    """
+
+    def __init__(self, func, *args, **kwargs):
+        self._func = functools.partial(func, *args, **kwargs)
+        self._string = None
+
+    def __str__(self):
+        if self._string is None:
+            self._string = str(self._func())
+            self._func = None
+        return self._string
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _render_code(template: str, **kwargs):
+    return template.format(**{
+        key: ',\n'.join(str(v) for v in value) if isinstance(value, list | tuple) else str(value)
+        for key, value in kwargs.items()
+    })
+
+
+def lazy_code(template: str, **kwargs) -> LazyString:
+    """
+    `template.format(**kwargs)` rendered on demand, where a list argument is a `,\n`-separated sequence
+    """
+    return LazyString(_render_code, template, **kwargs)
+
+
 class CodeSnippet(object):
     def __init__(self, code: str, docstring: str = None, docstring_first=False, code_string=None):
         self.code = code  # str or CodeSnippet itself
-        self.docstring = '# ' + (docstring or '')
+        # docstring/code_string might be LazyString, we render them when the snippet is written
+        self._docstring = docstring
         self.docstring_first = docstring_first
-        self._code_string = code_string if code_string is None else code_string.strip(
-            '\n')  # only store codes which are TOOOOO LONG
+        self._code_string = code_string  # only store codes which are TOOOOO LONG
+
+    @property
+    def docstring(self):
+        return '# ' + str(self._docstring or '')
 
     def __str__(self):
-        code_string = str(self.code) if self._code_string is None else self._code_string
-        if len(self.docstring) > 2:
+        code_string = str(self.code) if self._code_string is None else str(self._code_string).strip('\n')
+        docstring = self.docstring
+        if len(docstring) > 2:
             if self.docstring_first:
-                return f'{self.docstring}\n{code_string}'
+                return f'{docstring}\n{code_string}'
             else:
-                return f'{code_string}  {self.docstring}'
+                return f'{code_string}  {docstring}'
         else:
             return f'{code_string}'
 
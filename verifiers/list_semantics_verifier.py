@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import functools
+
+import fast_ast
 from constants import (
     And,
     Or,
@@ -20,7 +23,7 @@ class ListSemanticsVerifier(Verifier):
 
     def __init__(self, environment):
         super(ListSemanticsVerifier, self).__init__(environment)
-        self._DEL = self._env.DELETED_FUNCTION
+        self._DEL = functools.partial(fast_ast.app, self._env.DELETED_FUNCTION)
 
     def z3(self, left_attributes, right_attributes, **kwargs):
         DELETED_func_str = str(self._env.DELETED_FUNCTION)
@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import abc
+import functools
 
 from z3 import (
     ArithRef,
 )
 
+import fast_ast
 from constants import (
     And,
     Implies,
@@ -17,16 +19,23 @@ from constants import (
 from errors import NotEquivalenceError
 from formulas.columns import *
 from formulas.expressions import *
-from utils import CodeSnippet
+from utils import (
+    CodeSnippet,
+    LazyString,
+)
 from writers.code_writer import CodeWriter
 
 ExcutableType = FDigits | int | float | ArithRef
 
 
+def _join_code_snippets(code_snippets):
+    return ',\n\n'.join([str(code_snippet) for code_snippet in code_snippets])
+
+
 class Verifier:
     def __init__(self, environment):
         self._env = environment
-        self._DEL = self._env.DELETED_FUNCTION
+        self._DEL = functools.partial(fast_ast.app, self._env.DELETED_FUNCTION)
         self.reset()
 
     def _table_size(self, table):
@@ -69,7 +78,10 @@ class Verifier:
         for idx, tuple in enumerate(tuples):
             tmp = [self._env.DELETED_FUNCTION(tuple.SORT)]
             for lattr, cmp_func in zip(attributes, cmp_funcs):
-                if cmp_func:
+                if cmp_func and type(lattr) is FAttribute:
+                    attr_tuple = self._env._apply_attribute(lattr, tuple.SORT)
+                    tmp.append([attr_tuple.NULL, attr_tuple.VALUE])
+                elif cmp_func:
                     tmp.append([lattr.NULL(tuple.SORT), lattr.VALUE(tuple.SORT)])
                 else:
                     tmp.append(lattr)
@@ -108,22 +120,24 @@ class Verifier:
             )
             if kwargs['bound_constraints'] is not None and len(kwargs['bound_constraints']) > 0:
                 self._env._script_writer.bound_constraints = kwargs['bound_constraints']
+            # formulas are rendered only when the script is written
             if len(lformulas) == 0:
                 lformulas = True
             else:
-                lformulas = ',\n\n'.join([str(code_snippet) for code_snippet in lformulas])
+                lformulas = LazyString(_join_code_snippets, lformulas)
             lresult = CodeSnippet(code=lformulas, docstring='1st SQL query formulas', docstring_first=True)
             if len(rformulas) == 0:
                 rformulas = True
             else:
-                rformulas = ',\n\n'.join([str(code_snippet) for code_snippet in rformulas])
+                rformulas = LazyString(_join_code_snippets, rformulas)
             rresult = CodeSnippet(code=rformulas, docstring='2nd SQL query formulas', docstring_first=True)
             self._env._script_writer.premise.code = [lresult, rresult]
             self._env._script_writer.final_tables = [
                 CodeSnippet(code=', '.join([str(tuple.SORT) for tuple in ltable.values()])),
                 CodeSnippet(code=', '.join([str(tuple.SORT) for tuple in rtable.values()])),
             ]
-            self._env._script_writer.equal_func = semantics_verifier.z3(left_attributes, right_attributes, **kwargs)
+            self._env._script_writer.equal_func = LazyString(semantics_verifier.z3, left_attributes, right_attributes,
+                                                             **kwargs)
         return Implies(premise, conclusion)
 
     @abc.abstractmethod
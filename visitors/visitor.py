@@ -20,9 +20,11 @@ from z3 import (
     is_true,
     is_false,
     is_int,
+    is_int_value,
     eq as Z3_EQ,
 )
 
+import fast_ast
 from constants import (
     Z3_NULL_VALUE,
     NumericType,
@@ -41,6 +43,10 @@ from constants import (
     RealVal,
 )
 from errors import NotSupportedError
+from formulas._utils import (
+    attribute_key,
+    expression_key,
+)
 from formulas.columns import *
 from formulas.expressions import *
 from formulas.tables import *
@@ -56,7 +62,9 @@ from utils import (
     encode_concate_by_or,
     is_uninterpreted_func,
     __pos_hash__,
-    CodeSnippet
+    CodeSnippet,
+    LazyString,
+    lazy_code,
 )
 from visitors import visitor
 from visitors.dump_tuple import DumpTuple
@@ -69,8 +77,16 @@ class Visitor:
 
     def __init__(self, scope):
         self.scope = scope
-        self._DEL = scope.DELETED_FUNCTION
+        self._DEL = functools.partial(fast_ast.app, scope.DELETED_FUNCTION)
         self.correlated_table_indices = {}
+        # memoized terms of uncorrelated subqueries in IN/NOT IN predicates, (name, attribute number) -> terms
+        self.subquery_terms = {}
+        # memoized values of uncorrelated scalar subqueries, (name, tuple sorts) -> FExpressionTuple
+        self.scalar_subquery_terms = {}
+        # memoized CASE guards and values, (structural key, tuple sort id) -> formula
+        self.case_terms = {}
+        # encoded WITH clauses, (name, tuple sorts) -> tuples
+        self.materialized_tables = {}
 
     @visitor(FExpression)
     def visit(self, formulas: FExpression, **outer_kwargs):
@@ -221,10 +237,23 @@ class Visitor:
 
         return _f
 
+    def _apply(self, attribute, tuple_sort):
+        # `self.visit(attribute)(tuple_sort)`, memoized for pure attributes over tuple sorts
+        # the result might be shared, so it is read-only, unlike the fresh results of `self.visit`
+        if type(attribute) is FAttribute and isinstance(tuple_sort, ExprRef):
+            return self.scope._apply_attribute(attribute, tuple_sort)
+        else:
+            return self.visit(attribute)(tuple_sort)
+
     def _table_to_value(self, formulas: FBaseTable, **kwargs):
         # we think this table only contains one attribute and one non-deletd tuple:
         if len(formulas.attributes) != 1:
             raise NotImplementedError
+        # an uncorrelated scalar subquery is the same value for all outer tuples
+        key = (formulas.name, tuple(str(t.SORT) for t in formulas))
+        if key in self.scalar_subquery_terms:
+            value = self.scalar_subquery_terms[key]
+            return FExpressionTuple(value.NULL, value.VALUE)
         attribute = self.visit(formulas.attributes[0])
         self.visit(formulas)  # to generate table formulas
         tuple_sorts = [tuple.SORT for tuple in formulas]
@@ -240,6 +269,8 @@ class Visitor:
             value_tuple = attribute(curr_tuple)
             NULL = If(self._DEL(curr_tuple), NULL, value_tuple.NULL)
             VALUE = If(self._DEL(curr_tuple), VALUE, value_tuple.VALUE)
+        if not formulas.refers_outer_query and not formulas.has_correlated_subquery():
+            self.scalar_subquery_terms[key] = FExpressionTuple(NULL, VALUE)
         return FExpressionTuple(NULL, VALUE)
 
     ############################ aggregation ############################
@@ -277,6 +308,16 @@ class Visitor:
 
     @visitor(FAliasTable)
     def visit(self, formulas: FAliasTable, **kwargs) -> Dict:
+        if formulas.materialized:
+            # a WITH clause is encoded once no matter how many times (or in which subqueries) it is referenced
+            key = (formulas.name, tuple(str(t.SORT) for t in formulas))
+            if key not in self.materialized_tables:
+                self.materialized_tables[key] = self._visit_alias_table(formulas)
+            # callers might add/pop tuples, e.g., UNION ALL and LIMIT
+            return dict(self.materialized_tables[key])
+        return self._visit_alias_table(formulas)
+
+    def _visit_alias_table(self, formulas: FAliasTable) -> Dict:
         prev_table = self.visit(formulas.fathers[0])
         if formulas.alias_attributes:
             curr_table = {}
@@ -308,7 +349,7 @@ class Visitor:
                     )
                     implication = CodeSnippet(
                         code=code,
-                        docstring=str(curr_tuple),
+                        docstring=LazyString(str, curr_tuple),
                         docstring_first=True,
                     )
                     self.scope.register_formulas(formulas=implication)
@@ -322,6 +363,24 @@ class Visitor:
             curr_table = prev_table
         return curr_table
 
+    def _is_encoded_tuple_sort(self, tuple_sort, attributes=None) -> bool:
+        """
+        whether a tuple sort shared by tables with the same structural key has been encoded in the current or
+        the previous queries, and its encoding defines the given attributes (None for the whole tuple)
+        """
+        name = str(tuple_sort)
+        if name not in self.scope.encoded_tuple_sorts:
+            return False
+        encoded_attributes = self.scope.encoded_tuple_sorts[name]
+        return encoded_attributes is None or (attributes is not None and attributes <= encoded_attributes)
+
+    def _encode_tuple_sort(self, tuple_sort, attributes=None):
+        name = str(tuple_sort)
+        if attributes is None or self.scope.encoded_tuple_sorts.get(name, set()) is None:
+            self.scope.encoded_tuple_sorts[name] = None
+        else:
+            self.scope.encoded_tuple_sorts[name] = self.scope.encoded_tuple_sorts.get(name, set()) | attributes
+
     def _product(self, formulas: TableType, use_condition=False, is_using=False, **kwargs) -> Dict:
         if len(formulas.fathers[0]) == 0:
             return formulas.fathers[0]
@@ -338,6 +397,22 @@ class Visitor:
                 curr_tuple_sort = curr_tuple.SORT
                 curr_attributes = curr_tuple.attributes
 
+                mapped_attributes = [
+                    attr for attr in itertools.chain(ltuple.attributes, rtuple.attributes) if attr in curr_attributes
+                ]
+                if is_using and formulas._hidden_attributes is not None:
+                    mapped_attributes.extend(formulas._hidden_attributes)
+                mapped_attributes = {attribute_key(attr) for attr in mapped_attributes}
+                if not use_condition and self._is_encoded_tuple_sort(curr_tuple_sort, mapped_attributes):
+                    # shared with an encoded product of the same tuples
+                    curr_tuple = DumpTuple(
+                        name=curr_tuple.name, sort=curr_tuple_sort, attributes=curr_attributes,
+                        parent_sorts=[ltuple.name, rtuple.name],
+                    )
+                    self.scope.register_dump_tuple(curr_tuple.name, curr_tuple)
+                    curr_table[curr_tuple.name] = curr_tuple
+                    continue
+
                 mapping_formulas = [
                     *[
                         curr_attributes[curr_attributes.index(attr)](curr_tuple_sort) == attr(left_prev_tuple_sort)
@@ -381,22 +456,21 @@ class Visitor:
                     if self.scope._script_writer is None:
                         _code_string = None
                     else:
-                        _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-                        _code_string = f"""
+                        _code_string = lazy_code("""
 And(
     Implies(
         {premise},
         And(
-            Not({self._DEL(curr_tuple_sort)}),
-            {_code_string},
+            Not({deleted}),
+            {mapping},
         )
     ),
     Implies(
         Not({premise}),
-        {self._DEL(curr_tuple_sort)},
+        {deleted},
     ),
 )
-"""
+""", premise=premise, deleted=self._DEL(curr_tuple_sort), mapping=mapping_formulas)
                 else:
                     premise = And(
                         Not(self._DEL(left_prev_tuple_sort)),
@@ -418,30 +492,31 @@ And(
                     if self.scope._script_writer is None:
                         _code_string = None
                     else:
-                        _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-                        _code_string = f"""
+                        _code_string = lazy_code("""
 And(
     Implies(
         {premise},
         And(
-            Not({self._DEL(curr_tuple_sort)}),
-            {_code_string},
+            Not({deleted}),
+            {mapping},
         )
     ),
     Implies(
         Not({premise}),
-        {self._DEL(curr_tuple_sort)},
+        {deleted},
     ),
 )
-"""
+""", premise=premise, deleted=self._DEL(curr_tuple_sort), mapping=mapping_formulas)
 
                 implication = CodeSnippet(
                     code=code,
-                    docstring=str(curr_tuple),
+                    docstring=LazyString(str, curr_tuple),
                     docstring_first=True,
                     code_string=_code_string,
                 )
                 self.scope.register_formulas(formulas=implication)
+                if not use_condition:
+                    self._encode_tuple_sort(curr_tuple_sort, mapped_attributes)
                 curr_tuple = DumpTuple(
                     name=curr_tuple.name, sort=curr_tuple_sort, attributes=curr_attributes,
                     parent_sorts=[ltuple.name, rtuple.name],
@@ -542,7 +617,7 @@ And(
                     Implies(not_premise, self._DEL(curr_tuple_sort)),
                 ])
 
-                implication = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True)
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True)
                 self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
                     name=curr_tuple.name, sort=curr_tuple_sort,
@@ -565,9 +640,133 @@ And(
     def visit(self, formulas: FFullOuterJoinTable, **kwargs) -> Dict:
         return self._outer_join(formulas, using_condition=formulas[0].condition is not None)
 
+    @visitor(FKeyJoinTable)
+    def visit(self, formulas: FKeyJoinTable, **kwargs) -> Dict:
+        prev_tables = self.visit(formulas.fathers)
+        prev_table, keyed_prev_table = prev_tables[1 - formulas.keyed], prev_tables[formulas.keyed]
+        curr_table = {}
+        for curr_tuple in formulas:
+            if self.scope.is_register_dump_tuple(curr_tuple.name):
+                curr_tuple = self.scope.get_dump_tuple(curr_tuple.name)
+            else:
+                prev_tuple = prev_table[curr_tuple.fathers[0]]
+                curr_tuple_sort = curr_tuple.SORT
+                curr_attributes = curr_tuple.attributes
+                mapping_formulas = [
+                    curr_attributes[curr_attributes.index(attr)](curr_tuple_sort) == attr(prev_tuple.SORT)
+                    for attr in prev_tuple.attributes if attr in curr_attributes
+                ]
+
+                # the key guarantees that at most one keyed tuple matches
+                matches, key_formulas = [], []
+                for keyed_tuple_name, condition in zip(curr_tuple.fathers[1:], curr_tuple.condition):
+                    keyed_tuple = keyed_prev_table[keyed_tuple_name]
+                    match = simplify([
+                        Not(self._DEL(prev_tuple.SORT)),
+                        Not(self._DEL(keyed_tuple.SORT)),
+                        self._condition_premise(condition, prev_tuple.SORT),
+                    ], operator=And)
+                    matches.append(match)
+                    key_formulas.append(Implies(match, And(*[
+                        curr_attributes[curr_attributes.index(attr)](curr_tuple_sort) == attr(keyed_tuple.SORT)
+                        for attr in keyed_tuple.attributes if attr in curr_attributes
+                    ])))
+                keyed_attributes = curr_attributes[len(prev_tuple.attributes):] if formulas.keyed == 1 else \
+                    curr_attributes[:len(curr_attributes) - len(prev_tuple.attributes)]
+                if formulas.outer and not formulas.total:
+                    key_formulas.append(Implies(
+                        Not(simplify(matches, operator=Or)),
+                        And(*[attr.NULL(curr_tuple_sort) for attr in keyed_attributes]),
+                    ))
+
+                if formulas.outer or formulas.total:
+                    premise = Not(self._DEL(prev_tuple.SORT))
+                else:
+                    premise = simplify(matches, operator=Or)
+                code = And(
+                    Implies(premise, And(Not(self._DEL(curr_tuple_sort)), *mapping_formulas)),
+                    Implies(Not(premise), self._DEL(curr_tuple_sort)),
+                    *key_formulas,
+                )
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True)
+                self.scope.register_formulas(formulas=implication)
+                curr_tuple = DumpTuple(
+                    name=curr_tuple.name, sort=curr_tuple_sort, attributes=curr_attributes,
+                    parent_sorts=curr_tuple.fathers,
+                )
+                self.scope.register_dump_tuple(curr_tuple.name, curr_tuple)
+            curr_table[curr_tuple.name] = curr_tuple
+        return curr_table
+
+    def _is_row_condition(self, condition) -> bool:
+        """
+        whether a condition only reads its own tuple, e.g., no subqueries or symbolic functions over tables
+        """
+        if isinstance(condition, FSymbolicFunc | FBaseTable) or getattr(condition, 'require_tuples', False):
+            return False
+        elif isinstance(condition, FAttribute):
+            return condition.EXPR is None or self._is_row_condition(condition.EXPR)
+        elif isinstance(condition, FExpression):
+            return self._is_row_condition(condition.operands)
+        elif isinstance(condition, list | tuple):
+            return all(self._is_row_condition(operand) for operand in condition)
+        else:
+            return True
+
+    def _is_mergeable_filter(self, formulas) -> bool:
+        return isinstance(formulas, FFilterTable) and not formulas.is_correlated_subquery and \
+            not isinstance(formulas.fathers[0], FOuterJoinBaseTable) and \
+            all(tuple.condition is not True and self._is_row_condition(tuple.condition) for tuple in formulas)
+
+    def _inner_filters(self, formulas: FFilterTable):
+        """
+        filters right below a filter, only looking through tables sharing tuple sorts with their fathers, e.g.,
+        `SELECT * FROM (SELECT * FROM T WHERE a) WHERE b` and `SELECT * FROM T1 JOIN T2 ON a WHERE b`.
+        The outer filter can test their conditions on the tuples under them, and skip their tuples.
+
+        return the filters and the outermost fake projection above them, which decides the output attributes
+        """
+        filters, projection = [], None
+        if not self._is_mergeable_filter(formulas):
+            return filters, projection
+        table, table_projection = formulas.fathers[0], None
+        while True:
+            if isinstance(table, FAliasTable) and not table.alias_attributes:
+                table = table.fathers[0]
+            elif type(table) is FFakeProjectionTable and not table.is_correlated_subquery:
+                table_projection = table_projection or table
+                table = table.fathers[0]
+            elif self._is_mergeable_filter(table):
+                filters.append(table)
+                projection = projection or table_projection
+                table = table.fathers[0]
+            else:
+                return filters, projection
+
+    def _condition_premise(self, condition, tuple_sort, **kwargs):
+        """
+        a tuple satisfies a condition iff the condition is neither NULL nor False
+        """
+        filer_cond = self.visit(condition, **kwargs)(tuple_sort)
+        if is_int_value(filer_cond.VALUE):
+            filer_cond.VALUE = BoolVal(not Z3_EQ(filer_cond.VALUE, Z3_0))
+        elif is_int(filer_cond.VALUE):
+            # e.g., CASE WHEN ... THEN TRUE ELSE FALSE END
+            filer_cond.VALUE = filer_cond.VALUE != Z3_0
+        if is_true(filer_cond.NULL):
+            return Z3_FALSE
+        elif is_false(filer_cond.NULL):
+            return filer_cond.VALUE
+        else:
+            return If(filer_cond.NULL, Z3_FALSE, filer_cond.VALUE)
+
     @visitor(FFilterTable)
     def visit(self, formulas: FFilterTable, **kwargs) -> Dict:
-        prev_table = self.visit(formulas.fathers[0], **kwargs)
+        inner_filters, inner_projection = self._inner_filters(formulas)
+        if len(inner_filters) > 0:
+            prev_table = self.visit(inner_filters[-1].fathers[0], **kwargs)
+        else:
+            prev_table = self.visit(formulas.fathers[0], **kwargs)
 
         # TODO: handle correlated subquery
         if formulas.is_correlated_subquery:
@@ -575,67 +774,103 @@ And(
             formulas = self.detach_tuples(formulas)
 
         curr_table = {}
-        for prev_tuple, curr_tuple in zip(prev_table.values(), formulas):
+        for idx, (prev_tuple, curr_tuple) in enumerate(zip(prev_table.values(), formulas)):
             if self.scope.is_register_dump_tuple(curr_tuple.name):
                 curr_tuple = self.scope.get_dump_tuple(curr_tuple.name)
             else:
-                premise = [Not(self._DEL(prev_tuple.SORT))]
-                if isinstance(formulas.fathers[0], FOuterJoinBaseTable) and curr_tuple.condition is None:
-                    premise.append(simplify([self._DEL(t) for t in curr_tuple._mutex], operator=And))
-                else:
-                    # update outer_attrs for WHERE clause which might be nested in a correlated subquery
-                    if formulas.is_correlated_subquery:
-                        outer_attrs = {k: v for k, v in prev_outer_attrs.items()}
-                        for attr in formulas.attributes:
-                            outer_attrs[str(attr)] = self.visit(attr)(prev_tuple.SORT)
-                        kwargs['outer_attrs'] = outer_attrs
-
-                    filer_cond = self.visit(curr_tuple.condition, **kwargs)(prev_tuple.SORT)
-                    if is_int(filer_cond.VALUE):
-                        filer_cond.VALUE = BoolVal(not Z3_EQ(filer_cond.VALUE, Z3_0))
-                    if is_true(filer_cond.NULL):
-                        premise.append(Z3_FALSE)
-                    elif is_false(filer_cond.NULL):
-                        premise.append(filer_cond.VALUE)
+                # a filter tuple aliased to its input tuple (e.g., tautological condition) needs no constraints,
+                # neither does a filter tuple shared with an encoded one
+                if not curr_tuple.SORT.eq(prev_tuple.SORT) and not self._is_encoded_tuple_sort(curr_tuple.SORT):
+                    premise = [Not(self._DEL(prev_tuple.SORT))]
+                    if isinstance(formulas.fathers[0], FOuterJoinBaseTable) and curr_tuple.condition is None:
+                        premise.append(simplify([self._DEL(t) for t in curr_tuple._mutex], operator=And))
                     else:
-                        premise.append(If(filer_cond.NULL, Z3_FALSE, filer_cond.VALUE))
+                        # update outer_attrs for WHERE clause which might be nested in a correlated subquery
+                        if formulas.is_correlated_subquery:
+                            outer_attrs = {k: v for k, v in prev_outer_attrs.items()}
+                            for attr in formulas.attributes:
+                                outer_attrs[str(attr)] = self.visit(attr)(prev_tuple.SORT)
+                            kwargs['outer_attrs'] = outer_attrs
+
+                        conditions = [table[idx].condition for table in inner_filters[::-1]]
+                        conditions.append(curr_tuple.condition)
+                        for condition in conditions:
+                            premise.append(self._condition_premise(condition, prev_tuple.SORT, **kwargs))
 
-                if self.scope._script_writer is None:
-                    _code_string = None
-                else:
-                    _code_string = ',\n'.join([str(f) for f in premise])
-                    _code_string = f'''
+                    if self.scope._script_writer is None:
+                        _code_string = None
+                    else:
+                        _code_string = lazy_code('''
 And(
     Implies(
-        And(*{premise}),
-        And(Not({self._DEL(curr_tuple.SORT)}), {curr_tuple.SORT == prev_tuple.SORT}),
+        And(*[{premise}]),
+        And(Not({deleted}), {mapping}),
     ),
-    Implies(Not(And(*{premise})), {self._DEL(curr_tuple.SORT)}),
+    Implies(Not(And(*[{premise}])), {deleted}),
 )
-'''
+''', premise=premise, deleted=self._DEL(curr_tuple.SORT), mapping=curr_tuple.SORT == prev_tuple.SORT)
 
-                premise = simplify(premise, operator=And)
-                implication = CodeSnippet(
-                    code=And(
-                        Implies(
-                            premise,
-                            And(Not(self._DEL(curr_tuple.SORT)), curr_tuple.SORT == prev_tuple.SORT),
+                    premise = simplify(premise, operator=And)
+                    implication = CodeSnippet(
+                        code=And(
+                            Implies(
+                                premise,
+                                And(Not(self._DEL(curr_tuple.SORT)), curr_tuple.SORT == prev_tuple.SORT),
+                            ),
+                            Implies(Not(premise), self._DEL(curr_tuple.SORT)),
                         ),
-                        Implies(Not(premise), self._DEL(curr_tuple.SORT)),
-                    ),
-                    docstring=str(curr_tuple),
-                    docstring_first=True,
-                    code_string=_code_string,
-                )
-                self.scope.register_formulas(formulas=implication)
+                        docstring=LazyString(str, curr_tuple),
+                        docstring_first=True,
+                        code_string=_code_string,
+                    )
+                    self.scope.register_formulas(formulas=implication)
+                    self._encode_tuple_sort(curr_tuple.SORT)
+                if inner_projection is None:
+                    attributes = prev_tuple.attributes
+                else:
+                    attributes = inner_projection[idx].attributes
                 curr_tuple = DumpTuple(
-                    name=curr_tuple.name, sort=curr_tuple.SORT, attributes=prev_tuple.attributes,
+                    name=curr_tuple.name, sort=curr_tuple.SORT, attributes=attributes,
                     parent_sorts=prev_tuple.SORT,
                 )
                 self.scope.register_dump_tuple(curr_tuple.name, curr_tuple)
             curr_table[curr_tuple.name] = curr_tuple
         return curr_table
 
+    @visitor(FSemiJoinTable)
+    def visit(self, formulas: FSemiJoinTable, **kwargs) -> Dict:
+        """
+        match tuples of the decorrelated table with the outer tuple in `outer_attrs`, no tuple sorts are declared
+        """
+        prev_table = self.visit(formulas.fathers[0])
+        prev_outer_attrs = kwargs.get('outer_attrs', {})
+        curr_table = {}
+        for prev_tuple, condition in zip(prev_table.values(), formulas.condition):
+            premise = [Not(self._DEL(prev_tuple.SORT))]
+            if condition is not True:
+                # the condition might be nested in a correlated subquery
+                outer_attrs = {k: v for k, v in prev_outer_attrs.items()}
+                for attr in formulas.fathers[0].attributes:
+                    outer_attrs[str(attr)] = self.visit(attr)(prev_tuple.SORT)
+                kwargs['outer_attrs'] = outer_attrs
+                premise.append(self._condition_premise(condition, prev_tuple.SORT, **kwargs))
+            curr_table[prev_tuple.name] = DumpTuple(
+                name=prev_tuple.name, sort=prev_tuple.SORT, attributes=formulas.attributes,
+                parent_sorts=prev_tuple.SORT, matched=simplify(premise, operator=And),
+            )
+        return curr_table
+
+    def _is_deleted(self, dump_tuple: DumpTuple):
+        if 'matched' in dump_tuple.kwargs:
+            # a tuple of semi-join is deleted if it does not match the outer tuple
+            return Not(dump_tuple.kwargs['matched'])
+        return self._DEL(dump_tuple.SORT)
+
+    def _is_not_deleted(self, dump_tuple: DumpTuple):
+        if 'matched' in dump_tuple.kwargs:
+            return dump_tuple.kwargs['matched']
+        return Not(self._DEL(dump_tuple.SORT))
+
     @visitor(FProjectionPityTuple)
     def visit(self, curr_tuple: FProjectionPityTuple, **kwargs):
         prev_tuples = kwargs.pop('prev_tuples')
@@ -692,17 +927,17 @@ And(
         if self.scope._script_writer is None:
             _code_string = None
         else:
-            _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-            _code_string = f"""
+            _code_string = lazy_code("""
 And(
 Implies({premise}, And(
-    Not({self._DEL(curr_sort)}),
-    {_code_string},
+    Not({deleted}),
+    {mapping},
 )),
-Implies(Not({premise}), {self._DEL(curr_sort)}),
+Implies(Not({premise}), {deleted}),
 )
-"""
-        formulas = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True, code_string=_code_string)
+""", premise=premise, deleted=self._DEL(curr_sort), mapping=mapping_formulas)
+        formulas = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True,
+                               code_string=_code_string)
         self.scope.register_formulas(formulas)
         curr_tuple = DumpTuple(
             name=curr_tuple.name, sort=curr_sort, attributes=curr_tuple.attributes,
@@ -858,19 +1093,18 @@ Implies(Not({premise}), {self._DEL(curr_sort)}),
                     if self.scope._script_writer is None:
                         _code_string = None
                     else:
-                        _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-                        _code_string = f"""
+                        _code_string = lazy_code("""
 And(*[
     Implies(
         Not({premise}),
         And(
-Not({self._DEL(curr_tuple_sort)}),
-{_code_string},
+Not({deleted}),
+{mapping},
         ),
     ),
-    Implies({premise}, {self._DEL(curr_tuple_sort)}),
+    Implies({premise}, {deleted}),
 ])
-"""
+""", premise=premise, deleted=self._DEL(curr_tuple_sort), mapping=mapping_formulas)
                 else:
                     # if there exists at least one non-deleted tuple, we can project it
                     # works for groupby
@@ -886,20 +1120,19 @@ Not({self._DEL(curr_tuple_sort)}),
                     if self.scope._script_writer is None:
                         _code_string = None
                     else:
-                        _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-                        _code_string = f"""
+                        _code_string = lazy_code("""
 And(*[
     Implies(
         {premise},
         And(
-Not({self._DEL(curr_tuple_sort)}),
-{_code_string},
+Not({deleted}),
+{mapping},
         ),
     ),
-    Implies(Not({premise}), {self._DEL(curr_tuple_sort)}),
+    Implies(Not({premise}), {deleted}),
 ])
-"""
-                implication = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True,
+""", premise=premise, deleted=self._DEL(curr_tuple_sort), mapping=mapping_formulas)
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True,
                                           code_string=_code_string)
                 self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
@@ -936,8 +1169,8 @@ Not({self._DEL(curr_tuple_sort)}),
                                   prev_attributes: Sequence):
             formulas = []
             for curr_attr, prev_attr in zip(curr_attributes, prev_attributes):
-                attr_tuple = self.visit(curr_attr)(prev_tuple_sort)
-                attr_sibling_tuple = self.visit(prev_attr)(prev_tuple_sibling)
+                attr_tuple = self._apply(curr_attr, prev_tuple_sort)
+                attr_sibling_tuple = self._apply(prev_attr, prev_tuple_sibling)
                 formulas.append(
                     encode_same(
                         attr_tuple.NULL, attr_sibling_tuple.NULL,
@@ -969,10 +1202,6 @@ Not({self._DEL(curr_tuple_sort)}),
                 curr_attributes = curr_tuple.attributes
 
                 premise = [Not(self._DEL(prev_tuple_sort))]
-                if self.scope._script_writer is None:
-                    _premise_string = None
-                else:
-                    _premise_string = [str(premise[-1])]
 
                 # current tuple is not the 1st non-deleted tuple, they must be distinct
                 # premise.append(
@@ -994,8 +1223,7 @@ Not({self._DEL(curr_tuple_sort)}),
                                                   tuple_sort.attributes, prev_tuple.attributes),
                         )
                     )
-                    if self.scope._script_writer is not None:
-                        _premise_string.append(str(premise[-1]))
+                premises = premise
                 premise = simplify(premise, operator=And)
                 mapping_formulas = []
                 for curr_attr, prev_attr in zip(curr_attributes, prev_tuple.attributes):
@@ -1016,22 +1244,23 @@ Not({self._DEL(curr_tuple_sort)}),
                 if self.scope._script_writer is None:
                     _code_string = None
                 else:
-                    _premise_string = ',\n'.join(f for f in _premise_string)
-                    _premise_string = f"And(\n{_premise_string}\n)"
-                    _code_string = ',\n'.join([str(f) for f in mapping_formulas])
-                    _code_string = f"""
+                    _code_string = lazy_code("""
 And(
     Implies(
-        {_premise_string},
         And(
-            Not({self._DEL(curr_tuple_sort)}),
-            {_code_string},
+{premise}
+),
+        And(
+            Not({deleted}),
+            {mapping},
         ),
     ),
-    Implies(Not({_premise_string}), {self._DEL(curr_tuple_sort)}),
+    Implies(Not(And(
+{premise}
+)), {deleted}),
 )
-"""
-                implication = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True,
+""", premise=premises, deleted=self._DEL(curr_tuple_sort), mapping=mapping_formulas)
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True,
                                           code_string=_code_string)
                 self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
@@ -1056,13 +1285,11 @@ And(
 
         constraints = []
         copied_prev_tuple_sorts = [
-            self.scope._declare_tuple_sort(f'_find_1st_non_deleted_{self.scope._get_new_tuple_name()}')
-            for _ in range(len(tuple_sorts))
+            self.scope._alias_tuple_sort(
+                f'_find_1st_non_deleted_{self.scope._get_new_tuple_name()}', prev_tuple_sort
+            )
+            for prev_tuple_sort in tuple_sorts
         ]
-        constraints.extend([
-            copied_prev_tuple_sort == prev_tuple_sort
-            for prev_tuple_sort, copied_prev_tuple_sort in zip(tuple_sorts, copied_prev_tuple_sorts)
-        ])
         DEL_FUNC = kwargs['group_func'] if 'group_func' in kwargs else self._DEL
 
         for i in range(1, len(copied_prev_tuple_sorts)):
@@ -1087,13 +1314,11 @@ And(
 
         constraints = []
         copied_prev_tuple_sorts = [
-            self.scope._declare_tuple_sort(f'_find_last_non_deleted_{self.scope._get_new_tuple_name()}')
-            for _ in range(len(tuple_sorts))
+            self.scope._alias_tuple_sort(
+                f'_find_last_non_deleted_{self.scope._get_new_tuple_name()}', prev_tuple_sort
+            )
+            for prev_tuple_sort in tuple_sorts
         ]
-        constraints.extend([
-            copied_prev_tuple_sort == prev_tuple_sort
-            for prev_tuple_sort, copied_prev_tuple_sort in zip(tuple_sorts, copied_prev_tuple_sorts)
-        ])
 
         for i in range(1, len(copied_prev_tuple_sorts)):
             x = copied_prev_tuple_sorts[0]
@@ -1140,7 +1365,7 @@ And(
             formulas.group_function(t_0, IntVal(str(i))) == If(self._DEL(t_0), Z3_0, Z3_1)
         )
         values = [
-            [self.visit(key)(t.SORT) for key in keys]
+            [self._apply(key, t.SORT) for key in keys]
             for t, keys in zip(prev_tuples, formulas.keys)
         ]
         for j, curr_tuple in enumerate(prev_tuples[1:], start=1):
@@ -1209,11 +1434,6 @@ And(
                         having_premise.VALUE,  # having condition holds
                     )
 
-                if self.scope._script_writer is None:
-                    _code_string = None
-                else:
-                    _code_string = ''
-
                 mapping = []
                 for attr in formulas.out_attributes:
                     if attr in curr_tuple.out_attributes:
@@ -1231,8 +1451,6 @@ And(
                         src_attr_tuple = src_attr(first_non_deleted_tuple_sort)
                         dst_attr_tuple = attr(curr_tuple_sort)
                         mapping.append(dst_attr_tuple == src_attr_tuple)
-                        if self.scope._script_writer is not None:
-                            _code_string += f"And({dst_attr_tuple.NULL == src_attr_tuple.NULL},\n{dst_attr_tuple.VALUE == src_attr_tuple.VALUE}),\n"
                     elif isinstance(attr, FLastValuePredicate) or isinstance(attr.EXPR, FLastValuePredicate):
                         if last_non_deleted_tuple_sort is None:
                             if len(prev_tuple_sorts) == 1:
@@ -1244,8 +1462,6 @@ And(
                         attr_tuple = self.visit(attr)(curr_tuple_sort)
                         attr_generated_tuple = attr.__expr__(last_non_deleted_tuple_sort)
                         mapping.append(attr_tuple == attr_generated_tuple)
-                        if self.scope._script_writer is not None:
-                            _code_string += f"And({attr_tuple.NULL == attr_generated_tuple.NULL},\n{attr_tuple.VALUE == attr_generated_tuple.VALUE}),\n"
                     else:
                         if len(prev_tuple_sorts) == 1:
                             first_non_deleted_tuple_sort = prev_tuple_sorts[0]
@@ -1258,8 +1474,6 @@ And(
                         attr_generated_tuple = attr.__expr__(prev_tuple_sorts, group_func=group_function,
                                                              first_non_deleted_tuple_sort=first_non_deleted_tuple_sort)
                         mapping.append(attr_tuple == attr_generated_tuple)
-                        if self.scope._script_writer is not None:
-                            _code_string += f"And({attr_tuple.NULL == attr_generated_tuple.NULL},\n{attr_tuple.VALUE == attr_generated_tuple.VALUE}),\n"
 
                 code = And(
                     Implies(
@@ -1277,25 +1491,24 @@ And(
                 if self.scope._script_writer is None:
                     _code_string = None
                 else:
-                    # _code_string = ',\n'.join([str(f) for f in mapping])
-                    _code_string = f"""
+                    _code_string = lazy_code("""
 And(
     Implies(
         {premise},
         And(
-            Not({self._DEL(curr_tuple_sort)}),
+            Not({deleted}),
             And(
-{_code_string}
+{mapping}
             ),
         ),
     ),
     Implies(
         Not({premise}),
-        {self._DEL(curr_tuple_sort)},
+        {deleted},
     ),
 )
-"""
-                implication = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True,
+""", premise=premise, deleted=self._DEL(curr_tuple_sort), mapping=mapping)
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True,
                                           code_string=_code_string)
                 self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
@@ -1310,25 +1523,31 @@ And(
             if self.scope._script_writer is None:
                 _code_string = None
             else:
-                _code_string = ',\n'.join([str(f) for f in constraint])
-                _code_string = f"""
+                _code_string = lazy_code("""
     And(
-    {_code_string}
+    {constraint}
     )
-    """
+    """, constraint=constraint)
             self.scope.register_formulas(
                 formulas=CodeSnippet(code=And(*constraint), docstring=f'{formulas.name} GroupBy constraint',
                                      docstring_first=True, code_string=_code_string)
             )
         return curr_table
 
+    def _declare_swapped_tuple_sort(self, prefix, final_tuple_sort=None):
+        # the last swap over a position directly writes into its output tuple sort (union-find alias)
+        # instead of declaring a fresh tuple sort and asserting `output_tuple_sort == fresh_tuple_sort` later
+        if final_tuple_sort is not None:
+            return self.scope._alias_tuple_sort(f'{prefix}{self.scope._get_new_tuple_name()}', final_tuple_sort)
+        return self.scope._declare_tuple_sort(f'{prefix}{self.scope._get_new_tuple_name()}')
+
     def _move_del_tuples_to_tail(self, sorted_tuples):
         # only work for List Semantics eval
         constraint = []
         for idx in range(len(sorted_tuples)):
-            new_tuple = self.scope._declare_tuple_sort(f'_orderby_{self.scope._get_new_tuple_name()}')
-            constraint.append(new_tuple == sorted_tuples[idx])
-            sorted_tuples[idx] = new_tuple
+            sorted_tuples[idx] = self.scope._alias_tuple_sort(
+                f'_orderby_{self.scope._get_new_tuple_name()}', sorted_tuples[idx]
+            )
 
         for j in range(len(sorted_tuples)):
             for idx in range(len(sorted_tuples) - j - 1):
@@ -1350,11 +1569,11 @@ And(
         if self.scope._script_writer is None:
             _code_string = None
         else:
-            _code_string = ',\n'.join([str(c) for c in constraint])
-            _code_string = f"And(\n{_code_string}\n)"
+            _code_string = lazy_code("And(\n{constraint}\n)", constraint=constraint)
 
         # register constraint of OrderBy table
-        constraint = CodeSnippet(code=And(*constraint), docstring=f"Move {sorted_tuples}'s deleted tuples to the tail",
+        constraint = CodeSnippet(code=And(*constraint) if len(constraint) > 0 else Z3_TRUE,
+                                 docstring=f"Move {sorted_tuples}'s deleted tuples to the tail",
                                  docstring_first=True, code_string=_code_string)
         return sorted_tuples, constraint
 
@@ -1369,9 +1588,9 @@ And(
         # 1) move DELETED tuples to the table end
         sorted_tuples = [t.SORT for t in prev_table.values()]
         for idx in range(len(sorted_tuples)):
-            new_tuple = self.scope._declare_tuple_sort(f'_orderby_{self.scope._get_new_tuple_name()}')
-            constraint.append(new_tuple == sorted_tuples[idx])
-            sorted_tuples[idx] = new_tuple
+            sorted_tuples[idx] = self.scope._alias_tuple_sort(
+                f'_orderby_{self.scope._get_new_tuple_name()}', sorted_tuples[idx]
+            )
 
         for j in range(len(formulas)):
             for idx in range(len(formulas) - j - 1):
@@ -1402,8 +1621,8 @@ And(
             swap_cond = []
             should_equality_next_col = []
             for attribute, ascending in zip(order_keys, formulas.ascending_flags):
-                attr_x = self.visit(attribute)(x)
-                attr_y = self.visit(attribute)(y)
+                attr_x = self._apply(attribute, x)
+                attr_y = self._apply(attribute, y)
                 if ascending:
                     formula = And(
                         Not(self._DEL(x)), Not(self._DEL(y)),
@@ -1431,11 +1650,23 @@ And(
             swap_cond = simplify(swap_cond, operator=Or)
             return swap_cond
 
-        for j in range(len(sorted_tuples)):
-            for idx in range(len(sorted_tuples) - j - 1):
+        # output tuple sorts of OrderBy table
+        final_tuple_sorts = {
+            idx: self.scope._get_tuple_sort(curr_tuple.name)
+            for idx, curr_tuple in enumerate(formulas)
+            if not self.scope.is_register_dump_tuple(curr_tuple.name)
+        }
+        tuple_num = len(sorted_tuples)
+        for j in range(tuple_num):
+            for idx in range(tuple_num - j - 1):
                 x, y = sorted_tuples[idx], sorted_tuples[idx + 1]
-                _x = self.scope._declare_tuple_sort(f'_orderby_{self.scope._get_new_tuple_name()}')
-                _y = self.scope._declare_tuple_sort(f'_orderby_{self.scope._get_new_tuple_name()}')
+                # after the j-th round, the (tuple_num - j - 1)-th tuple is sorted; the 0-th is sorted in the end
+                _x = self._declare_swapped_tuple_sort(
+                    '_orderby_', final_tuple_sorts.get(idx) if j == tuple_num - 2 else None,
+                )
+                _y = self._declare_swapped_tuple_sort(
+                    '_orderby_', final_tuple_sorts.get(idx + 1) if idx == tuple_num - j - 2 else None,
+                )
 
                 constraint.append(
                     # swapping is stricter than not swapping
@@ -1452,13 +1683,13 @@ And(
         if self.scope._script_writer is None:
             _code_string = None
         else:
-            _code_string = ',\n'.join([str(c) for c in constraint])
-            _code_string = f"And(\n{_code_string}\n)"
+            _code_string = lazy_code("And(\n{constraint}\n)", constraint=constraint)
         # register constraint of OrderBy table
-        self.scope.register_formulas(
-            formulas=CodeSnippet(code=And(*constraint), docstring=f'{formulas.name} OrderBy constraint',
-                                 docstring_first=True, code_string=_code_string)
-        )
+        if len(constraint) > 0:
+            self.scope.register_formulas(
+                formulas=CodeSnippet(code=And(*constraint), docstring=f'{formulas.name} OrderBy constraint',
+                                     docstring_first=True, code_string=_code_string)
+            )
 
         curr_table = {}
         # final_tuple_sorts = []
@@ -1467,9 +1698,10 @@ And(
                 curr_tuple = self.scope.get_dump_tuple(curr_tuple.name)
             else:
                 curr_tuple_sort = self.scope._get_tuple_sort(curr_tuple.name)
-                implication = CodeSnippet(code=curr_tuple_sort == sorted_tuples[idx],
-                                          docstring=str(curr_tuple), docstring_first=True)
-                self.scope.register_formulas(formulas=implication)
+                if not curr_tuple_sort.eq(sorted_tuples[idx]):
+                    implication = CodeSnippet(code=curr_tuple_sort == sorted_tuples[idx],
+                                              docstring=LazyString(str, curr_tuple), docstring_first=True)
+                    self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
                     name=curr_tuple.name, sort=curr_tuple_sort,
                     attributes=prev_table[curr_tuple.fathers[0]].attributes,
@@ -1493,15 +1725,26 @@ And(
             # 1) move DELETED tuples to the table end
             sorted_tuples = [t.SORT for t in prev_table.values()]
             for idx in range(len(sorted_tuples)):
-                new_tuple = self.scope._declare_tuple_sort(f'_limit_{self.scope._get_new_tuple_name()}')
-                constraint.append(new_tuple == sorted_tuples[idx])
-                sorted_tuples[idx] = new_tuple
+                sorted_tuples[idx] = self.scope._alias_tuple_sort(
+                    f'_limit_{self.scope._get_new_tuple_name()}', sorted_tuples[idx]
+                )
 
-            for j in range(len(prev_table)):
-                for idx in range(len(prev_table) - j - 1):
+            # output tuple sorts of LIMIT table
+            final_tuple_sorts = {
+                prev_index: formulas[idx].SORT
+                for idx, prev_index in enumerate(range(formulas.limit_a, formulas.limit_b))
+                if not self.scope.is_register_dump_tuple(formulas[idx].name)
+            }
+            tuple_num = len(prev_table)
+            for j in range(tuple_num):
+                for idx in range(tuple_num - j - 1):
                     x, y = sorted_tuples[idx], sorted_tuples[idx + 1]
-                    _x = self.scope._declare_tuple_sort(f'_limit_{self.scope._get_new_tuple_name()}')
-                    _y = self.scope._declare_tuple_sort(f'_limit_{self.scope._get_new_tuple_name()}')
+                    _x = self._declare_swapped_tuple_sort(
+                        '_limit_', final_tuple_sorts.get(idx) if j == tuple_num - 2 else None,
+                    )
+                    _y = self._declare_swapped_tuple_sort(
+                        '_limit_', final_tuple_sorts.get(idx + 1) if idx == tuple_num - j - 2 else None,
+                    )
 
                     constraint.append(
                         If(
@@ -1514,18 +1757,18 @@ And(
                     sorted_tuples[idx] = _x
                     sorted_tuples[idx + 1] = _y
             # register constraint of dropping the deleted tuples to the end of the table
-            if self.scope._script_writer is None:
-                _code_string = None
-            else:
-                _code_string = ',\n'.join([str(c) for c in constraint])
-                _code_string = f"And(\n{_code_string}\n)"
-            self.scope.register_formulas(
-                formulas=CodeSnippet(
-                    code=And(*constraint),
-                    docstring=f'{formulas.name} LIMIT constraint of dropping the deleted tuples to the end of the table',
-                    docstring_first=True, code_string=_code_string,
+            if len(constraint) > 0:
+                if self.scope._script_writer is None:
+                    _code_string = None
+                else:
+                    _code_string = lazy_code("And(\n{constraint}\n)", constraint=constraint)
+                self.scope.register_formulas(
+                    formulas=CodeSnippet(
+                        code=And(*constraint),
+                        docstring=f'{formulas.name} LIMIT constraint of dropping the deleted tuples to the end of the table',
+                        docstring_first=True, code_string=_code_string,
+                    )
                 )
-            )
 
             curr_table = {}
             for idx, prev_index in enumerate(range(formulas.limit_a, formulas.limit_b)):
@@ -1534,11 +1777,12 @@ And(
                     curr_tuple = self.scope.get_dump_tuple(curr_tuple.name)
                 else:
                     curr_tuple_sort = curr_tuple.SORT
-                    implication = CodeSnippet(
-                        code=curr_tuple_sort == sorted_tuples[prev_index],
-                        docstring=str(curr_tuple), docstring_first=True,
-                    )
-                    self.scope.register_formulas(formulas=implication)
+                    if not curr_tuple_sort.eq(sorted_tuples[prev_index]):
+                        implication = CodeSnippet(
+                            code=curr_tuple_sort == sorted_tuples[prev_index],
+                            docstring=LazyString(str, curr_tuple), docstring_first=True,
+                        )
+                        self.scope.register_formulas(formulas=implication)
                     curr_tuple = DumpTuple(
                         name=curr_tuple.name, sort=curr_tuple_sort,
                         attributes=prev_table[curr_tuple.fathers[0]].attributes,
@@ -1717,7 +1961,7 @@ And(
                     ),
                     Implies(Not(premise), self._DEL(curr_tuple_sort)),
                 ])
-                implication = CodeSnippet(code=code, docstring=str(curr_tuple), docstring_first=True)
+                implication = CodeSnippet(code=code, docstring=LazyString(str, curr_tuple), docstring_first=True)
                 self.scope.register_formulas(formulas=implication)
                 curr_tuple = DumpTuple(
                     name=curr_tuple.name, sort=curr_tuple_sort, attributes=curr_attributes,
@@ -1742,8 +1986,32 @@ And(
     def visit(self, formulas: IntermFunc, **kwargs):
         return formulas
 
+    def _subquery_terms(self, formulas, attribute_num: int, **kwargs):
+        """
+        terms of the subquery compared by an IN/NOT IN predicate, i.e., the formula that all its tuples are deleted,
+        and for each tuple, whether it is not deleted, its attributes and whether they are NULL.
+        They are the same for all outer tuples if the subquery is uncorrelated, so we only compute them once.
+        """
+        table = formulas.operands[1]
+        key = (table.name, attribute_num)
+        if key in self.subquery_terms:
+            return self.subquery_terms[key]
+        prev_table = self.visit(table, **kwargs)
+        all_del_formula = And(*[self._is_deleted(prev_tuple) for prev_tuple in prev_table.values()])
+        subquery_terms = []
+        for prev_tuple in prev_table.values():
+            not_deleted = self._is_not_deleted(prev_tuple)
+            dst_attr_tuples = [
+                self.visit(dst_attr)(prev_tuple.SORT) for dst_attr in list(prev_tuple.attributes)[:attribute_num]
+            ]
+            pair_are_null = [And(not_deleted, dst_attr_tuple.NULL) for dst_attr_tuple in dst_attr_tuples]
+            subquery_terms.append((not_deleted, dst_attr_tuples, pair_are_null))
+        if not table.refers_outer_query and not table.has_correlated_subquery():
+            self.subquery_terms[key] = all_del_formula, subquery_terms
+        return all_del_formula, subquery_terms
+
     @visitor(FNotInPredicate)
-    def visit(self, formulas: FNotInPredicate, **kwargs):
+    def visit(self, formulas: FNotInPredicate, **outer_kwargs):
         # I. `(a, b) NOT IN ((A1, B1), (A2, B2))`
         # [(0,1) (0,0) (1, NULL)] NOT IN [(0,1) (0,0)] => [False, False, True]
         # [(0,1) (0,0) (NULL, NULL)] NOT IN [(0,1) (0,0)] => [False, False, NULL]
@@ -1774,25 +2042,22 @@ And(
 
             # register outer attributes for correlated subquery
 
-            prev_table = self.visit(formulas.operands[1])
-            all_del_formula = And(*[self._DEL(prev_tuple.SORT) for prev_tuple in prev_table.values()])
+            all_del_formula, subquery_terms = \
+                self._subquery_terms(formulas, len(src_attr_tuples), **outer_kwargs)
             null_exist_formula = Or(*[src_attr_tuple.NULL for src_attr_tuple in src_attr_tuples])
             # null_exist_formula = And(*[src_attr_tuple.NULL for src_attr_tuple in src_attr_tuples])
             in_formula = []
             null_list = [simplify([src_attr_tuple.NULL for src_attr_tuple in src_attr_tuples], operator=And)]
-            for prev_tuple in prev_table.values():
+            for not_deleted, dst_attr_tuples, pair_are_null in subquery_terms:
                 tmp = []
-                pair_are_null = []
-                for src_attr_tuple, dst_attr in zip(src_attr_tuples, prev_tuple.attributes):
-                    dst_attr_tuple = self.visit(dst_attr)(prev_tuple.SORT)
+                for src_attr_tuple, dst_attr_tuple in zip(src_attr_tuples, dst_attr_tuples):
                     tmp.append(
                         simplify([
-                            Not(self._DEL(prev_tuple.SORT)),
+                            not_deleted,
                             encode_same(src_attr_tuple.NULL, dst_attr_tuple.NULL, src_attr_tuple.VALUE,
                                         dst_attr_tuple.VALUE)
                         ], operator=And)
                     )
-                    pair_are_null.append(And(Not(self._DEL(prev_tuple.SORT)), dst_attr_tuple.NULL))
                 null_list.append(simplify(pair_are_null, operator=And))
                 # null_list.append(And(Not(self._DEL(prev_tuple.SORT)), dst_attr_tuple.NULL))
                 in_formula.append(simplify(tmp, operator=And))
@@ -1849,24 +2114,22 @@ And(
                         src_attr_tuple = self.visit(src_attr)(args, **kwargs)
                 src_attr_tuples.append(src_attr_tuple)
 
-            prev_table = self.visit(formulas.operands[1], **outer_kwargs)
-            all_del_formula = And(*[self._DEL(prev_tuple.SORT) for prev_tuple in prev_table.values()])
+            all_del_formula, subquery_terms = \
+                self._subquery_terms(formulas, len(src_attr_tuples), **outer_kwargs)
             null_exist_formula = Or(*[src_attr_tuple.NULL for src_attr_tuple in src_attr_tuples])
             in_formula = []
             null_list = []
-            for prev_tuple in prev_table.values():
+            for not_deleted, dst_attr_tuples, pair_are_null in subquery_terms:
                 tmp = []
-                # pair_are_null = []
-                for src_attr_tuple, dst_attr in zip(src_attr_tuples, prev_tuple.attributes):
-                    dst_attr_tuple = self.visit(dst_attr)(prev_tuple.SORT)
+                for src_attr_tuple, dst_attr_tuple in zip(src_attr_tuples, dst_attr_tuples):
                     tmp.append(
                         simplify([
-                            Not(self._DEL(prev_tuple.SORT)),
+                            not_deleted,
                             encode_same(src_attr_tuple.NULL, dst_attr_tuple.NULL, src_attr_tuple.VALUE,
                                         dst_attr_tuple.VALUE)
                         ], operator=And)
                     )
-                    null_list.append(And(Not(self._DEL(prev_tuple.SORT)), dst_attr_tuple.NULL))
+                null_list.extend(pair_are_null)
                 in_formula.append(simplify(tmp, operator=And))
             in_formula = Or(*in_formula)
             return FExpressionTuple(
@@ -1900,7 +2163,7 @@ And(
             prev_table = self.visit(formulas[0], **outer_kwargs)
             # print(prev_table)
             for prev_tuple in prev_table.values():
-                out.append(Not(self._DEL(prev_tuple.SORT)))
+                out.append(self._is_not_deleted(prev_tuple))
             return FExpressionTuple(
                 NULL=Z3_FALSE,
                 VALUE=Or(*out) if len(out) > 1 else out[0],
@@ -1909,12 +2172,12 @@ And(
         return _f
 
     @visitor(FNullIfPredicate)
-    def visit(self, formulas: FNullIfPredicate, **kwargs):
+    def visit(self, formulas: FNullIfPredicate, **outer_kwargs):
 
         def _f(*args, **kwargs):
             lhs_attr, rhs_attr = formulas.operands
-            lhs_attr = self.visit(lhs_attr)(*args, **kwargs)
-            rhs_attr = self.visit(rhs_attr)(*args, **kwargs)
+            lhs_attr = self.visit(lhs_attr, **outer_kwargs)(*args, **kwargs)
+            rhs_attr = self.visit(rhs_attr, **outer_kwargs)(*args, **kwargs)
             return FExpressionTuple(
                 NULL=Or(lhs_attr.NULL, lhs_attr.VALUE == rhs_attr.VALUE),
                 VALUE=lhs_attr.VALUE,
@@ -1923,7 +2186,7 @@ And(
         return _f
 
     @visitor(FCoalescePredicate)
-    def visit(self, formulas: FCoalescePredicate, **kwargs):
+    def visit(self, formulas: FCoalescePredicate, **outer_kwargs):
         # expressions = [self.visit(operand) for operand in formulas.operands]
         expressions = formulas.operands
 
@@ -1946,18 +2209,18 @@ And(
                                     args, find_constraint = self._find_1st_non_deleted_tuple_sort(args)
                                     if find_constraint is not None:
                                         constraints.append(find_constraint)
-                        expr = self.visit(expr)(args, **kwargs)
+                        expr = self.visit(expr, **outer_kwargs)(args, **kwargs)
                     else:
-                        expr = self.visit(expr)(*args, **kwargs)
+                        expr = self.visit(expr, **outer_kwargs)(*args, **kwargs)
                     return FExpressionTuple(expr.NULL, expr.VALUE)
                 elif isinstance(expr, FExpression | FExpressionTuple) or is_uninterpreted_func(expr):
-                    expr = self.visit(expr)(args, **kwargs) if _directly_app(args) \
-                        else self.visit(expr)(*args, **kwargs)
+                    expr = self.visit(expr, **outer_kwargs)(args, **kwargs) if _directly_app(args) \
+                        else self.visit(expr, **outer_kwargs)(*args, **kwargs)
                     return expr
                 elif getattr(expr, 'require_tuples', False):
-                    return self.visit(expr)(args, **kwargs)
+                    return self.visit(expr, **outer_kwargs)(args, **kwargs)
                 elif isinstance(expr, FDigits):
-                    return self.visit(expr)(args, **kwargs)
+                    return self.visit(expr, **outer_kwargs)(args, **kwargs)
                 elif isinstance(expr, ArithRef):
                     return FExpressionTuple(Z3_FALSE, expr)
                 else:
@@ -2017,10 +2280,10 @@ And(
         return lambda x, **kwargs: FExpressionTuple(Z3_TRUE, Z3_NULL_VALUE)
 
     @visitor(FIsNullPredicate)
-    def visit(self, condition: FIsNullPredicate, **kwargs):
+    def visit(self, condition: FIsNullPredicate, **outer_kwargs):
         def _f(x, **kwargs):
             if getattr(condition[0], 'require_tuples', False):
-                attr_tuple = self.visit(condition.value)(x, **kwargs)
+                attr_tuple = self.visit(condition.value, **outer_kwargs)(x, **kwargs)
                 return FExpressionTuple(Z3_FALSE, attr_tuple.NULL)
             else:
                 if 'group_func' in kwargs:
@@ -2035,20 +2298,20 @@ And(
                                                                               docstring=f'constraint for {condition}'))
                     return FExpressionTuple(
                         Z3_FALSE,
-                        And(kwargs['group_func'](first_tuple), self.visit(condition.value)(first_tuple, **kwargs).NULL),
+                        And(kwargs['group_func'](first_tuple), self.visit(condition.value, **outer_kwargs)(first_tuple, **kwargs).NULL),
                     )
                 else:
-                    attr_tuple = self.visit(condition.value)(x[0] if isinstance(x, Sequence) else x, **kwargs)
+                    attr_tuple = self.visit(condition.value, **outer_kwargs)(x[0] if isinstance(x, Sequence) else x, **kwargs)
                     return FExpressionTuple(Z3_FALSE, attr_tuple.NULL)
 
         return _f
 
     @visitor(FIsNotNullPredicate)
-    def visit(self, condition: FIsNotNullPredicate, **kwargs):
+    def visit(self, condition: FIsNotNullPredicate, **outer_kwargs):
 
         def _f(x, **kwargs):
             if getattr(condition[0], 'require_tuples', False):
-                attr_tuple = self.visit(condition.value)(x, **kwargs)
+                attr_tuple = self.visit(condition.value, **outer_kwargs)(x, **kwargs)
                 return FExpressionTuple(Z3_FALSE, Not(attr_tuple.NULL))
             else:
                 if 'group_func' in kwargs:
@@ -2063,16 +2326,16 @@ And(
                     return FExpressionTuple(
                         Z3_FALSE,
                         And(kwargs['group_func'](first_tuple),
-                            Not(self.visit(condition.value)(first_tuple, **kwargs).NULL)),
+                            Not(self.visit(condition.value, **outer_kwargs)(first_tuple, **kwargs).NULL)),
                     )
                 else:
-                    attr_tuple = self.visit(condition.value)(x[0] if isinstance(x, Sequence) else x, **kwargs)
+                    attr_tuple = self.visit(condition.value, **outer_kwargs)(x[0] if isinstance(x, Sequence) else x, **kwargs)
                     return FExpressionTuple(Z3_FALSE, Not(attr_tuple.NULL))
 
         return _f
 
     @visitor(FIsTruePredicate)
-    def visit(self, condition: FIsTruePredicate, **kwargs):
+    def visit(self, condition: FIsTruePredicate, **outer_kwargs):
 
         def _f(*args, **kwargs):
             if isinstance(condition.value, FBaseTable):
@@ -2091,7 +2354,7 @@ And(
                     vars.append(And(Not(self._DEL(t.SORT)), Not(attr_tuple.NULL), attr_tuple.VALUE != Z3_0))
                 return FExpressionTuple(Z3_FALSE, Or(*vars))
             else:
-                attr_tuple = self.visit(condition.value)(*args, **kwargs)
+                attr_tuple = self.visit(condition.value, **outer_kwargs)(*args, **kwargs)
                 # only return true/false
                 if isinstance(attr_tuple.VALUE, ArithRef | ExcutableType):
                     attr_tuple.VALUE = attr_tuple.VALUE != Z3_0
@@ -2100,7 +2363,7 @@ And(
         return _f
 
     @visitor(FIsFalsePredicate)
-    def visit(self, condition: FIsFalsePredicate, **kwargs):
+    def visit(self, condition: FIsFalsePredicate, **outer_kwargs):
 
         def _f(*args, **kwargs):
             if isinstance(condition.value, FBaseTable):
@@ -2119,7 +2382,7 @@ And(
                     vars.append(And(Not(self._DEL(t.SORT)), Not(attr_tuple.NULL), attr_tuple.VALUE != Z3_0))
                 return FExpressionTuple(Z3_FALSE, Not(Or(*vars)))
             else:
-                attr_tuple = self.visit(condition.value)(*args, **kwargs)
+                attr_tuple = self.visit(condition.value, **outer_kwargs)(*args, **kwargs)
                 # only return true/false
                 if isinstance(attr_tuple.VALUE, ExcutableType):
                     attr_tuple.VALUE = attr_tuple.VALUE == Z3_0
@@ -2128,10 +2391,10 @@ And(
         return _f
 
     @visitor(FIsNotTruePredicate)
-    def visit(self, condition: FIsNotTruePredicate, **kwargs):
+    def visit(self, condition: FIsNotTruePredicate, **outer_kwargs):
 
         def _f(*args, **kwargs):
-            attr_tuple = self.visit(condition.value)(*args, **kwargs)
+            attr_tuple = self.visit(condition.value, **outer_kwargs)(*args, **kwargs)
             # only return true/false
             if isinstance(attr_tuple.VALUE, ExcutableType):
                 attr_tuple.VALUE = attr_tuple.VALUE == Z3_0
@@ -2140,10 +2403,10 @@ And(
         return _f
 
     @visitor(FIsNotFalsePredicate)
-    def visit(self, condition: FIsNotFalsePredicate, **kwargs):
+    def visit(self, condition: FIsNotFalsePredicate, **outer_kwargs):
 
         def _f(*args, **kwargs):
-            attr_tuple = self.visit(condition.value)(*args, **kwargs)
+            attr_tuple = self.visit(condition.value, **outer_kwargs)(*args, **kwargs)
             # only return true/false
             if isinstance(attr_tuple.VALUE, ExcutableType):
                 attr_tuple.VALUE = attr_tuple.VALUE != Z3_0
@@ -2205,7 +2468,7 @@ And(
                     NULL = Or(NULL, self._DEL(args))
                 return FExpressionTuple(
                     NULL=NULL,
-                    VALUE=formulas.VALUE(args),
+                    VALUE=fast_ast.app(formulas.VALUE, args),
                 )
 
         return _f
@@ -2240,7 +2503,7 @@ And(
                 for attr in dum_tuple.attributes
             ]
         ])
-        implication = CodeSnippet(code=code, docstring=str(dum_tuple), docstring_first=True)
+        implication = CodeSnippet(code=code, docstring=LazyString(str, dum_tuple), docstring_first=True)
         self.scope.register_formulas(formulas=implication)
         return dum_tuple
 
@@ -2257,9 +2520,9 @@ And(
         return formulas.attributes[0](formulas[0].SORT)
 
     @visitor(FAbsPredicate)
-    def visit(self, formulas: FAbsPredicate, **kwargs):
+    def visit(self, formulas: FAbsPredicate, **outer_kwargs):
         def _f(*args, **kwargs):
-            expr = self.visit(formulas[0])(*args, **kwargs)
+            expr = self.visit(formulas[0], **outer_kwargs)(*args, **kwargs)
             if isinstance(expr.VALUE, BoolRef):
                 expr.VALUE = If(expr.VALUE, Z3_1, Z3_0)
             return FExpressionTuple(
@@ -2270,10 +2533,10 @@ And(
         return _f
 
     @visitor(FPowerPredicate)
-    def visit(self, formulas: FPowerPredicate, **kwargs):
+    def visit(self, formulas: FPowerPredicate, **outer_kwargs):
         def _f(*args, **kwargs):
-            base = self.visit(formulas[0])(*args, **kwargs)
-            exponent = self.visit(formulas[1])(*args, **kwargs)
+            base = self.visit(formulas[0], **outer_kwargs)(*args, **kwargs)
+            exponent = self.visit(formulas[1], **outer_kwargs)(*args, **kwargs)
             return FExpressionTuple(
                 Or(base.NULL, exponent.NULL),
                 base.VALUE ** exponent.VALUE,
@@ -2282,10 +2545,10 @@ And(
         return _f
 
     @visitor(FModPredicate)
-    def visit(self, formulas: FModPredicate, **kwargs):
+    def visit(self, formulas: FModPredicate, **outer_kwargs):
         def _f(*args, **kwargs):
-            expr0 = self.visit(formulas[0])(*args, **kwargs)
-            expr1 = self.visit(formulas[1])(*args, **kwargs)
+            expr0 = self.visit(formulas[0], **outer_kwargs)(*args, **kwargs)
+            expr1 = self.visit(formulas[1], **outer_kwargs)(*args, **kwargs)
             return FExpressionTuple(
                 Or(expr0.NULL, expr1.NULL),
                 expr0.VALUE % expr1.VALUE,
@@ -2301,53 +2564,82 @@ And(
         return _f
 
     @visitor(FLastValuePredicate)
-    def visit(self, formulas: FLastValuePredicate, **kwargs):
+    def visit(self, formulas: FLastValuePredicate, **outer_kwargs):
         def _f(*args, **kwargs):
-            expr = self.visit(formulas[0])(*args, **kwargs)
+            expr = self.visit(formulas[0], **outer_kwargs)(*args, **kwargs)
             return expr
 
         return _f
 
     @visitor(FIsNullOrHoldPredicate)
-    def visit(self, formulas: FIsNullOrHoldPredicate, **kwargs):
+    def visit(self, formulas: FIsNullOrHoldPredicate, **outer_kwargs):
         def _f(*args, **kwargs):
-            expr = self.visit(formulas[0])(*args, **kwargs)
+            expr = self.visit(formulas[0], **outer_kwargs)(*args, **kwargs)
             if not isinstance(expr.VALUE, BoolRef | bool):
                 expr.VALUE = expr.VALUE != Z3_0
             return FExpressionTuple(Z3_FALSE, Or(expr.NULL, expr.VALUE))
 
         return _f
 
+    def _case_term_key(self, kind: str, expr, args, kwargs, outer_kwargs):
+        """
+        key of a CASE guard/value over a single tuple sort, None if it cannot be shared
+        """
+        if len(args) != 1 or len(kwargs) > 0 or not isinstance(args[0], ExprRef):
+            return None
+        if len(outer_kwargs.get('outer_attrs', {})) > 0:
+            # terms of a correlated CASE vary with outer tuples as well
+            return None
+        key = expression_key(expr)
+        if key is None:
+            return None
+        return kind, key, args[0].get_id()
+
+    def _case_guard(self, if_clause, outer_kwargs, *args, **kwargs):
+        # guard of a WHEN clause, i.e., it is not NULL and holds
+        key = self._case_term_key('guard', if_clause, args, kwargs, outer_kwargs)
+        if key is not None and key in self.case_terms:
+            return self.case_terms[key]
+        if_clause = self.visit(if_clause, **outer_kwargs)(*args, **kwargs)
+        if isinstance(if_clause.VALUE, NumericType):
+            if_clause.VALUE = if_clause.VALUE != Z3_0
+        if isinstance(if_clause.VALUE, ArithRef | int | float):
+            bool_premise = And(Not(if_clause.NULL), if_clause.VALUE != Z3_0)
+        else:
+            bool_premise = And(Not(if_clause.NULL), if_clause.VALUE)
+        if key is not None:
+            self.case_terms[key] = bool_premise
+        return bool_premise
+
     @visitor(FCasePredicate)
-    def visit(self, formulas: FCasePredicate, **kwargs):
+    def visit(self, formulas: FCasePredicate, **outer_kwargs):
         def _f(*args, **kwargs):
+            # a CASE is a single If chain, and nested/repeated CASEs over the same tuple share their terms
+            key = self._case_term_key('case', formulas, args, kwargs, outer_kwargs)
+            if key is not None and key in self.case_terms:
+                value = self.case_terms[key]
+                return FExpressionTuple(NULL=value.NULL, VALUE=value.VALUE)
 
+            # outer attributes of correlated subqueries are passed to all clauses
             if getattr(formulas.else_clause, 'require_tuples', False):
-                else_clause = self.visit(formulas.else_clause)(*args, **kwargs)
+                else_clause = self.visit(formulas.else_clause, **outer_kwargs)(*args, **kwargs)
             else:
                 if isinstance(args[0], list | tuple) and len(args[0]) > 1 and \
                         kwargs.get('first_non_deleted_tuple_sort', None) is None:
                     # SELECT (CASE) + GROUP BY
-                    else_clause = self.visit(formulas.else_clause)(args[0][0])
+                    else_clause = self.visit(formulas.else_clause, **outer_kwargs)(args[0][0])
                 else:
-                    else_clause = self.visit(formulas.else_clause)(*args, **kwargs)
+                    else_clause = self.visit(formulas.else_clause, **outer_kwargs)(*args, **kwargs)
             for if_clause, then_clause in zip(formulas.when_clauses[::-1], formulas.then_clauses[::-1]):
                 if getattr(then_clause, 'require_tuples', False):
-                    then_clause = self.visit(then_clause)(*args, **kwargs)
+                    then_clause = self.visit(then_clause, **outer_kwargs)(*args, **kwargs)
                 else:
                     if isinstance(args[0], list | tuple) and len(args[0]) > 1:
                         # SELECT (CASE) + GROUP BY
-                        then_clause = self.visit(then_clause)(args[0][0], **kwargs)
+                        then_clause = self.visit(then_clause, **outer_kwargs)(args[0][0], **kwargs)
                     else:
-                        then_clause = self.visit(then_clause)(*args, **kwargs)
-                if_clause = self.visit(if_clause)(*args, **kwargs)
-                if isinstance(if_clause.VALUE, NumericType):
-                    if_clause.VALUE = if_clause.VALUE != Z3_0
-                if isinstance(if_clause.VALUE, ArithRef | int | float):
-                    bool_premise = And(Not(if_clause.NULL), if_clause.VALUE != Z3_0)
-                else:
-                    bool_premise = And(Not(if_clause.NULL), if_clause.VALUE)
-
+                        then_clause = self.visit(then_clause, **outer_kwargs)(*args, **kwargs)
+                bool_premise = self._case_guard(if_clause, outer_kwargs, *args, **kwargs)
                 if then_clause.NULL == else_clause.NULL:
                     else_clause_null = then_clause.NULL
                 else:
@@ -2375,6 +2667,8 @@ And(
                     )
 
                 else_clause = FExpressionTuple(NULL=else_clause_null, VALUE=else_clause_value)
+            if key is not None:
+                self.case_terms[key] = FExpressionTuple(NULL=else_clause.NULL, VALUE=else_clause.VALUE)
             return else_clause
 
         return _f
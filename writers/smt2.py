@@ -0,0 +1,44 @@
+# -*- coding:utf-8 -*-
+
+"""
+SMT-LIB2 export of equivalence goals, so that they can be solved by external solvers without re-encoding SQL pairs.
+
+A goal of a SQL pair under a bound size is stored as `<pair hash>_<bound size>.smt2`.
+"""
+
+import hashlib
+import os
+from typing import Sequence
+
+SMT2_SUFFIX = '.smt2'
+
+
+def pair_hash(queries: Sequence[str]) -> str:
+    return hashlib.md5('\n'.join(queries).encode('utf-8')).hexdigest()
+
+
+def smt2_file_name(queries: Sequence[str], bound_size: int) -> str:
+    return f'{pair_hash(queries)}_{bound_size}{SMT2_SUFFIX}'
+
+
+def parse_smt2_file_name(file: str):
+    """
+    (pair hash, bound size) of an SMT-LIB2 file
+    """
+    name = os.path.basename(file)[:-len(SMT2_SUFFIX)]
+    hash, bound_size = name.rsplit('_', 1)
+    return hash, int(bound_size)
+
+
+def to_smt2(solver) -> str:
+    """
+    SMT-LIB2 script of the assertions in `solver`, ending with `(check-sat)`.
+    No `set-logic` is emitted, cuz NULL flags are keyed by String constants even for the QF_UFLIA profiles.
+    """
+    return solver.to_smt2()
+
+
+def write_smt2(solver, file: str):
+    os.makedirs(os.path.dirname(file) or '.', exist_ok=True)
+    with open(file, 'w') as writer:
+        writer.write(to_smt2(solver))